@@ -8,21 +8,42 @@ This is my own work as defined by the University's Academic Integrity Policy.
 """
 
 from abc import ABC, abstractmethod
+from contextlib import ExitStack
 from datetime import datetime
+import sys
+
+from events import NO_BATCH
+from locking import NO_LOCK
+
+from pagination import HistoryIndex
 
 
 class Animal(ABC):
-    """Base class for all animals"""
+    """Base class for all animals
+    Uses __slots__ so animals have no per-instance __dict__, and species/diet strings are
+    interned so every animal of a species shares the same string object."""
+
+    __slots__ = ("_name", "_species", "_age", "_diet", "_health_record",
+                 "_active_records", "_severe_records", "_health_manager", "_enclosure",
+                 "_watchers", "_version", "_history_index", "_locks")
 
     #initalise all attributes of an animal
     def __init__(self, name, species, age, diet):
         self._name = name
-        self._species = species
+        self._species = sys.intern(species)
         self._age = age
-        self._diet = diet
-        self._health_record = []
-        self._treatment_status = False
+        self._diet = sys.intern(diet)
+        self._health_record = None #list is only created when the first record is added
+        #incremental indexes of the active records and the active High/Critical records
+        #(dicts keep the order records were added in and give O(1) removal)
+        self._active_records = None
+        self._severe_records = None
         self._health_manager = None
+        self._enclosure = None
+        self._watchers = () #objects told about record changes (e.g. the zoo for its triage queue)
+        self._version = 0 #bumped on every change so cached reports know when to rebuild
+        self._history_index = None #records grouped by status/severity for paging, built on first use
+        self._locks = None #LockStripes shared by a thread-safe zoo (see locking.py)
 
     #define getter methods to access private attributes
     def get_name(self):
@@ -38,27 +59,140 @@ class Animal(ABC):
         return self._diet
 
     def get_health_record(self):
+        if self._health_record is None:
+            return []
+        if type(self._health_record) is not list:
+            #history loaded lazily from a snapshot is built on first access
+            self._health_record = self._health_record.load()
         return self._health_record
 
+    def get_history_index(self):
+        """Return the index used to page through this animal's records (see pagination.py)"""
+        if self._history_index is None:
+            records = self.get_health_record()
+            if self._health_record is None:
+                self._health_record = records
+            self._history_index = HistoryIndex(records)
+        return self._history_index
+
+    def get_history_page(self, cursor=None, limit=20, status=None, severity=None, reverse=False):
+        """Return a page of this animal's records, see HistoryIndex.page"""
+        return self.get_history_index().page(cursor, limit, status, severity, reverse)
+
+    def get_active_records(self):
+        if not self._active_records:
+            return []
+        return list(self._active_records)
+
+    def get_severe_records(self):
+        if not self._severe_records:
+            return []
+        return list(self._severe_records)
+
+    #animal is under treatment while it has any active High/Critical record
     def get_treatment_status(self):
-        return self._treatment_status
+        return bool(self._severe_records)
+
+    def get_enclosure(self):
+        return self._enclosure
+
+    def get_version(self):
+        return self._version
 
     #define setters for attributes that need to changed regularly (age, health record, treatments)
     def set_age(self, age):
         if age < 0:
             raise ValueError("Age cannot be negative")
         self._age = age
+        self._changed()
 
     def set_health_record(self, health_record):
-        self._health_record.append(health_record)
-
-        #if severe condition in record -> need to be under treatment
-        if health_record.get_severity() in ["High", "Critical"]:
-            self._treatment_status = True
-
-    #clear treatment status back to normal post-treatment
+        with self._hold():
+            if self._health_record is None:
+                self._health_record = []
+            elif type(self._health_record) is not list:
+                self._health_record = self._health_record.load()
+            health_record.set_recorded(len(self._health_record))
+            self._health_record.append(health_record)
+
+            #if severe condition in record -> need to be under treatment
+            self.update_record_index(health_record, "added")
+
+    def update_record_index(self, health_record, change="added"):
+        """Move a record in/out of the active and severe indexes after it was added or changed
+        change says what happened to the record ("added", "status", "severity", "plan" or "note")"""
+        if self._locks is None:
+            self._update_record_index(health_record, change)
+            return
+        with self._locks.hold(self):
+            self._update_record_index(health_record, change)
+
+    def _update_record_index(self, health_record, change):
+        if health_record.is_active():
+            if self._active_records is None:
+                self._active_records = {}
+            self._active_records[health_record] = None
+        elif self._active_records:
+            self._active_records.pop(health_record, None)
+
+        if health_record.is_active() and health_record.is_severe():
+            if self._severe_records is None:
+                self._severe_records = {}
+            self._severe_records[health_record] = None
+        elif self._severe_records:
+            self._severe_records.pop(health_record, None)
+
+        if self._history_index is not None:
+            self._history_index.update(health_record)
+
+        self._version += 1
+        for watcher in self._watchers:
+            watcher.record_changed(health_record, change)
+
+    #called after a change to the animal itself (not its records) so watchers can react
+    def _changed(self):
+        self._version += 1
+        for watcher in self._watchers:
+            watcher.animal_changed(self)
+
+    #watchers must have record_changed(record, change), animal_changed(animal) and batch() methods
+    def add_watcher(self, watcher):
+        if watcher not in self._watchers:
+            self._watchers = self._watchers + (watcher,)
+
+    def remove_watcher(self, watcher):
+        self._watchers = tuple(w for w in self._watchers if w is not watcher)
+
+    def batch(self):
+        """Group the changes made in a with block so watchers are told about them in one batch"""
+        if not self._watchers:
+            return NO_BATCH
+        if len(self._watchers) == 1:
+            return self._watchers[0].batch()
+        stack = ExitStack()
+        for watcher in self._watchers:
+            stack.enter_context(watcher.batch())
+        return stack
+
+    #set by a thread-safe zoo so changes to the animal's records lock the animal
+    def set_locks(self, locks):
+        self._locks = locks
+
+    def _hold(self):
+        if self._locks is None:
+            return NO_LOCK
+        return self._locks.hold(self)
+
+    #set by the enclosure when the animal is moved in or out
+    def set_enclosure(self, enclosure):
+        self._enclosure = enclosure
+        self._version += 1
+
+    #clear treatment status back to normal post-treatment by resolving the severe records left
     def clear_treatment(self):
-        self._treatment_status = False
+        with self.batch():
+            for record in self.get_severe_records():
+                record.resolve_issue("Treatment completed")
 
     #methods same for all animals
     def eat(self):
@@ -83,6 +217,8 @@ class Animal(ABC):
 
 #animal subclasses for the categories: mammal, bird,reptile (maybe add fish and insect)
 class Mammal(Animal):
+    __slots__ = ("_fur",)
+
     def __init__(self, name, species, age, diet, fur=None):
         super().__init__(name, species, age, diet)
         self._fur = fur
@@ -99,6 +235,8 @@ class Mammal(Animal):
         return "Mammal"
 
 class Bird(Animal):
+    __slots__ = ("_can_fly",)
+
     def __init__(self, name, species, age, diet, can_fly=True):
         super().__init__(name, species, age, diet)
         self._can_fly = can_fly
@@ -115,6 +253,8 @@ class Bird(Animal):
         return f"{self._name} chirps!"
 
 class Reptile(Animal):
+    __slots__ = ("_venomous",)
+
     def __init__(self, name, species, age, diet, venomous=False):
         super().__init__(name, species, age, diet)
         self._venomous = venomous
@@ -131,12 +271,17 @@ class Reptile(Animal):
 
 #subclasses for specific animals of each species
 class Lion(Animal):
+    __slots__ = ("_pride_member",)
+
+    SPECIES = "Lion"
+    DIET = "Carnivore: 5-7kg of raw meat daily"
+
     def __init__(self, name, age, pride_member = True):
         super().__init__(
             name = name,
-            species = "Lion",
+            species = Lion.SPECIES,
             age = age,
-            diet = "Carnivore: 5-7kg of raw meat daily",
+            diet = Lion.DIET,
         )
         self._pride_member = pride_member
 
@@ -159,12 +304,17 @@ class Lion(Animal):
 class Python(Reptile):
     """Represents a Python as a reptile species
         unique attribute is length in meters set to default of 3.0"""
-    def __init__(self, name, age, length):
+    __slots__ = ("_length",)
+
+    SPECIES = "Australian Scrub"
+    DIET = "Carnivore: small mammals, lizards and bird every 1-2 weeks"
+
+    def __init__(self, name, age, length=3.0):
         super().__init__(
             name=name,
-            species="Australian Scrub",
+            species=Python.SPECIES,
             age=age,
-            diet = "Carnivore: small mammals, lizards and bird every 1-2 weeks",
+            diet = Python.DIET,
             venomous=False)
         self._length = length
 
@@ -187,60 +337,52 @@ class Python(Reptile):
 
     def __str__(self):
         """String representation of python and its characteristics"""
-        return f"{super().__str__()} with Length = {self.length}"
-
-
-    class Parrot(Bird):
-        """Parrot subclass with unique attributes of colour and vocab"""
-        def __init__(self, name, age, colour="Rainbow"):
-            super().__init__(
-                name=name,
-                species = "Scarlet Macaw",
-                age=age,
-                diet = "Omnivore: 100-150g of plants, seeds, nuts, and insects",
-                can_fly = True
-            )
-            self._colour = colour
-            self._vocabulary = []
-
-        def make_sound(self):
-            if self._vocabulary:
-                word = self._vocabulary[0]
-                return f"Parrot {self._name} squawks {word}!"
-            else:
-                return f"Parrot {self._name} SQUAWKS!"
-
-        def get_animal_type(self):
-            return "Parrot"
-
-        def get_colour(self):
-            return self._colour
-
-        def get_vocabulary(self):
-            return self._vocabulary
-
-        def teach_word(self, word):
-            """Teach the parrot a new word"""
-            if word not in self._vocabulary:
-                self._vocabulary.append(word)
-                return f"{self._name} has learned to say {word}"
-            return f"{self._name} already knows {word}"
-
-        def __str__(self):
-            """String representation of parrot and its characteristics"""
-            vocab_count = len(self._vocabulary)
-            return f"{super().__str__()} - colour is {self._colour} and it knows {vocab_count} words"
-
-
-
-
+        return f"{super().__str__()} with Length = {self._length}"
 
 
+class Parrot(Bird):
+    """Parrot subclass with unique attributes of colour and vocab"""
+    __slots__ = ("_colour", "_vocabulary")
 
+    SPECIES = "Scarlet Macaw"
+    DIET = "Omnivore: 100-150g of plants, seeds, nuts, and insects"
 
+    def __init__(self, name, age, colour="Rainbow"):
+        super().__init__(
+            name=name,
+            species = Parrot.SPECIES,
+            age=age,
+            diet = Parrot.DIET,
+            can_fly = True
+        )
+        self._colour = colour
+        self._vocabulary = []
 
+    def make_sound(self):
+        if self._vocabulary:
+            word = self._vocabulary[0]
+            return f"Parrot {self._name} squawks {word}!"
+        else:
+            return f"Parrot {self._name} SQUAWKS!"
 
+    def get_animal_type(self):
+        return "Parrot"
 
+    def get_colour(self):
+        return self._colour
 
+    def get_vocabulary(self):
+        return self._vocabulary
 
+    def teach_word(self, word):
+        """Teach the parrot a new word"""
+        if word not in self._vocabulary:
+            self._vocabulary.append(word)
+            self._changed()
+            return f"{self._name} has learned to say {word}"
+        return f"{self._name} already knows {word}"
 
+    def __str__(self):
+        """String representation of parrot and its characteristics"""
+        vocab_count = len(self._vocabulary)
+        return f"{super().__str__()} - colour is {self._colour} and it knows {vocab_count} words"
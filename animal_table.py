@@ -0,0 +1,167 @@
+"""
+File: animal_table.py
+Description: This class represents a compact column based table of animals with lightweight proxy objects
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from array import array
+import sys
+
+
+class AnimalTable:
+    """Stores animals as columns (one array per attribute) instead of one object per animal
+    Repeated strings (species, diet, animal type) are stored once in a pool and referenced by a
+    small integer code, so a million animals only cost a few bytes each plus their names."""
+
+    def __init__(self):
+        self._names = []
+        self._ages = array("i")  #whole years
+        self._species = array("I")  #code into the string pool
+        self._diets = array("I")
+        self._types = array("I")  #shares the pool with species/diet so it can pass 65535 codes
+        self._treatment = array("b")
+        self._pool = []  #code -> string
+        self._codes = {}  #string -> code
+
+    #define methods to add rows to the table
+    def add(self, name, species, age, diet, animal_type, treatment_status=False):
+        """Add an animal as a new row and return its proxy"""
+        if age < 0:
+            raise ValueError("Age cannot be negative")
+        self._names.append(name)
+        self._ages.append(age)
+        self._species.append(self._code(species))
+        self._diets.append(self._code(diet))
+        self._types.append(self._code(animal_type))
+        self._treatment.append(1 if treatment_status else 0)
+        return AnimalProxy(self, len(self._names) - 1)
+
+    def add_animal(self, animal):
+        """Copy an existing Animal object into the table and return its proxy"""
+        return self.add(animal.get_name(), animal.get_species(), animal.get_age(),
+                        animal.get_diet(), animal.get_animal_type(), animal.get_treatment_status())
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._pool)
+            self._pool.append(sys.intern(value))
+            self._codes[value] = code
+        return code
+
+    #define getters for a single row (used by the proxies)
+    def get_row(self, row):
+        if not 0 <= row < len(self._names):
+            raise IndexError(f"Row {row} is out of range")
+        return AnimalProxy(self, row)
+
+    def get_name(self, row):
+        return self._names[row]
+
+    def get_species(self, row):
+        return self._pool[self._species[row]]
+
+    def get_age(self, row):
+        return self._ages[row]
+
+    def get_diet(self, row):
+        return self._pool[self._diets[row]]
+
+    def get_animal_type(self, row):
+        return self._pool[self._types[row]]
+
+    def get_treatment_status(self, row):
+        return bool(self._treatment[row])
+
+    #define setters for the columns that change
+    def set_age(self, row, age):
+        if age < 0:
+            raise ValueError("Age cannot be negative")
+        self._ages[row] = age
+
+    def set_treatment_status(self, row, status):
+        self._treatment[row] = 1 if status else 0
+
+    #whole column queries that don't need any proxy objects
+    def count_species(self, species):
+        code = self._codes.get(species)
+        if code is None:
+            return 0
+        return self._species.count(code)
+
+    def count_under_treatment(self):
+        return sum(self._treatment)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        for row in range(len(self._names)):
+            yield AnimalProxy(self, row)
+
+
+class AnimalProxy:
+    """Lightweight view of one row of an AnimalTable with the same getters as Animal
+    A table only stores the columns above: rows have no health records and live in no enclosure,
+    so get_health_record() is always empty and get_enclosure() None. A proxy can stand in for an
+    Animal wherever it is only read (reports, counts, searches), not where it is moved or treated."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    #getters matching the Animal API
+    def get_row(self):
+        return self._row
+
+    def get_name(self):
+        return self._table.get_name(self._row)
+
+    def get_species(self):
+        return self._table.get_species(self._row)
+
+    def get_age(self):
+        return self._table.get_age(self._row)
+
+    def get_diet(self):
+        return self._table.get_diet(self._row)
+
+    def get_animal_type(self):
+        return self._table.get_animal_type(self._row)
+
+    def get_treatment_status(self):
+        return self._table.get_treatment_status(self._row)
+
+    def get_health_record(self):
+        return []
+
+    def get_enclosure(self):
+        return None
+
+    def set_age(self, age):
+        self._table.set_age(self._row, age)
+
+    def clear_treatment(self):
+        self._table.set_treatment_status(self._row, False)
+
+    def eat(self):
+        return f"{self.get_name()} is eating {self.get_diet()}"
+
+    def sleep(self):
+        return f"{self.get_name()} is sleeping"
+
+    #two proxies are equal when they point at the same row of the same table
+    def __eq__(self, other):
+        if not isinstance(other, AnimalProxy):
+            return NotImplemented
+        return self._table is other._table and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+    def __str__(self):
+        return f"Animal name:{self.get_name()}, species:{self.get_species()}, age:{self.get_age()}"
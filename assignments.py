@@ -0,0 +1,74 @@
+"""
+File: assignments.py
+Description: This class represents the zoo's reverse index of which staff cover each animal and enclosure
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+
+
+class AssignmentIndex:
+    """Reverse side of the staff assignments: animal/enclosure -> staff covering it
+    Each staff member holds their own animals and enclosures, this index holds the other
+    direction so "who looks after this animal" is a dict lookup. It also keeps the animals and
+    enclosures of the zoo that nobody covers, so those queries never scan the zoo.
+    The zoo keeps it up to date as a watcher of its staff."""
+
+    def __init__(self):
+        self._staff_of = {}  #animal or enclosure -> {staff: None}
+        self._members = {"animal": {}, "enclosure": {}}  #animals/enclosures in the zoo
+        self._uncovered = {"animal": {}, "enclosure": {}}  #the ones nobody is assigned to
+
+    #define getters for the index
+    def get_staff(self, target):
+        """Return the staff assigned to an animal or enclosure"""
+        return list(self._staff_of.get(target, ()))
+
+    def is_covered(self, target):
+        return bool(self._staff_of.get(target))
+
+    def get_uncovered(self, kind):
+        """Return the animals ("animal") or enclosures ("enclosure") in the zoo nobody is assigned to"""
+        return list(self._uncovered[kind])
+
+    def count_uncovered(self, kind):
+        return len(self._uncovered[kind])
+
+    #define methods to keep the index in step with the zoo and its staff
+    def add_member(self, target, kind):
+        self._members[kind][target] = None
+        if not self._staff_of.get(target):
+            self._uncovered[kind][target] = None
+
+    def remove_member(self, target, kind):
+        """Forget an animal/enclosure that left the zoo and return the staff that covered it"""
+        self._members[kind].pop(target, None)
+        self._uncovered[kind].pop(target, None)
+        return list(self._staff_of.get(target, ()))
+
+    def assigned(self, staff, target, kind, added):
+        if added:
+            self._staff_of.setdefault(target, {})[staff] = None
+            self._uncovered[kind].pop(target, None)
+            return
+        covering = self._staff_of.get(target)
+        if covering is None:
+            return
+        covering.pop(staff, None)
+        if not covering:
+            del self._staff_of[target]
+            if target in self._members[kind]:
+                self._uncovered[kind][target] = None
+
+    def add_staff(self, staff):
+        for animal in staff.get_assigned_animals():
+            self.assigned(staff, animal, "animal", True)
+        for enclosure in staff.get_assigned_enclosures():
+            self.assigned(staff, enclosure, "enclosure", True)
+
+    def remove_staff(self, staff):
+        for animal in staff.get_assigned_animals():
+            self.assigned(staff, animal, "animal", False)
+        for enclosure in staff.get_assigned_enclosures():
+            self.assigned(staff, enclosure, "enclosure", False)
@@ -0,0 +1,217 @@
+"""
+File: benchmark.py
+Description: Benchmark suite for the hot zoo operations with JSON results and a regression check
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+from datetime import datetime
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from animal import Lion
+from enclosure import Enclosure
+from staff import Vet
+import synthetic
+
+
+def _time(func, repeat):
+    #best of repeat runs, the garbage collector is paused so it doesn't add noise
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+
+def _peak(func):
+    #peak memory allocated while func runs, in KiB
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _operations(zoo, size, rng):
+    """Return {name: (func, ops per call)} for every benchmarked operation
+    Operations that change the zoo undo their own changes so they can be repeated."""
+    batch = min(size, 10000)
+    species = zoo.get_species()
+    sample = rng.sample(zoo.get_animals(), min(1000, size))
+    vet = next(member for member in zoo.get_staff() if isinstance(member, Vet))
+    fresh = [synthetic.make_animal(size + i, rng) for i in range(batch)]
+    residents = [Lion(f"Resident{i}", 5) for i in range(batch)]
+    timeline = zoo.get_record_timeline()
+    cache = zoo.get_report_cache()
+    changed = sample[0]
+
+    def add_remove():
+        for animal in fresh:
+            zoo.add_animal(animal)
+        for animal in fresh:
+            zoo.remove_animal(animal)
+
+    def species_lookup():
+        for name in species:
+            zoo.get_animals_species(name)
+
+    def health_history():
+        for animal in sample:
+            vet.get_health_history(animal)
+
+    #a new record (then resolved) before each read, so every history is rebuilt rather than a cache hit
+    def health_history_after_change():
+        for animal in sample:
+            vet.create_record(animal, "Routine Checkup", "Benchmark check", "Low").resolve_issue("Fine")
+            vet.get_health_history(animal)
+
+    def placement():
+        enclosure = Enclosure("bench", "Large", "Savanna", batch)
+        zoo.add_enclosure(enclosure)
+        for animal in residents:
+            enclosure.add_animal(animal)
+        for animal in residents:
+            enclosure.remove_animal(animal)
+        zoo.remove_enclosure(enclosure)
+
+    #a cached report is only rebuilt after a change, so time both a full build from an empty cache
+    #and a rebuild after one animal changed, not only the cache hits of repeated calls
+    def cold(create_report):
+        def build():
+            cache.clear()
+            #each enclosure also keeps its last status string, drop those too
+            for enclosure in zoo.get_enclosures():
+                enclosure._status = None
+            return create_report()
+        return build
+
+    def after_change(create_report):
+        def build():
+            changed.set_age(changed.get_age())
+            return create_report()
+        return build
+
+    return {
+        "add_remove_animal": (add_remove, 2 * batch),
+        "get_animals_species": (species_lookup, len(species)),
+        "create_animal_report": (zoo.create_animal_report, 1),
+        "create_health_report": (zoo.create_health_report, 1),
+        "create_enclosure_report": (zoo.create_enclosure_report, 1),
+        "create_animal_report_cold": (cold(zoo.create_animal_report), 1),
+        "create_health_report_cold": (cold(zoo.create_health_report), 1),
+        "create_enclosure_report_cold": (cold(zoo.create_enclosure_report), 1),
+        "create_animal_report_after_change": (after_change(zoo.create_animal_report), 1),
+        "create_health_report_after_change": (after_change(zoo.create_health_report), 1),
+        "get_health_history": (health_history, len(sample)),
+        "get_health_history_after_change": (health_history_after_change, len(sample)),
+        "enclosure_add_animal": (placement, batch),
+        "records_last_7_days": (lambda: timeline.recorded_in_last(7), 1),
+        "open_longer_than": (lambda: timeline.open_longer_than(0), 1),
+    }
+
+
+def run(sizes, history, repeat, seed):
+    """Run every operation at every size and return the results as a dict ready for JSON"""
+    results = {}
+    for size in sizes:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        zoo_holder = []
+        build_peak = _peak(lambda: zoo_holder.append(synthetic.generate_zoo(size, history=history, seed=seed)))
+        zoo = zoo_holder[0]
+        entry = {"generate": {"seconds": time.perf_counter() - start, "peak_kib": build_peak}}
+        for name, (func, ops) in _operations(zoo, size, rng).items():
+            seconds = _time(func, repeat)
+            entry[name] = {
+                "seconds": seconds,
+                "ops": ops,
+                "per_op_us": seconds / max(ops, 1) * 1e6,
+                "peak_kib": _peak(func),
+            }
+            print(f"n={size:<8} {name:<34} {seconds * 1000:10.2f} ms  "
+                  f"{entry[name]['per_op_us']:10.2f} us/op  peak {entry[name]['peak_kib']:10.1f} KiB")
+        results[str(size)] = entry
+        del zoo, zoo_holder
+        gc.collect()
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "history": history,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold):
+    """Return a list of (size, operation, old us/op, new us/op, ratio, regressed) rows"""
+    rows = []
+    for size, operations in new["results"].items():
+        for name, result in operations.items():
+            before = old["results"].get(size, {}).get(name)
+            if before is None or "per_op_us" not in result:
+                continue
+            ratio = result["per_op_us"] / before["per_op_us"] if before["per_op_us"] else float("inf")
+            rows.append((size, name, before["per_op_us"], result["per_op_us"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zoo benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    run_parser.add_argument("--history", type=int, default=2, help="health records per animal")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--out", default="bench_results.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.25,
+                                help="allowed slowdown before a result is a regression (0.25 = 25%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run(args.sizes, args.history, args.repeat, args.seed)
+        with open(args.out, "w") as sink:
+            json.dump(results, sink, indent=2)
+        print(f"Results saved to {args.out}")
+        return 0
+
+    with open(args.old) as source:
+        old = json.load(source)
+    with open(args.new) as source:
+        new = json.load(source)
+    regressions = 0
+    for size, name, before, after, ratio, regressed in compare(old, new, args.threshold):
+        flag = "REGRESSION" if regressed else "ok"
+        regressions += regressed
+        print(f"n={size:<8} {name:<34} {before:10.2f} -> {after:10.2f} us/op  x{ratio:5.2f}  {flag}")
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
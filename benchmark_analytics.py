@@ -0,0 +1,69 @@
+"""
+File: benchmark_analytics.py
+Description: Times the vectorised health analytics on large generated record columns
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from health_analytics import HealthAnalytics, ISSUE_TYPES
+from health_system import HealthRecord
+import synthetic
+
+
+def make_columns(records, seed):
+    """Random columns shaped like HealthAnalytics.export_columns() output for records rows"""
+    rng = np.random.default_rng(seed)
+    species = synthetic.MAMMAL_SPECIES + synthetic.BIRD_SPECIES + synthetic.REPTILE_SPECIES
+    types = ["Mammal", "Bird", "Reptile", "Lion", "Python", "Parrot"]
+    recorded = rng.uniform(1.6e9, 1.7e9, records)
+    resolved = recorded + rng.exponential(10 * 86400, records)
+    status = rng.integers(0, len(HealthRecord.STATUS_OPTIONS), records)
+    resolved[status != HealthRecord.STATUS_OPTIONS.index("Resolved")] = np.nan
+    columns = {
+        "animal_id": rng.integers(0, records // 10 + 1, records),
+        "species": rng.integers(0, len(species), records),
+        "type": rng.integers(0, len(types), records),
+        "issue_type": rng.integers(0, len(ISSUE_TYPES), records),
+        "severity": rng.integers(0, len(HealthRecord.SEVERITY_LVLS), records),
+        "status": status,
+        "recorded": recorded,
+        "resolved": resolved,
+        "escalations": rng.poisson(0.2, records),
+    }
+    return columns, species, types
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the health analytics aggregates")
+    parser.add_argument("--records", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    columns, species, types = make_columns(args.records, args.seed)
+    analytics = HealthAnalytics.from_columns(columns, species, types)
+    del columns
+
+    total = 0.0
+    for name, query in [
+        ("mean_resolution_days(species)", lambda: analytics.mean_resolution_days("species")),
+        ("incidents_per_month(issue_type)", lambda: analytics.incidents_per_month("issue_type")),
+        ("escalation_rate(species)", lambda: analytics.escalation_rate("species")),
+        ("escalated_share(type)", lambda: analytics.escalated_share("type")),
+        ("count_by(severity)", lambda: analytics.count_by("severity")),
+    ]:
+        start = time.perf_counter()
+        result = query()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"{name:<34} {elapsed * 1000:9.1f} ms  ({len(result)} groups)")
+    print(f"{args.records} records, all aggregates in {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+File: benchmark_census.py
+Description: Measures census import and export throughput in rows per minute
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import census
+import synthetic
+from zoo import Zoo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Census import/export throughput")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    args = parser.parse_args()
+
+    source = synthetic.generate_zoo(args.rows, history=0, staff=2)
+    with tempfile.TemporaryDirectory() as folder:
+        enclosures = os.path.join(folder, f"enclosures.{args.format}")
+        animals = os.path.join(folder, f"animals.{args.format}")
+        census.export_enclosures(source, enclosures)
+        start = time.perf_counter()
+        written = census.export_animals(source, animals)
+        elapsed = time.perf_counter() - start
+        print(f"export: {written} rows in {elapsed:.2f}s ({written / elapsed * 60:,.0f} rows/min)")
+        del source
+
+        zoo = Zoo("Census")
+        census.import_enclosures(zoo, enclosures)
+        start = time.perf_counter()
+        result = census.import_animals(zoo, animals)
+        elapsed = time.perf_counter() - start
+        print(f"import: {result} in {elapsed:.2f}s ({result.get_rows() / elapsed * 60:,.0f} rows/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+File: benchmark_compatibility.py
+Description: Benchmark of screening intake placements, one can_accept call per move versus one compiled batch check
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import random
+import sys
+import time
+
+from animal import Lion, Parrot, Python
+from compatibility import RuleBook, STANDARD_RULES
+from enclosure import Enclosure
+
+SPECIES = [Lion, Parrot, Python]
+ENVIRONMENTS = ["Savanna", "Grassland", "Aviary", "Jungle", "Desert", "Wetland"]
+
+
+def build(enclosures, candidates, capacity, seed):
+    """Return (rule book, enclosures with some animals in them, candidate animals, target enclosures)"""
+    rng = random.Random(seed)
+    rules = RuleBook(STANDARD_RULES)
+    homes = []
+    for i in range(enclosures):
+        enclosure = Enclosure(i + 1, 100, rng.choice(ENVIRONMENTS), capacity + candidates)
+        enclosure.set_rules(rules)
+        for j in range(rng.randint(0, capacity)):
+            try:
+                enclosure.add_animal(rng.choice(SPECIES)(f"R{i}-{j}", rng.randint(0, 20)))
+            except ValueError:
+                pass
+        homes.append(enclosure)
+    animals = [rng.choice(SPECIES)(f"C{i}", rng.randint(0, 20)) for i in range(candidates)]
+    targets = [rng.choice(homes) for _ in animals]
+    return rules, homes, animals, targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screening intake placements against compatibility rules")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--enclosures", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Enclosures: {args.enclosures}, up to {args.capacity} animals each")
+    print(f"{'candidates':>10} {'can_accept s':>13} {'batch s':>9} {'speedup':>8} {'blocked':>8}")
+    failed = False
+    for count in args.candidates:
+        rules, homes, animals, targets = build(args.enclosures, count, args.capacity, args.seed)
+
+        #before: run every rule for every move, one enclosure at a time
+        start = time.perf_counter()
+        reasons = [enclosure.can_accept(animal) for animal, enclosure in zip(animals, targets)]
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = rules.check_batch(animals, targets)
+        batch = time.perf_counter() - start
+
+        if [reason is not None for reason in reasons] != [bool(number) for number in result]:
+            print("    batch results differ from can_accept")
+            failed = True
+        print(f"{count:>10} {single:>13.3f} {batch:>9.3f} {single / batch:>7.1f}x {int((result != 0).sum()):>8}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+File: benchmark_concurrency.py
+Description: Stress test of a thread-safe zoo: throughput by thread count and invariant checks
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from animal import Lion, Parrot, Python
+from enclosure import Enclosure
+from staff import Vet
+from zoo import Zoo
+
+SPECIES = [Lion, Parrot, Python]
+#lock settings of each mode: (thread_safe, lock stripes)
+MODES = {"striped": (True, 64), "global": (True, 1), "unsafe": (False, 1)}
+#the only reasons a move may be refused in the stress test, anything else is a bug
+EXPECTED_REFUSALS = ("is full!", "is not compatible with")
+
+
+def build_zoo(mode, enclosures, animals, capacity, seed):
+    thread_safe, stripes = MODES[mode]
+    zoo = Zoo("Stress", thread_safe=thread_safe, lock_stripes=stripes)
+    rng = random.Random(seed)
+    for i in range(enclosures):
+        zoo.add_enclosure(Enclosure(i + 1, 100, "Mixed", capacity))
+    zoo.add_animals([rng.choice(SPECIES)(f"A{i}", 3) for i in range(animals)])
+    zoo.add_staff(Vet("Vet", 1))
+    return zoo
+
+
+def check_enclosure(enclosure, animals):
+    """Return what is wrong with one enclosure's animals (an empty list if nothing)"""
+    problems = []
+    if len(animals) > enclosure.get_capacity():
+        problems.append(f"enclosure {enclosure.get_enclosure_id()} over capacity: {len(animals)}")
+    if len(set(animal.get_species() for animal in animals)) > 1:
+        problems.append(f"enclosure {enclosure.get_enclosure_id()} has mixed species")
+    return problems
+
+
+def check_zoo(zoo, animal_count):
+    """Check every invariant once all the threads have stopped"""
+    problems = []
+    seen = {}
+    for enclosure in zoo.get_enclosures():
+        animals = enclosure.get_animals()
+        problems += check_enclosure(enclosure, animals)
+        if animals and enclosure.get_compatible_species() != animals[0].get_species():
+            problems.append(f"enclosure {enclosure.get_enclosure_id()} has the wrong species set")
+        if set(zoo.get_animals_enclosure(enclosure)) != set(animals):
+            problems.append(f"zoo index out of step for enclosure {enclosure.get_enclosure_id()}")
+        for animal in animals:
+            if animal in seen:
+                problems.append(f"{animal.get_name()} is in two enclosures")
+            seen[animal] = enclosure
+            if animal.get_enclosure() is not enclosure:
+                problems.append(f"{animal.get_name()} does not know its enclosure")
+    for animal in zoo.get_animals():
+        if animal not in seen and animal.get_enclosure() is not None:
+            problems.append(f"{animal.get_name()} thinks it is in an enclosure it is not in")
+    if len(zoo.get_animals()) != animal_count:
+        problems.append(f"{animal_count - len(zoo.get_animals())} animals lost")
+    return problems
+
+
+def check_transfers(mode):
+    """Move one animal A -> B -> A, returning what went wrong (an empty list if nothing)"""
+    thread_safe, stripes = MODES[mode]
+    zoo = Zoo("Transfer", thread_safe=thread_safe, lock_stripes=stripes)
+    first = Enclosure(1, 100, "Savanna", 2)
+    second = Enclosure(2, 100, "Savanna", 2)
+    zoo.add_enclosure(first)
+    zoo.add_enclosure(second)
+    leo = Lion("Leo", 5)
+    zoo.add_animal(leo)
+    problems = []
+    try:
+        for enclosure in (first, second, first):
+            zoo.transfer_animal(leo, enclosure)
+            if leo.get_enclosure() is not enclosure or leo not in enclosure.get_animals():
+                problems.append(f"Leo did not move into enclosure {enclosure.get_enclosure_id()}")
+    except ValueError as exc:
+        problems.append(f"transfer refused: {exc}")
+    if second.get_animals() or len(first.get_animals()) != 1:
+        problems.append("Leo was left in the wrong enclosure")
+    if set(zoo.get_animals_enclosure(first)) != {leo}:
+        problems.append("zoo index out of step after transfers")
+    return problems
+
+
+def refused(exc, problems):
+    """Note a ValueError from a move unless it is one of the expected refusals"""
+    if not any(reason in str(exc) for reason in EXPECTED_REFUSALS):
+        problems.append(f"unexpected refusal: {exc}")
+
+
+def worker(zoo, seed, deadline, work, counts, problems):
+    """Keeper/vet/intake mix: move animals, clean enclosures (holding the lock for work seconds
+    as if talking to a device) and write health records"""
+    rng = random.Random(seed)
+    animals = zoo.get_animals()
+    enclosures = zoo.get_enclosures()
+    vet = zoo.get_staff_role("Vet")[0]
+    try:
+        _work(zoo, rng, animals, enclosures, vet, deadline, work, counts, problems)
+    except Exception as exc:
+        problems.append(f"worker crashed: {exc!r}")
+
+
+def _work(zoo, rng, animals, enclosures, vet, deadline, work, counts, problems):
+    ops = 0
+    transfers = 0
+    while time.perf_counter() < deadline:
+        choice = rng.random()
+        animal = rng.choice(animals)
+        enclosure = rng.choice(enclosures)
+        if choice < 0.4:
+            source = animal.get_enclosure()
+            try:
+                zoo.transfer_animal(animal, enclosure)
+                if source is not None and source is not enclosure:
+                    transfers += 1
+            except ValueError as exc:
+                refused(exc, problems)
+        elif choice < 0.6:
+            #intake: put an animal straight into an enclosure (the check-then-append path)
+            if animal.get_enclosure() is None:
+                try:
+                    enclosure.add_animal(animal)
+                except ValueError as exc:
+                    #another thread may have placed it since the check above
+                    if animal.get_enclosure() is None:
+                        refused(exc, problems)
+        elif choice < 0.7:
+            current = animal.get_enclosure()
+            if current is not None:
+                current.remove_animal(animal)
+        elif choice < 0.9:
+            with zoo.hold(enclosure):
+                if work:
+                    time.sleep(work)
+                enclosure.dec_cleanliness(1)
+                enclosure.clean_enclosure(1)
+        else:
+            record = vet.create_record(animal, "Routine Checkup", "Stress check", "Low")
+            record.resolve_issue("Fine")
+        ops += 1
+    counts.append((ops, transfers))
+
+
+def reader(zoo, deadline, problems):
+    """Lock-free reads running alongside the writers, every snapshot must be valid"""
+    enclosures = zoo.get_enclosures()
+    while time.perf_counter() < deadline:
+        for enclosure in enclosures:
+            found = check_enclosure(enclosure, enclosure.get_animals())
+            if found:
+                problems.extend(found)
+        zoo.get_animals()
+
+
+def run(mode, threads, seconds, args):
+    zoo = build_zoo(mode, args.enclosures, args.animals, args.capacity, args.seed)
+    counts, problems = [], []
+    deadline = time.perf_counter() + seconds
+    pool = [threading.Thread(target=worker, args=(zoo, args.seed + i, deadline, args.work, counts, problems))
+            for i in range(threads)]
+    pool.append(threading.Thread(target=reader, args=(zoo, deadline, problems)))
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    problems += check_zoo(zoo, args.animals)
+    transfers = sum(moved for _, moved in counts)
+    if not transfers:
+        problems.append("no animal was transferred between enclosures")
+    return sum(ops for ops, _ in counts) / seconds, transfers, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thread-safe zoo stress test")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=["striped", "global"])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--enclosures", type=int, default=200)
+    parser.add_argument("--animals", type=int, default=600)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--work", type=float, default=0.0005,
+                        help="seconds an enclosure lock is held while cleaning (0 for pure CPU)")
+    parser.add_argument("--switch-interval", type=float, default=1e-5,
+                        help="thread switch interval, small values make races far more likely")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.setswitchinterval(args.switch_interval)
+
+    failed = False
+    for mode in MODES:
+        problems = check_transfers(mode)
+        print(f"{mode:8} A -> B -> A transfer: {'ok' if not problems else 'FAILED'}")
+        for problem in problems:
+            print(f"    {problem}")
+        failed = failed or bool(problems)
+
+    for mode in args.modes:
+        base = None
+        for threads in args.threads:
+            rate, transfers, problems = run(mode, threads, args.seconds, args)
+            base = base or rate
+            print(f"{mode:8} {threads:2} threads: {rate:10,.0f} ops/s ({rate / base:4.1f}x), "
+                  f"{transfers:,} transfers, {len(problems)} invariant violations")
+            for problem in problems[:5]:
+                print(f"    {problem}")
+            failed = failed or (bool(problems) and mode != "unsafe")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
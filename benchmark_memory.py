@@ -0,0 +1,81 @@
+"""
+File: benchmark_memory.py
+Description: Memory benchmark comparing bytes per animal for the dict based, slotted and table layouts
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import gc
+import tracemalloc
+
+from animal import Lion, Parrot, Python
+from animal_table import AnimalTable
+
+
+class DictLion:
+    """The Lion layout as it was before __slots__ (per-instance __dict__ and its own record list),
+    kept here only as the 'before' baseline for the benchmark
+    It sets exactly the attributes the original Animal.__init__ and Lion.__init__ set, with the
+    same string literals, so the saving measured is the layout alone."""
+    def __init__(self, name, age, pride_member=True):
+        self._name = name
+        self._species = "Lion"
+        self._age = age
+        self._diet = "Carnivore: 5-7kg of raw meat daily"
+        self._health_record = []
+        self._treatment_status = False
+        self._health_manager = None
+        self._pride_member = pride_member
+
+
+def measure(build, count):
+    """Return the bytes allocated per animal while building count animals"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    gc.collect()
+    return (after - before) / count
+
+
+def build_dict(count):
+    return [DictLion(f"Lion{i}", i % 20) for i in range(count)]
+
+
+def build_slots(count):
+    return [Lion(f"Lion{i}", i % 20) for i in range(count)]
+
+
+def build_table(count):
+    table = AnimalTable()
+    for i in range(count):
+        table.add(f"Lion{i}", Lion.SPECIES, i % 20, Lion.DIET, "Lion")
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per animal for each animal layout")
+    parser.add_argument("--count", type=int, default=10**6)
+    args = parser.parse_args()
+
+    #touch the other classes so their first-use cost isn't counted against the lions
+    Parrot("warmup", 1), Python("warmup", 1)
+
+    print(f"Animals: {args.count}")
+    results = [
+        ("dict (before)", measure(build_dict, args.count)),
+        ("__slots__", measure(build_slots, args.count)),
+        ("AnimalTable", measure(build_table, args.count)),
+    ]
+    baseline = results[0][1]
+    for label, per_animal in results:
+        print(f"{label:<15} {per_animal:8.1f} bytes/animal  ({per_animal / baseline:.0%} of before)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+File: benchmark_operations.py
+Description: Offline load test of the daily operations runner using the fake device backend
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import time
+
+from animal import Lion, Parrot
+from enclosure import Enclosure
+from staff import ZooKeeper
+import operations
+
+
+def build_keepers(keeper_count, animals_per_keeper):
+    """Each keeper looks after one enclosure and the animals living in it"""
+    keepers = []
+    for k in range(keeper_count):
+        keeper = ZooKeeper(f"Keeper{k}", k)
+        enclosure = Enclosure(k, "Medium", "Savanna", animals_per_keeper)
+        for i in range(animals_per_keeper):
+            animal = Lion(f"Lion{k}-{i}", 5) if k % 2 else Parrot(f"Parrot{k}-{i}", 5)
+            enclosure.add_animal(animal)
+            keeper.assign_animal(animal)
+        keeper.assign_enclosure(enclosure)
+        keepers.append(keeper)
+    return keepers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the daily operations runner offline")
+    parser.add_argument("--keepers", type=int, default=2000)
+    parser.add_argument("--animals-per-keeper", type=int, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--max-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    keepers = build_keepers(args.keepers, args.animals_per_keeper)
+    backend = operations.FakeDeviceBackend(max_latency=args.max_latency, failure_rate=args.failure_rate, seed=1)
+    start = time.perf_counter()
+    events = operations.run_day(keepers, backend, keeper_limit=2, enclosure_limit=2, timeout=0.5, retries=2)
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for event in events:
+        counts[event.get_status()] = counts.get(event.get_status(), 0) + 1
+    print(f"Keepers: {args.keepers}, tasks: {len(events)}, device calls: {backend.get_calls()}")
+    print(f"Finished in {elapsed:.2f}s ({len(events) / elapsed:.0f} tasks/s)")
+    for status, count in sorted(counts.items()):
+        print(f"  {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
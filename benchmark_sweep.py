@@ -0,0 +1,71 @@
+"""
+File: benchmark_sweep.py
+Description: Scaling benchmark for the zoo-wide health sweep across 1 to N worker processes
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import os
+import random
+import time
+
+from animal import Lion, Parrot, Python
+from health_system import HealthRecord, IssueType
+from staff import Vet
+from zoo import Zoo
+import health_sweep
+
+
+def build_zoo(animal_count, history, seed=1):
+    """Zoo where every animal has history records, most of them resolved"""
+    rng = random.Random(seed)
+    zoo = Zoo("Sweep")
+    vet = Vet("Bench", 1)
+    classes = [lambda i: Lion(f"Lion{i}", i % 15), lambda i: Parrot(f"Parrot{i}", i % 40),
+               lambda i: Python(f"Python{i}", i % 20, 2.5)]
+    for i in range(animal_count):
+        animal = classes[i % 3](i)
+        for _ in range(history):
+            record = vet.create_record(animal, IssueType.ROUTINE_CHECKUP, "Routine check",
+                                       rng.choice(HealthRecord.SEVERITY_LVLS))
+            if rng.random() < 0.95:
+                record.resolve_issue("Fine")
+        zoo.add_animal(animal)
+    return zoo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Health sweep scaling across worker processes")
+    parser.add_argument("--animals", type=int, default=20000)
+    parser.add_argument("--history", type=int, default=50)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    zoo = build_zoo(args.animals, args.history)
+    print(f"Animals: {args.animals}, records per animal: {args.history}")
+
+    #1, 2, 4, ... cores and finally the maximum
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    serial = None
+    base_time = None
+    for workers in counts:
+        start = time.perf_counter()
+        summary = health_sweep.sweep(zoo, workers=workers)
+        elapsed = time.perf_counter() - start
+        if serial is None:
+            serial, base_time = summary, elapsed
+        same = "same as serial" if summary == serial else "DIFFERENT FROM SERIAL"
+        print(f"workers={workers:<3} {elapsed:7.3f}s  speedup {base_time / elapsed:5.2f}x  ({same})")
+    print(serial)
+
+
+if __name__ == "__main__":
+    main()
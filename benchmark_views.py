@@ -0,0 +1,76 @@
+"""
+File: benchmark_views.py
+Description: Allocation benchmark of the collection getters, copying lists versus reused tuples
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import synthetic
+
+
+def measure(getter, calls):
+    """Return (bytes allocated per call with every result kept, microseconds per call,
+    garbage collections run) for calling getter calls times, like a dashboard holding on to
+    what it read"""
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [getter() for _ in range(calls)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    del kept
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        getter()
+    elapsed = time.perf_counter() - start
+    return (after - before) / calls, elapsed / calls * 1e6, collections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocations of the collection getters")
+    parser.add_argument("--animals", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    zoo = synthetic.generate_zoo(args.animals, history=0)
+    enclosure = max(zoo.get_enclosures(), key=lambda enclosure: enclosure.animal_count())
+    keeper = max(zoo.get_staff_role("ZooKeeper"), key=lambda keeper: keeper.get_animal_count())
+    species = zoo.get_species()[0]
+
+    #"before" is what each getter used to do: copy the whole collection into a new list
+    getters = [
+        ("Zoo.get_animals", zoo.get_animals,
+         lambda: list(zoo.get_animal_registry()._entities.values())),
+        ("Zoo.get_enclosures", zoo.get_enclosures,
+         lambda: list(zoo.get_enclosure_registry()._entities.values())),
+        ("Zoo.get_staff", zoo.get_staff, lambda: list(zoo._staff._entities.values())),
+        ("Zoo.get_animals_species", lambda: zoo.get_animals_species(species),
+         lambda: list(zoo.get_animal_registry()._indexes["species"][species].values())),
+        ("Enclosure.get_animals", enclosure.get_animals, lambda: enclosure._animals.copy()),
+        ("Staff.get_assigned_animals", keeper.get_assigned_animals,
+         lambda: list(keeper._assigned_animals)),
+        ("Staff.get_assigned_enclosures", keeper.get_assigned_enclosures,
+         lambda: list(keeper._assigned_enclosures)),
+    ]
+    print(f"Animals: {args.animals}, calls per getter: {args.calls}")
+    print(f"{'getter':<30} {'size':>6} {'before B/call':>14} {'after B/call':>13} "
+          f"{'before us':>10} {'after us':>9} {'gc before':>10} {'gc after':>9}")
+    for label, getter, copy in getters:
+        size = len(getter())
+        copy_bytes, copy_time, copy_gc = measure(copy, args.calls)
+        view_bytes, view_time, view_gc = measure(getter, args.calls)
+        print(f"{label:<30} {size:>6} {copy_bytes:>14,.0f} {view_bytes:>13,.0f} "
+              f"{copy_time:>10.2f} {view_time:>9.2f} {copy_gc:>10} {view_gc:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+File: census.py
+Description: Streaming bulk import and export of the zoo census as CSV or JSON lines files
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from contextlib import nullcontext
+import csv
+from datetime import datetime
+from itertools import islice
+import json
+
+from animal import Mammal, Bird, Reptile, Lion, Python, Parrot
+from enclosure import Enclosure
+from health_system import HealthRecord
+from staff import ZooKeeper, Vet
+
+#columns of each file (JSON lines rows use the same keys)
+ANIMAL_FIELDS = ["id", "type", "name", "species", "age", "diet", "enclosure",
+                 "fur", "can_fly", "venomous", "pride_member", "length", "colour"]
+ENCLOSURE_FIELDS = ["id", "enclosure_id", "size", "environment", "capacity", "cleanliness"]
+STAFF_FIELDS = ["id", "type", "name", "employee_id", "animals", "enclosures"]
+RECORD_FIELDS = ["animal_id", "issue_type", "description", "recorded_by", "severity", "status",
+                 "recorded", "resolved", "treatment_plan", "notes"]
+
+_TRUE = {"true", "yes", "1", "y"}
+_FALSE = {"false", "no", "0", "n"}
+
+
+class CensusError:
+    """A row that could not be imported, with the line it came from and why"""
+
+    __slots__ = ("_line", "_row", "_message")
+
+    def __init__(self, line, row, message):
+        self._line = line
+        self._row = row
+        self._message = message
+
+    def get_line(self):
+        return self._line
+
+    def get_row(self):
+        return self._row
+
+    def get_message(self):
+        return self._message
+
+    def __str__(self):
+        return f"Line {self._line}: {self._message}"
+
+
+class ImportResult:
+    """Counts of an import plus the rows that failed (only the first max_errors are kept)"""
+
+    def __init__(self, max_errors):
+        self._rows = 0
+        self._imported = 0
+        self._placed = 0
+        self._errors = []
+        self._error_count = 0
+        self._max_errors = max_errors
+
+    def get_rows(self):
+        return self._rows
+
+    def get_imported(self):
+        return self._imported
+
+    def get_placed(self):
+        return self._placed
+
+    def get_errors(self):
+        return list(self._errors)
+
+    def get_error_count(self):
+        return self._error_count
+
+    def add_error(self, line, row, message):
+        self._error_count += 1
+        if len(self._errors) < self._max_errors:
+            self._errors.append(CensusError(line, row, message))
+
+    def __str__(self):
+        return (f"{self._rows} rows read, {self._imported} imported, {self._placed} placed, "
+                f"{self._error_count} errors")
+
+
+#value parsers - rows from CSV hold strings, rows from JSON lines may already hold numbers/bools
+def _blank(value):
+    return value is None or value == ""
+
+
+def _text(row, field, default=None):
+    value = row.get(field)
+    if _blank(value):
+        if default is None:
+            raise ValueError(f"{field} is required")
+        return default
+    return str(value).strip()
+
+
+def _int(row, field, default=None):
+    value = row.get(field)
+    if _blank(value):
+        if default is None:
+            raise ValueError(f"{field} is required")
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a whole number, not {value!r}") from None
+
+
+def _float(row, field, default):
+    value = row.get(field)
+    if _blank(value):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, not {value!r}") from None
+
+
+def _bool(row, field, default):
+    value = row.get(field)
+    if _blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"{field} must be true or false, not {value!r}")
+
+
+def _key(value):
+    #enclosure and employee IDs are written as text, so numeric ones are read back as ints
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+def _date(value):
+    return None if _blank(value) else datetime.fromisoformat(value)
+
+
+def _iso(value):
+    return "" if value is None else value.isoformat()
+
+
+#type registry: get_animal_type() value -> (build an animal from a row, extra columns of an animal)
+ANIMAL_TYPES = {
+    "Mammal": (lambda row, name, age: Mammal(name, _text(row, "species"), age, _text(row, "diet"),
+                                             fur=row.get("fur") or None),
+               lambda animal: {"fur": animal.get_fur()}),
+    "Bird": (lambda row, name, age: Bird(name, _text(row, "species"), age, _text(row, "diet"),
+                                         can_fly=_bool(row, "can_fly", True)),
+             lambda animal: {"can_fly": animal.can_fly()}),
+    "Reptile": (lambda row, name, age: Reptile(name, _text(row, "species"), age, _text(row, "diet"),
+                                               venomous=_bool(row, "venomous", False)),
+                lambda animal: {"venomous": animal.is_venomous()}),
+    "Lion": (lambda row, name, age: Lion(name, age, _bool(row, "pride_member", True)),
+             lambda animal: {"pride_member": animal.is_pride_member()}),
+    "Python": (lambda row, name, age: Python(name, age, _float(row, "length", 3.0)),
+               lambda animal: {"length": animal.get_length()}),
+    "Parrot": (lambda row, name, age: Parrot(name, age, _text(row, "colour", "Rainbow")),
+               lambda animal: {"colour": animal.get_colour()}),
+}
+STAFF_TYPES = {"ZooKeeper": ZooKeeper, "Vet": Vet}
+
+
+def register_animal_type(animal_type, build, extra_fields):
+    """Let the census load and save a new kind of animal
+    build(row, name, age) returns the animal for a row and extra_fields(animal) returns a dict of
+    the extra columns to write for it (their names must be in ANIMAL_FIELDS)."""
+    ANIMAL_TYPES[animal_type] = (build, extra_fields)
+
+
+def build_animal(row):
+    """Build (but don't add) the animal described by a census row, raising ValueError if it is invalid"""
+    animal_type = _text(row, "type")
+    if animal_type not in ANIMAL_TYPES:
+        raise ValueError(f"Unknown animal type {animal_type!r}")
+    name = _text(row, "name")
+    age = _int(row, "age")
+    #same rule as Animal.set_age
+    if age < 0:
+        raise ValueError("Age cannot be negative")
+    return ANIMAL_TYPES[animal_type][0](row, name, age)
+
+
+#reading
+def _open(source, mode):
+    #a file object given by the caller is used as it is and left open
+    if hasattr(source, "read") or hasattr(source, "write"):
+        return nullcontext(source)
+    return open(source, mode, newline="", encoding="utf-8")
+
+
+def _format(source, fmt):
+    if fmt is not None:
+        return fmt
+    name = getattr(source, "name", source)
+    if isinstance(name, str) and name.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def iter_rows(handle, fmt, result):
+    """Yield (line number, row dict) from an open census file; unreadable lines go to result"""
+    if fmt == "csv":
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            result.add_error(line_no, line.rstrip("\n"), f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            result.add_error(line_no, row, "Row must be a JSON object")
+            continue
+        yield line_no, row
+
+
+def _chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_animals(zoo, source, fmt=None, chunk_size=10000, place=False, max_errors=1000):
+    """Stream animals from a census file into the zoo, chunk_size rows at a time
+    Rows are validated a chunk at a time and the valid ones are added with Zoo.add_animals.
+    Then a row with an enclosure column is moved into that enclosure, and if place is True the
+    rest of the chunk is spread over the zoo's enclosures with Zoo.place_animals.
+    Bad rows (and animals that could not be placed) are collected in the result instead of
+    stopping the import. Only one chunk is in memory at a time."""
+    fmt = _format(source, fmt)
+    result = ImportResult(max_errors)
+    with _open(source, "r") as handle:
+        for chunk in _chunks(iter_rows(handle, fmt, result), chunk_size):
+            result._rows += len(chunk)
+            animals, ids, targets = [], [], []
+            taken = set()
+            for line_no, row in chunk:
+                try:
+                    animal = build_animal(row)
+                    animal_id = None if _blank(row.get("id")) else _int(row, "id")
+                    if animal_id is not None and (animal_id in taken or zoo.get_animal(animal_id) is not None):
+                        raise ValueError(f"ID {animal_id} is already in use")
+                    taken.add(animal_id)
+                except ValueError as exc:
+                    result.add_error(line_no, row, str(exc))
+                    continue
+                animals.append(animal)
+                ids.append(animal_id)
+                targets.append((line_no, row, animal))
+            if not animals:
+                continue
+            #subscribers to the zoo's events hear about each chunk as one batch
+            with zoo.batch():
+                #rows with an ID go in first so the new IDs handed to the rest start after all of them
+                given = [(animal, animal_id) for animal, animal_id in zip(animals, ids) if animal_id is not None]
+                if given:
+                    zoo.add_animals([animal for animal, _ in given], [animal_id for _, animal_id in given])
+                if len(given) < len(animals):
+                    zoo.add_animals([animal for animal, animal_id in zip(animals, ids) if animal_id is None])
+                result._imported += len(animals)
+
+                unplaced = []
+                for line_no, row, animal in targets:
+                    enc_id = row.get("enclosure")
+                    if _blank(enc_id):
+                        unplaced.append(animal)
+                        continue
+                    enclosure = zoo.get_enclosure(_key(enc_id))
+                    reason = f"No enclosure {enc_id}" if enclosure is None else enclosure.can_accept(animal)
+                    if reason is None:
+                        enclosure.add_animal(animal)
+                        result._placed += 1
+                    else:
+                        result.add_error(line_no, row, f"{reason} (added without an enclosure)")
+                if place and unplaced:
+                    plan, rejects = zoo.place_animals(unplaced)
+                    result._placed += len(plan)
+                    for animal, reason in rejects:
+                        result.add_error(None, animal.get_name(), f"{reason} (added without an enclosure)")
+    return result
+
+
+def import_enclosures(zoo, source, fmt=None, max_errors=1000):
+    """Stream enclosures from a census file into the zoo"""
+    fmt = _format(source, fmt)
+    result = ImportResult(max_errors)
+    with _open(source, "r") as handle:
+        for line_no, row in iter_rows(handle, fmt, result):
+            result._rows += 1
+            try:
+                enc_id = _key(_text(row, "enclosure_id"))
+                if zoo.get_enclosure(enc_id) is not None:
+                    raise ValueError(f"Enclosure {enc_id} already exists")
+                capacity = _int(row, "capacity")
+                if capacity < 0:
+                    raise ValueError("Capacity cannot be negative")
+                enclosure = Enclosure(enc_id, _text(row, "size"), _text(row, "environment"), capacity)
+                if not _blank(row.get("cleanliness")):
+                    enclosure.set_cleanliness_lvl(_float(row, "cleanliness", 100))
+                zoo.add_enclosure(enclosure, None if _blank(row.get("id")) else _int(row, "id"))
+            except ValueError as exc:
+                result.add_error(line_no, row, str(exc))
+                continue
+            result._imported += 1
+    return result
+
+
+def _id_list(value):
+    if _blank(value):
+        return []
+    if isinstance(value, list):
+        return value
+    return [part for part in str(value).split(";") if part]
+
+
+def import_staff(zoo, source, fmt=None, max_errors=1000):
+    """Stream staff from a census file into the zoo
+    The animals column holds animal IDs and the enclosures column enclosure IDs (separated by ;
+    in CSV files), so animals and enclosures have to be imported first."""
+    fmt = _format(source, fmt)
+    result = ImportResult(max_errors)
+    with _open(source, "r") as handle:
+        for line_no, row in iter_rows(handle, fmt, result):
+            result._rows += 1
+            try:
+                staff_type = _text(row, "type")
+                if staff_type not in STAFF_TYPES:
+                    raise ValueError(f"Unknown staff type {staff_type!r}")
+                staff = STAFF_TYPES[staff_type](_text(row, "name"), _key(_text(row, "employee_id")))
+                animals = [zoo.get_animal(int(animal_id)) for animal_id in _id_list(row.get("animals"))]
+                enclosures = [zoo.get_enclosure(_key(enc_id)) for enc_id in _id_list(row.get("enclosures"))]
+                if None in animals or None in enclosures:
+                    raise ValueError("Assigned to an animal or enclosure that is not in the zoo")
+                for animal in animals:
+                    staff.assign_animal(animal)
+                for enclosure in enclosures:
+                    staff.assign_enclosure(enclosure)
+                zoo.add_staff(staff, None if _blank(row.get("id")) else _int(row, "id"))
+            except ValueError as exc:
+                result.add_error(line_no, row, str(exc))
+                continue
+            result._imported += 1
+    return result
+
+
+def import_health_records(zoo, source, fmt=None, chunk_size=10000, max_errors=1000):
+    """Stream health records from a census file onto the zoo's animals (found by animal_id)"""
+    fmt = _format(source, fmt)
+    result = ImportResult(max_errors)
+    with _open(source, "r") as handle:
+        for chunk in _chunks(iter_rows(handle, fmt, result), chunk_size):
+            with zoo.batch():
+                for line_no, row in chunk:
+                    result._rows += 1
+                    try:
+                        animal = zoo.get_animal(_int(row, "animal_id"))
+                        if animal is None:
+                            raise ValueError(f"No animal with ID {row.get('animal_id')}")
+                        record = HealthRecord(animal, _text(row, "issue_type"), _text(row, "description"),
+                                              _text(row, "recorded_by"), _text(row, "severity"))
+                        status = _text(row, "status", "Active")
+                        if status not in HealthRecord.STATUS_OPTIONS:
+                            raise ValueError("Invalid Status")
+                        notes = row.get("notes") or []
+                        if isinstance(notes, str):
+                            notes = json.loads(notes)
+                        #fill the record in before the animal sees it so its indexes are only updated once
+                        if not _blank(row.get("recorded")):
+                            record._date_recorded = _date(row["recorded"])
+                        record._treatment_plan = row.get("treatment_plan") or ""
+                        record._status = status
+                        record._resolution_date = _date(row.get("resolved"))
+                        record._notes = [{'date': _date(date), 'note': note, 'added_by': added_by}
+                                         for date, note, added_by in notes]
+                        animal.set_health_record(record)
+                    except (ValueError, TypeError) as exc:
+                        result.add_error(line_no, row, str(exc))
+                        continue
+                    result._imported += 1
+    return result
+
+
+#writing
+def iter_animal_rows(zoo):
+    for animal in zoo.get_animal_registry():
+        enclosure = animal.get_enclosure()
+        row = {
+            "id": zoo.get_animal_id(animal),
+            "type": animal.get_animal_type(),
+            "name": animal.get_name(),
+            "species": animal.get_species(),
+            "age": animal.get_age(),
+            "diet": animal.get_diet(),
+            "enclosure": "" if enclosure is None else enclosure.get_enclosure_id(),
+        }
+        extra = ANIMAL_TYPES.get(animal.get_animal_type())
+        if extra is not None:
+            row.update(extra[1](animal))
+        yield row
+
+
+def iter_enclosure_rows(zoo):
+    for enclosure in zoo.get_enclosure_registry():
+        yield {
+            "id": zoo.get_enclosure_registry_id(enclosure),
+            "enclosure_id": enclosure.get_enclosure_id(),
+            "size": enclosure.get_size(),
+            "environment": enclosure.get_environment(),
+            "capacity": enclosure.get_capacity(),
+            "cleanliness": enclosure.get_cleanliness_lvl(),
+        }
+
+
+def iter_staff_rows(zoo, fmt="csv"):
+    for staff in zoo.get_staff():
+        animals = [zoo.get_animal_id(animal) for animal in staff.get_assigned_animals()]
+        enclosures = [enclosure.get_enclosure_id() for enclosure in staff.get_assigned_enclosures()]
+        animals = [animal_id for animal_id in animals if animal_id is not None]
+        if fmt == "csv":
+            animals = ";".join(str(animal_id) for animal_id in animals)
+            enclosures = ";".join(str(enc_id) for enc_id in enclosures)
+        yield {
+            "id": zoo.get_staff_id(staff),
+            "type": type(staff).__name__,
+            "name": staff.get_name(),
+            "employee_id": staff.get_employee_id(),
+            "animals": animals,
+            "enclosures": enclosures,
+        }
+
+
+def iter_record_rows(zoo, fmt="csv"):
+    for animal in zoo.get_animal_registry():
+        animal_id = zoo.get_animal_id(animal)
+        for record in animal.get_health_record():
+            notes = [(_iso(entry['date']), entry['note'], entry['added_by']) for entry in record.get_notes()]
+            yield {
+                "animal_id": animal_id,
+                "issue_type": record.get_issue_type(),
+                "description": record.get_description(),
+                "recorded_by": record.get_recorded_by(),
+                "severity": record.get_severity(),
+                "status": record.get_status(),
+                "recorded": _iso(record.get_date_recorded()),
+                "resolved": _iso(record.get_resolution_date()),
+                "treatment_plan": record.get_treatment_plan(),
+                "notes": json.dumps(notes) if fmt == "csv" else notes,
+            }
+
+
+def write_rows(rows, sink, fields, fmt=None, chunk_size=10000):
+    """Stream rows (dicts) to a path or file-like sink as CSV or JSON lines, chunk_size at a time
+    Returns the number of rows written."""
+    fmt = _format(sink, fmt)
+    written = 0
+    with _open(sink, "w") as handle:
+        if fmt == "csv":
+            writer = csv.DictWriter(handle, fields, extrasaction="ignore")
+            writer.writeheader()
+            for chunk in _chunks(rows, chunk_size):
+                writer.writerows(chunk)
+                written += len(chunk)
+        else:
+            for chunk in _chunks(rows, chunk_size):
+                handle.write("".join(json.dumps(row, default=str) + "\n" for row in chunk))
+                written += len(chunk)
+    return written
+
+
+def export_animals(zoo, sink, fmt=None):
+    return write_rows(iter_animal_rows(zoo), sink, ANIMAL_FIELDS, fmt)
+
+
+def export_enclosures(zoo, sink, fmt=None):
+    return write_rows(iter_enclosure_rows(zoo), sink, ENCLOSURE_FIELDS, fmt)
+
+
+def export_staff(zoo, sink, fmt=None):
+    fmt = _format(sink, fmt)
+    return write_rows(iter_staff_rows(zoo, fmt), sink, STAFF_FIELDS, fmt)
+
+
+def export_health_records(zoo, sink, fmt=None):
+    fmt = _format(sink, fmt)
+    return write_rows(iter_record_rows(zoo, fmt), sink, RECORD_FIELDS, fmt)
@@ -0,0 +1,292 @@
+"""
+File: compatibility.py
+Description: Declarative enclosure compatibility rules compiled into lookup matrices for batch checks
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import threading
+
+import numpy as np
+
+#(minimum age, group) from youngest to oldest
+AGE_GROUPS = [(0, "Juvenile"), (2, "Adult"), (15, "Senior")]
+#environments each animal type can live in (types not listed can live anywhere)
+HABITATS = {
+    "Lion": {"Savanna", "Savannah", "Grassland"},
+    "Python": {"Jungle", "Desert", "Wetland"},
+    "Parrot": {"Aviary", "Jungle"},
+}
+_ALLOWED = np.iinfo(np.int16).max  #rank of "no rule blocks this", above every rule number
+
+
+def age_group(age):
+    group = AGE_GROUPS[0][1]
+    for minimum, name in AGE_GROUPS:
+        if age >= minimum:
+            group = name
+    return group
+
+
+class Profile:
+    """What the rules know about an animal: everything else about it is ignored, so animals
+    with the same profile are always treated the same and the rules only run once per profile"""
+    __slots__ = ("animal_type", "species", "diet", "venomous", "can_fly", "age_group")
+
+    def __init__(self, animal_type, species, diet, venomous, can_fly, age_group):
+        self.animal_type = animal_type
+        self.species = species
+        self.diet = diet
+        self.venomous = venomous
+        self.can_fly = can_fly
+        self.age_group = age_group
+
+    @staticmethod
+    def key_of(animal):
+        """Hashable key of an animal's profile, worked out from its getters"""
+        diet = animal.get_diet().split(":")[0].strip()
+        venomous = animal.is_venomous() if hasattr(animal, "is_venomous") else False
+        can_fly = animal.can_fly() if hasattr(animal, "can_fly") else False
+        return (animal.get_animal_type(), animal.get_species(), diet, venomous, can_fly,
+                age_group(animal.get_age()))
+
+
+class Rule:
+    """Base class of a compatibility rule
+    message can use {animal}, {enclosure} and {rule} and is shown when the rule blocks a move."""
+
+    def __init__(self, name, message):
+        self._name = name
+        self._message = message
+
+    def get_name(self):
+        return self._name
+
+    def describe(self, animal, enclosure):
+        return self._message.format(animal=animal, enclosure=enclosure, rule=self._name)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._name!r})"
+
+
+class PairRule(Rule):
+    """Blocks an animal from an enclosure when blocks(profile, occupant profile) is true for any
+    animal already living there (checked both ways round, so rules don't have to be symmetric)"""
+
+    def __init__(self, name, blocks, message="{animal} cannot live with the animals in {enclosure} ({rule})"):
+        super().__init__(name, message)
+        self._blocks = blocks
+
+    def blocks(self, profile, other):
+        return bool(self._blocks(profile, other) or self._blocks(other, profile))
+
+
+class EnvironmentRule(Rule):
+    """Blocks an animal from an enclosure when allowed(profile, environment) is false"""
+
+    def __init__(self, name, allowed, message="{animal} cannot live in {enclosure} ({rule})"):
+        super().__init__(name, message)
+        self._allowed = allowed
+
+    def allows(self, profile, environment):
+        return bool(self._allowed(profile, environment))
+
+
+#the rule enclosures have always used: one species per enclosure
+SAME_SPECIES = PairRule("same_species", lambda a, b: a.species != b.species,
+                        "{animal} is not compatible with the species in {enclosure}")
+PREDATOR_PREY = PairRule("predator_prey", lambda a, b: a.diet == "Carnivore" and b.diet != "Carnivore",
+                         "{animal} would be living with a predator or prey in {enclosure}")
+VENOMOUS_APART = PairRule("venomous_apart", lambda a, b: a.venomous and a.species != b.species,
+                          "{animal} cannot share {enclosure} with a venomous species")
+JUVENILES_SAFE = PairRule("juveniles_safe",
+                          lambda a, b: a.age_group == "Juvenile" and b.diet == "Carnivore" and b.age_group != "Juvenile",
+                          "{animal} would be with an adult carnivore in {enclosure}")
+FLIERS_IN_AVIARY = EnvironmentRule("fliers_in_aviary", lambda a, env: not a.can_fly or env == "Aviary",
+                                   "{animal} can fly so it needs an aviary, not {enclosure}")
+HABITAT = EnvironmentRule("habitat", lambda a, env: env in HABITATS.get(a.animal_type, (env,)),
+                          "{animal} cannot live in the environment of {enclosure}")
+
+#rules that can be named in a snapshot, keyed by rule name
+RULES = {rule.get_name(): rule for rule in (SAME_SPECIES, PREDATOR_PREY, VENOMOUS_APART, JUVENILES_SAFE,
+                                            FLIERS_IN_AVIARY, HABITAT)}
+
+DEFAULT_RULES = [SAME_SPECIES]
+STANDARD_RULES = [HABITAT, FLIERS_IN_AVIARY, PREDATOR_PREY, VENOMOUS_APART, JUVENILES_SAFE]
+
+
+def register_rule(rule):
+    """Allow a zoo using a new rule to be saved and loaded (rules are saved by name)"""
+    RULES[rule.get_name()] = rule
+    return rule
+
+
+def rules_named(names):
+    """Return the rules with the given names, see register_rule"""
+    missing = [name for name in names if name not in RULES]
+    if missing:
+        raise ValueError(f"Unknown compatibility rules {missing}, register them or pass the rules in")
+    return [RULES[name] for name in names]
+
+
+class RuleBook:
+    """A list of rules compiled into two lookup tables
+    Every animal is reduced to a Profile and every enclosure to its environment, each given a
+    small integer code. The rules are run once per (profile, environment) and (profile, profile)
+    pair and the number of the first rule that blocks it is kept in a matrix, so checking a
+    placement is array indexing instead of running rules. New profiles or environments are
+    compiled in the first time they are seen.
+    Rules are numbered from 1 in the order given, the first one that blocks a move is reported."""
+
+    def __init__(self, rules=None):
+        self._rules = list(DEFAULT_RULES if rules is None else rules)
+        if len(self._rules) >= _ALLOWED:
+            raise ValueError("Too many rules")
+        self._pair_rules = [(number, rule) for number, rule in enumerate(self._rules, 1)
+                            if isinstance(rule, PairRule)]
+        self._env_rules = [(number, rule) for number, rule in enumerate(self._rules, 1)
+                           if isinstance(rule, EnvironmentRule)]
+        self._profiles = []
+        self._profile_codes = {}  #profile key -> code
+        self._environments = []
+        self._environment_codes = {}
+        #first blocking rule number, or _ALLOWED
+        self._pair = np.full((0, 0), _ALLOWED, dtype=np.int16)
+        self._env = np.full((0, 0), _ALLOWED, dtype=np.int16)
+        self._pair_rows = []  #the same matrices as lists for checking one move at a time
+        self._env_rows = []
+        #new codes are only handed out once the matrices include them, one compile at a time
+        self._lock = threading.Lock()
+
+    def get_rules(self):
+        return list(self._rules)
+
+    def get_rule(self, number):
+        """Return the rule with the given number (as found in check_batch results), None for 0"""
+        return self._rules[number - 1] if number else None
+
+    def get_profile_count(self):
+        return len(self._profiles)
+
+    #compiling
+    def profile_code(self, animal):
+        key = Profile.key_of(animal)
+        code = self._profile_codes.get(key)
+        if code is None:
+            with self._lock:
+                code = self._profile_codes.get(key)
+                if code is None:
+                    self._profiles.append(Profile(*key))
+                    self._compile()
+                    code = self._profile_codes[key] = len(self._profiles) - 1
+        return code
+
+    def environment_code(self, environment):
+        code = self._environment_codes.get(environment)
+        if code is None:
+            with self._lock:
+                code = self._environment_codes.get(environment)
+                if code is None:
+                    self._environments.append(environment)
+                    self._compile()
+                    code = self._environment_codes[environment] = len(self._environments) - 1
+        return code
+
+    def _compile(self):
+        profiles = self._profiles
+        pair = np.full((len(profiles), len(profiles)), _ALLOWED, dtype=np.int16)
+        old = self._pair.shape[0]
+        pair[:old, :old] = self._pair
+        for i, profile in enumerate(profiles):
+            #only pairs with a new profile need working out
+            for j in range(max(i, old), len(profiles)):
+                pair[i, j] = pair[j, i] = self._first_pair_rule(profile, profiles[j])
+
+        env = np.full((len(profiles), len(self._environments)), _ALLOWED, dtype=np.int16)
+        rows, columns = self._env.shape
+        env[:rows, :columns] = self._env
+        for i, profile in enumerate(profiles):
+            for j, environment in enumerate(self._environments):
+                if i >= rows or j >= columns:
+                    env[i, j] = self._first_env_rule(profile, environment)
+        self._pair = pair
+        self._env = env
+        self._pair_rows = pair.tolist()
+        self._env_rows = env.tolist()
+
+    def _first_pair_rule(self, profile, other):
+        for number, rule in self._pair_rules:
+            if rule.blocks(profile, other):
+                return number
+        return _ALLOWED
+
+    def _first_env_rule(self, profile, environment):
+        for number, rule in self._env_rules:
+            if not rule.allows(profile, environment):
+                return number
+        return _ALLOWED
+
+    #checking
+    def first_rule(self, code, environment, present):
+        """Number of the first rule stopping profile code from living in environment (a code) with
+        the profile codes in present, 0 if none does (lookups only, nothing is compiled)"""
+        best = self._env_rows[code][environment]
+        row = self._pair_rows[code]
+        for other in present:
+            if row[other] < best:
+                best = row[other]
+        return 0 if best == _ALLOWED else best
+
+    def pair_rule(self, code, other):
+        """Number of the first rule stopping profile codes code and other living together, 0 if none"""
+        number = self._pair_rows[code][other]
+        return 0 if number == _ALLOWED else number
+
+    def check(self, animal, enclosure):
+        """Return the first rule that stops the animal moving into the enclosure, or None"""
+        code = self.profile_code(animal)
+        environment = self.environment_code(enclosure.get_environment())
+        present = set(self.profile_code(occupant) for occupant in enclosure.get_animals() if occupant is not animal)
+        return self.get_rule(self.first_rule(code, environment, present))
+
+    def check_batch(self, animals, enclosures):
+        """Check many candidate moves (animals[i] into enclosures[i]) in one go
+        Returns a NumPy array with the number of the first rule blocking each move (0 where the
+        move is allowed), see get_rule. Each move is checked against the animals already in the
+        enclosure, not the other animals of the batch."""
+        animals = list(animals)
+        enclosures = list(enclosures)
+        if len(animals) != len(enclosures):
+            raise ValueError("Need one enclosure per animal")
+        if not animals:
+            return np.zeros(0, dtype=np.int16)
+        #work out every code first, new profiles and environments grow the matrices
+        codes = np.fromiter((self.profile_code(animal) for animal in animals), dtype=np.int64, count=len(animals))
+        slots = {}  #enclosure -> row of the blocked matrix
+        groups = {}  #profiles living in an enclosure -> row, enclosures with the same mix share a row
+        for enclosure in enclosures:
+            if enclosure not in slots:
+                present = frozenset(self.profile_code(occupant) for occupant in enclosure.get_animals())
+                slots[enclosure] = groups.setdefault(present, len(groups))
+        rows = np.fromiter((slots[enclosure] for enclosure in enclosures), dtype=np.int64, count=len(enclosures))
+        environments = np.fromiter((self.environment_code(enclosure.get_environment()) for enclosure in enclosures),
+                                   dtype=np.int64, count=len(enclosures))
+
+        #first pair rule against any occupant: min over the occupied columns of each profile's row
+        pair = self._pair
+        blocked = np.full((len(groups), len(self._profiles)), _ALLOWED, dtype=np.int16)
+        for present, row in groups.items():
+            if present:
+                blocked[row] = pair[:, sorted(present)].min(axis=1)
+        result = np.minimum(blocked[rows, codes], self._env[codes, environments])
+        result[result == _ALLOWED] = 0
+        return result
+
+    def explain_batch(self, animals, enclosures):
+        """Like check_batch but returns (animal, enclosure, reason) for each blocked move"""
+        animals = list(animals)
+        enclosures = list(enclosures)
+        result = self.check_batch(animals, enclosures)
+        return [(animals[i], enclosures[i], self._rules[result[i] - 1].describe(animals[i], enclosures[i]))
+                for i in np.flatnonzero(result)]
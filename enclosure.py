@@ -7,6 +7,7 @@ Username: patdy092
 This is my own work as defined by the University's Academic Integrity Policy.
 """
 from animal import Animal
+from locking import NO_LOCK
 
 
 class Enclosure:
@@ -20,6 +21,37 @@ class Enclosure:
         self._cleanliness_lvl = 100
         self._compatible_species = None
         self._animals = []
+        #(version, tuple of the animals) handed out by get_animals until the next move
+        self._view = None
+        self._locks = None #LockStripes shared by a thread-safe zoo (see locking.py)
+        self._rules = None #RuleBook of a zoo with compatibility rules (see compatibility.py)
+        self._watchers = () #objects told when animals move in or out (e.g. the zoo)
+        self._version = 0 #bumped on every change so the cached status knows when to rebuild
+        self._status = None #(version, status string) of the last status built
+
+    #watchers must have animal_moved(enclosure, animal, added) and enclosure_changed(enclosure) methods
+    def add_watcher(self, watcher):
+        if watcher not in self._watchers:
+            self._watchers = self._watchers + (watcher,)
+
+    def remove_watcher(self, watcher):
+        self._watchers = tuple(w for w in self._watchers if w is not watcher)
+
+    #set by a thread-safe zoo so moves and cleaning lock this enclosure (and the animal moving)
+    def set_locks(self, locks):
+        self._locks = locks
+
+    #set by a zoo with compatibility rules, which then replace the one species per enclosure check
+    def set_rules(self, rules):
+        self._rules = rules
+
+    def get_rules(self):
+        return self._rules
+
+    def _hold(self):
+        if self._locks is None:
+            return NO_LOCK
+        return self._locks.hold(self)
 
     #define getters to access private attributes
     def get_enclosure_id(self):
@@ -37,64 +69,138 @@ class Enclosure:
     def get_cleanliness_lvl(self):
         return self._cleanliness_lvl
 
+    def get_compatible_species(self):
+        return self._compatible_species
+
+    def get_remaining_capacity(self):
+        return max(0, self._capacity - len(self._animals))
+
     def get_animals(self):
-        return self._animals.copy()
+        """Return a tuple of the animals living here
+        The same tuple is returned until an animal moves in or out, so reading it copies nothing
+        and it can't be used to change the enclosure. Thread-safe without a lock: it is stored
+        with the version read before it was built, so one built during a move is never reused."""
+        view = self._view
+        version = self._version
+        if view is None or view[0] != version:
+            view = self._view = (version, tuple(self._animals))
+        return view[1]
 
     def animal_count(self):
         return len(self._animals)
 
+    def get_version(self):
+        return self._version
+
     #Define method to ge the status of the enclosure
     def get_enclosure_status(self):
-        """Return detailed status of enclosure and its attributes"""
+        """Return detailed status of enclosure and its attributes
+        The string is kept until the enclosure next changes."""
+        if self._status is not None and self._status[0] == self._version:
+            return self._status[1]
         status = f"Enclosure ID: {self._enc_id}\n"
         status += f"Size: {self._size}\n"
         status += f"Environment: {self._environment}\n"
-        status += f"Capacity %: {self.animal_count()}/{self._capacity}\n"
+        animals = self.get_animals()
+        status += f"Capacity %: {len(animals)}/{self._capacity}\n"
         status += f"Cleanliness level: {self._cleanliness_lvl}\n"
 
-        if self._animals:
+        if animals:
             status += f"Species: {self._compatible_species}\n"
-            status += f"Animals: {self._animals}\n"
+            status += f"Animals: {list(animals)}\n"
         else:
             status += f"Animals: None\n"
 
+        self._status = (self._version, status)
         return status
 
 
     #define methods to add and remove animals from enclosure
-    def add_animal(self, animal):
-        """Add an animal to the enclosure, checking compatibility, capacity and treatment status"""
-
+    def can_accept(self, animal):
+        """Check capacity, treatment status and compatibility without raising
+        Returns None if the animal can move in, otherwise the reason it can't"""
         if self.animal_count() >= self._capacity:
-            raise ValueError(f"Enclosure = {self._enc_id} is full!")
+            return f"Enclosure = {self._enc_id} is full!"
 
         if animal.get_treatment_status():
-            raise ValueError(f"Cannot move {animal} who is under treatment")
+            return f"Cannot move {animal} who is under treatment"
+
+        if self._rules is not None:
+            rule = self._rules.check(animal, self)
+            return None if rule is None else rule.describe(animal, self)
+
+        if self._compatible_species is not None and self._compatible_species != animal.get_species():
+            return f"Cannot move {animal} who is not compatible with {self._compatible_species}"
+        return None
+
+    def add_animal(self, animal):
+        """Add an animal to the enclosure, checking compatibility, capacity and treatment status
+        In a thread-safe zoo the checks and the move happen under the enclosure's and the animal's locks."""
+        if self._locks is None:
+            return self._add_animal(animal)
+        with self._locks.hold(self, animal):
+            return self._add_animal(animal)
+
+    def _add_animal(self, animal):
+        #moving between enclosures goes through remove_animal first (or Zoo.transfer_animal), so
+        #can_accept leaves this out and can still be asked about an animal that is being moved
+        if animal.get_enclosure() is not None:
+            raise ValueError(f"{animal} is already in {animal.get_enclosure()}")
+        reason = self.can_accept(animal)
+        if reason is not None:
+            raise ValueError(reason)
 
         if self._compatible_species is None:
             self._compatible_species= animal.get_species()
-        elif self._compatible_species != animal.get_species():
-            raise ValueError(f"Cannot move {animal} who is not compatible with {self._compatible_species}")
 
         self._animals.append(animal)
+        self._moved(animal, self)
         return True
 
     def remove_animal(self, animal):
+        if self._locks is None:
+            return self._remove_animal(animal)
+        with self._locks.hold(self, animal):
+            return self._remove_animal(animal)
+
+    def _remove_animal(self, animal):
         if animal in self._animals:
             self._animals.remove(animal)
-            if len(self._compatible_species) == 0:
+            if not self._animals:
                 self._compatible_species = None
+            self._moved(animal, None)
             return True
         return False
 
+    def _moved(self, animal, enclosure):
+        self._version += 1
+        animal.set_enclosure(enclosure)
+        for watcher in self._watchers:
+            watcher.animal_moved(self, animal, enclosure is not None)
+
 
-    #clean enclosure by inc cleanliness level
+    #clean enclosure by inc cleanliness level (up to 100)
     def clean_enclosure(self, amount = 10):
-        self._cleanliness_lvl += min(100, self._cleanliness_lvl + amount)
+        with self._hold():
+            self._cleanliness_lvl = min(100, self._cleanliness_lvl + amount)
+            self._changed()
 
-    #enclosure gets dirty overtime and cleanliness decreases
+    #enclosure gets dirty overtime and cleanliness decreases (down to 0)
     def dec_cleanliness(self, amount = 5):
-        self._cleanliness_lvl -= max(0, self._cleanliness_lvl - amount)
+        with self._hold():
+            self._cleanliness_lvl = max(0, self._cleanliness_lvl - amount)
+            self._changed()
+
+    #used to write back levels worked out elsewhere (e.g. by the upkeep simulator)
+    def set_cleanliness_lvl(self, level):
+        with self._hold():
+            self._cleanliness_lvl = min(100, max(0, level))
+            self._changed()
+
+    def _changed(self):
+        self._version += 1
+        for watcher in self._watchers:
+            watcher.enclosure_changed(self)
 
     #define string method enclosure
     def __str__(self):
@@ -0,0 +1,194 @@
+"""
+File: events.py
+Description: Typed change events and an event bus that hands them to subscribers in batches
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from contextlib import contextmanager, nullcontext
+import threading
+
+#returned by batch() when there is nobody to batch for
+NO_BATCH = nullcontext()
+
+
+class ZooEvent:
+    """Base class of every change event"""
+    __slots__ = ()
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class AnimalAdded(ZooEvent):
+    __slots__ = ("animal", "animal_id")
+
+    def __init__(self, animal, animal_id):
+        self.animal = animal
+        self.animal_id = animal_id
+
+
+class AnimalRemoved(ZooEvent):
+    __slots__ = ("animal", "animal_id")
+
+    def __init__(self, animal, animal_id):
+        self.animal = animal
+        self.animal_id = animal_id
+
+
+class AnimalChanged(ZooEvent):
+    """The animal itself changed (e.g. its age), not one of its records"""
+    __slots__ = ("animal",)
+
+    def __init__(self, animal):
+        self.animal = animal
+
+
+class AnimalMoved(ZooEvent):
+    """An animal moved into (added is True) or out of an enclosure"""
+    __slots__ = ("enclosure", "animal", "added")
+
+    def __init__(self, enclosure, animal, added):
+        self.enclosure = enclosure
+        self.animal = animal
+        self.added = added
+
+
+class EnclosureAdded(ZooEvent):
+    __slots__ = ("enclosure", "enclosure_id")
+
+    def __init__(self, enclosure, enclosure_id):
+        self.enclosure = enclosure
+        self.enclosure_id = enclosure_id
+
+
+class EnclosureRemoved(ZooEvent):
+    __slots__ = ("enclosure", "enclosure_id")
+
+    def __init__(self, enclosure, enclosure_id):
+        self.enclosure = enclosure
+        self.enclosure_id = enclosure_id
+
+
+class EnclosureChanged(ZooEvent):
+    """An enclosure was cleaned or got dirtier, cleanliness is the new level"""
+    __slots__ = ("enclosure", "cleanliness")
+
+    def __init__(self, enclosure, cleanliness):
+        self.enclosure = enclosure
+        self.cleanliness = cleanliness
+
+
+class RecordChanged(ZooEvent):
+    """A health record was added or changed
+    change is "added", "status", "severity", "plan" or "note" (see Animal.update_record_index)"""
+    __slots__ = ("record", "change")
+
+    def __init__(self, record, change):
+        self.record = record
+        self.change = change
+
+
+class EventBus:
+    """Hands change events to subscribers as batches (lists) instead of one call per change
+    Inside a batch() block events are held back and handed over together when the outermost
+    block ends, so a bulk operation (e.g. Zoo.add_animals) is one callback per subscriber.
+    Outside a block every event is its own batch, unless auto_flush is False: then events wait
+    for flush(), e.g. once per tick of a dashboard refresh loop.
+    Nothing is kept while there are no subscribers, so an unused bus costs one check per change.
+    Batches belong to the thread that opened them (each thread has its own depth and held events)
+    and the shared pending list is locked, so threads of a thread-safe zoo can share one bus."""
+
+    def __init__(self, auto_flush=True):
+        self._auto_flush = auto_flush
+        self._subscribers = {}  #callback -> tuple of event types it wants, or None for all
+        self._pending = []  #events waiting for flush(), guarded by _lock
+        self._lock = threading.Lock()
+        self._local = threading.local()  #per thread: depth, held (events of the open batch), flushing
+
+    def subscribe(self, callback, event_types=None):
+        """Call callback(events) with every batch of events (only the given types, if any)"""
+        if event_types is not None:
+            event_types = tuple(event_types)
+        self._subscribers[callback] = event_types
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers.pop(callback, None)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def get_pending(self):
+        """Return the events waiting for flush() and those held by this thread's open batch"""
+        with self._lock:
+            pending = list(self._pending)
+        return pending + getattr(self._local, "held", [])
+
+    def emit(self, event):
+        if not self._subscribers:
+            return
+        local = self._local
+        if getattr(local, "depth", 0):
+            local.held.append(event)
+            return
+        with self._lock:
+            self._pending.append(event)
+        if self._auto_flush:
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Hold this thread's events back until the with block (the outermost one, if nested) ends"""
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if not depth:
+            local.held = []
+        local.depth = depth + 1
+        try:
+            yield self
+        finally:
+            local.depth = depth
+            if not depth:
+                held, local.held = local.held, []
+                if held:
+                    with self._lock:
+                        self._pending.extend(held)
+        if not depth and self._auto_flush:
+            self.flush()
+
+    def flush(self):
+        """Hand every pending event to the subscribers and return how many there were
+        Changes made by a subscriber while it handles a batch are handed out as the next batch.
+        If a subscriber raises, the others still get the batch and the first error is raised after."""
+        local = self._local
+        if getattr(local, "flushing", False):
+            return 0
+        local.flushing = True
+        dispatched = 0
+        error = None
+        try:
+            while True:
+                with self._lock:
+                    events = self._pending
+                    self._pending = []
+                if not events:
+                    break
+                dispatched += len(events)
+                for callback, event_types in list(self._subscribers.items()):
+                    wanted = events if event_types is None else [event for event in events
+                                                                 if isinstance(event, event_types)]
+                    if not wanted:
+                        continue
+                    try:
+                        callback(wanted)
+                    except Exception as exc:
+                        if error is None:
+                            error = exc
+        finally:
+            local.flushing = False
+        if error is not None:
+            raise error
+        return dispatched
@@ -0,0 +1,269 @@
+"""
+File: health_analytics.py
+Description: Columnar NumPy export of the zoo's health records with vectorised grouped statistics
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from datetime import datetime
+import re
+
+import numpy as np
+
+from health_system import HealthRecord, IssueType
+
+ISSUE_TYPES = [IssueType.INJURY, IssueType.ILLNESS, IssueType.MENTAL, IssueType.ROUTINE_CHECKUP, IssueType.OTHER]
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 86400.0
+#note written by HealthRecord.update_severity
+_SEVERITY_NOTE = re.compile(r"^Severity updated from (\w+) to (\w+)")
+
+#name, dtype and fill value of every column
+COLUMNS = [
+    ("animal_id", np.int64, -1),
+    ("species", np.int32, -1),
+    ("type", np.int32, -1),
+    ("issue_type", np.int8, -1),
+    ("severity", np.int8, -1),
+    ("status", np.int8, -1),
+    ("recorded", np.float64, np.nan),
+    ("resolved", np.float64, np.nan),
+    ("escalations", np.int16, 0),
+    ("alive", np.bool_, False),
+]
+
+
+def _seconds(value):
+    #wall clock seconds since 1970 (dates are naive, so months are grouped as they were written)
+    return np.nan if value is None else (value - _EPOCH).total_seconds()
+
+
+def count_escalations(record):
+    """Number of times a record's severity was raised, read from its update_severity notes"""
+    levels = HealthRecord.SEVERITY_LVLS
+    count = 0
+    for entry in record.get_notes():
+        match = _SEVERITY_NOTE.match(entry['note'])
+        if match and match.group(1) in levels and match.group(2) in levels:
+            if levels.index(match.group(2)) > levels.index(match.group(1)):
+                count += 1
+    return count
+
+
+class HealthAnalytics:
+    """Health records of a zoo exported to NumPy columns, one row per record
+    Strings (species, animal type, issue type, severity, status) are stored as small integer
+    codes so every statistic is a handful of whole-array operations (bincount, masks) instead
+    of a loop over HealthRecord objects.
+    The zoo marks records as changed through mark(); refresh() (called by every query) only
+    rewrites those rows, so the columns never need a full re-export."""
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._columns = {name: np.full(capacity, fill, dtype=dtype) for name, dtype, fill in COLUMNS}
+        self._rows = {}  #record -> row
+        self._pending = {}  #records to (re)write on the next refresh, in the order they changed
+        self._removed = []  #records to drop on the next refresh
+        self._species = []
+        self._species_codes = {}
+        self._types = []
+        self._type_codes = {}
+        self._zoo = None
+
+    @classmethod
+    def from_zoo(cls, zoo):
+        """Export every health record of the zoo"""
+        records = [record for animal in zoo.get_animal_registry() for record in animal.get_health_record()]
+        analytics = cls(max(1024, len(records)))
+        analytics._zoo = zoo
+        analytics.mark_many(records)
+        analytics.refresh()
+        return analytics
+
+    @classmethod
+    def from_columns(cls, columns, species, types):
+        """Build from columns exported earlier with export_columns() (or generated elsewhere)
+        species and types are the names the species/type codes refer to."""
+        size = len(columns["recorded"])
+        analytics = cls(max(1024, size))
+        for name, dtype, fill in COLUMNS:
+            if name == "alive":
+                analytics._columns[name][:size] = columns.get(name, True)
+            elif name in columns:
+                analytics._columns[name][:size] = np.asarray(columns[name], dtype=dtype)
+        analytics._size = size
+        analytics._species = list(species)
+        analytics._species_codes = {name: code for code, name in enumerate(species)}
+        analytics._types = list(types)
+        analytics._type_codes = {name: code for code, name in enumerate(types)}
+        return analytics
+
+    def __len__(self):
+        self.refresh()
+        return int(np.count_nonzero(self._columns["alive"][:self._size]))
+
+    #define methods to keep the columns in step with the zoo
+    def mark(self, record):
+        """Note that a record was added or changed, its row is written on the next refresh"""
+        self._pending[record] = None
+
+    def mark_many(self, records):
+        for record in records:
+            self._pending[record] = None
+
+    def mark_removed(self, record):
+        self._pending.pop(record, None)
+        self._removed.append(record)
+
+    def refresh(self):
+        """Write the rows of the records marked since the last refresh"""
+        for record in self._removed:
+            row = self._rows.pop(record, None)
+            if row is not None:
+                self._columns["alive"][row] = False
+        self._removed.clear()
+        if not self._pending:
+            return 0
+
+        records = list(self._pending)
+        self._pending.clear()
+        rows = np.empty(len(records), dtype=np.int64)
+        for i, record in enumerate(records):
+            row = self._rows.get(record)
+            if row is None:
+                row = self._rows[record] = self._next_row()
+            rows[i] = row
+        self._write(rows, records)
+        return len(records)
+
+    def _next_row(self):
+        if self._size == len(self._columns["alive"]):
+            for name, dtype, fill in COLUMNS:
+                grown = np.full(self._size * 2, fill, dtype=dtype)
+                grown[:self._size] = self._columns[name][:self._size]
+                self._columns[name] = grown
+        self._size += 1
+        return self._size - 1
+
+    def _code(self, value, names, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _write(self, rows, records):
+        severities = {level: code for code, level in enumerate(HealthRecord.SEVERITY_LVLS)}
+        statuses = {status: code for code, status in enumerate(HealthRecord.STATUS_OPTIONS)}
+        issues = {issue: code for code, issue in enumerate(ISSUE_TYPES)}
+        zoo = self._zoo
+        animal_ids, species, types, issue_types, severity, status, recorded, resolved, escalations = \
+            [], [], [], [], [], [], [], [], []
+        for record in records:
+            animal = record.get_animal()
+            animal_id = zoo.get_animal_id(animal) if zoo is not None else None
+            animal_ids.append(-1 if animal_id is None else animal_id)
+            species.append(self._code(animal.get_species(), self._species, self._species_codes))
+            types.append(self._code(animal.get_animal_type(), self._types, self._type_codes))
+            issue_types.append(issues.get(record.get_issue_type(), issues[IssueType.OTHER]))
+            severity.append(severities[record.get_severity()])
+            status.append(statuses[record.get_status()])
+            recorded.append(_seconds(record.get_date_recorded()))
+            resolved.append(_seconds(record.get_resolution_date()))
+            escalations.append(count_escalations(record))
+        columns = self._columns
+        columns["animal_id"][rows] = animal_ids
+        columns["species"][rows] = species
+        columns["type"][rows] = types
+        columns["issue_type"][rows] = issue_types
+        columns["severity"][rows] = severity
+        columns["status"][rows] = status
+        columns["recorded"][rows] = recorded
+        columns["resolved"][rows] = resolved
+        columns["escalations"][rows] = escalations
+        columns["alive"][rows] = True
+
+    def export_columns(self):
+        """Return copies of the columns (rows of removed records left out)"""
+        self.refresh()
+        alive = self._columns["alive"][:self._size]
+        return {name: self._columns[name][:self._size][alive] for name, dtype, fill in COLUMNS if name != "alive"}
+
+    def get_species_names(self):
+        return list(self._species)
+
+    def get_type_names(self):
+        return list(self._types)
+
+    #define the grouped statistics
+    def _group(self, by):
+        """Return (codes of the live rows, names of the groups) for a column to group by"""
+        self.refresh()
+        alive = self._columns["alive"][:self._size]
+        if by == "species":
+            names = self._species
+        elif by == "type":
+            names = self._types
+        elif by == "issue_type":
+            names = ISSUE_TYPES
+        elif by == "severity":
+            names = HealthRecord.SEVERITY_LVLS
+        elif by == "status":
+            names = HealthRecord.STATUS_OPTIONS
+        else:
+            raise ValueError(f"Cannot group by {by}")
+        return self._columns[by][:self._size], alive, names
+
+    def count_by(self, by):
+        """Number of records in each group, e.g. count_by("severity")"""
+        codes, alive, names = self._group(by)
+        counts = np.bincount(codes[alive], minlength=len(names))
+        return {name: int(counts[code]) for code, name in enumerate(names) if counts[code]}
+
+    def mean_resolution_days(self, by="species"):
+        """Mean days from recorded to resolved for the resolved records of each group"""
+        codes, alive, names = self._group(by)
+        recorded = self._columns["recorded"][:self._size]
+        resolved = self._columns["resolved"][:self._size]
+        #a reopened record keeps its old resolution date, so check the status too
+        status = self._columns["status"][:self._size]
+        done = alive & (status == HealthRecord.STATUS_OPTIONS.index("Resolved")) & ~np.isnan(resolved)
+        days = (resolved[done] - recorded[done]) / _SECONDS_PER_DAY
+        totals = np.bincount(codes[done], weights=days, minlength=len(names))
+        counts = np.bincount(codes[done], minlength=len(names))
+        return {name: float(totals[code] / counts[code]) for code, name in enumerate(names) if counts[code]}
+
+    def incidents_per_month(self, by="issue_type"):
+        """Records reported per calendar month and group as {(month "YYYY-MM", group): count}"""
+        codes, alive, names = self._group(by)
+        recorded = self._columns["recorded"][:self._size][alive]
+        if not len(recorded):
+            return {}
+        months = recorded.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        first = int(months.min())
+        span = int(months.max()) - first + 1
+        #one bincount over (month, group) pairs flattened into a single index
+        flat = (months - first) * len(names) + codes[alive]
+        counts = np.bincount(flat, minlength=span * len(names)).reshape(span, len(names))
+        result = {}
+        for month, code in zip(*np.nonzero(counts)):
+            label = str(np.datetime64(first + int(month), "M"))
+            result[(label, names[code])] = int(counts[month, code])
+        return result
+
+    def escalation_rate(self, by="species"):
+        """Severity escalations per record in each group (from the update_severity notes)"""
+        codes, alive, names = self._group(by)
+        escalations = self._columns["escalations"][:self._size][alive]
+        totals = np.bincount(codes[alive], weights=escalations, minlength=len(names))
+        counts = np.bincount(codes[alive], minlength=len(names))
+        return {name: float(totals[code] / counts[code]) for code, name in enumerate(names) if counts[code]}
+
+    def escalated_share(self, by="species"):
+        """Share of records in each group whose severity was raised at least once"""
+        codes, alive, names = self._group(by)
+        escalated = self._columns["escalations"][:self._size][alive] > 0
+        hits = np.bincount(codes[alive][escalated], minlength=len(names))
+        counts = np.bincount(codes[alive], minlength=len(names))
+        return {name: float(hits[code] / counts[code]) for code, name in enumerate(names) if counts[code]}
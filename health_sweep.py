@@ -0,0 +1,193 @@
+"""
+File: health_sweep.py
+Description: Zoo-wide health check sweep that shards the animals across a process pool and merges the results
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+from health_system import HealthRecord
+
+#animals of the sweep a forked worker belongs to (only ever set inside the worker by _share_animals,
+#the parent never touches it, so sweeps running at the same time cannot see each other's animals)
+_SHARED_ANIMALS = None
+
+
+class AnimalFinding:
+    """Result of the health check of one animal that has active issues"""
+
+    def __init__(self, animal_id, name, total_records, active, severe, active_by_severity):
+        self._animal_id = animal_id
+        self._name = name
+        self._total_records = total_records
+        self._active = active
+        self._severe = severe
+        self._active_by_severity = active_by_severity
+
+    def get_animal_id(self):
+        return self._animal_id
+
+    def get_name(self):
+        return self._name
+
+    def get_total_records(self):
+        return self._total_records
+
+    def get_active_count(self):
+        return self._active
+
+    def get_severe_count(self):
+        return self._severe
+
+    def get_active_by_severity(self):
+        return dict(self._active_by_severity)
+
+    def needs_treatment(self):
+        return self._severe > 0
+
+    def as_tuple(self):
+        return (self._animal_id, self._name, self._total_records, self._active, self._severe,
+                tuple(sorted(self._active_by_severity.items())))
+
+    def __eq__(self, other):
+        if not isinstance(other, AnimalFinding):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __str__(self):
+        return (f"{self._name} (ID {self._animal_id}): {self._active} active issue(s), "
+                f"{self._severe} High/Critical, {self._total_records} record(s) in history")
+
+
+class SweepSummary:
+    """Merged result of a zoo-wide health sweep"""
+
+    def __init__(self, animals_checked, records_scanned, findings, counts_by_severity):
+        self._animals_checked = animals_checked
+        self._records_scanned = records_scanned
+        self._findings = findings
+        self._counts_by_severity = counts_by_severity
+
+    def get_animals_checked(self):
+        return self._animals_checked
+
+    def get_records_scanned(self):
+        return self._records_scanned
+
+    def get_findings(self):
+        return list(self._findings)
+
+    def get_counts_by_severity(self):
+        """Active records per severity level across the zoo"""
+        return dict(self._counts_by_severity)
+
+    def get_animals_needing_treatment(self):
+        return [finding.get_animal_id() for finding in self._findings if finding.needs_treatment()]
+
+    def __eq__(self, other):
+        if not isinstance(other, SweepSummary):
+            return NotImplemented
+        return (self._animals_checked == other._animals_checked
+                and self._records_scanned == other._records_scanned
+                and self._findings == other._findings
+                and self._counts_by_severity == other._counts_by_severity)
+
+    def __str__(self):
+        counts = ", ".join(f"{level} = {self._counts_by_severity[level]}" for level in HealthRecord.SEVERITY_LVLS)
+        return (f"Health Sweep:\n"
+                f"Animals checked = {self._animals_checked}\n"
+                f"Records scanned = {self._records_scanned}\n"
+                f"Animals with active issues = {len(self._findings)}\n"
+                f"Animals needing treatment = {len(self.get_animals_needing_treatment())}\n"
+                f"Active issues by severity: {counts}\n")
+
+
+def _check_rows(rows):
+    """Health check of a shard given as (animal_id, name, [(severity, status), ...]) rows
+    Walks every record of every animal like Vet.conduct_health_check does for one animal.
+    Returns (animals_checked, records_scanned, findings, counts_by_severity) as plain values."""
+    counts = dict.fromkeys(HealthRecord.SEVERITY_LVLS, 0)
+    severe_levels = HealthRecord.SEVERE_LVLS
+    findings = []
+    scanned = 0
+    checked = 0
+    for animal_id, name, records in rows:
+        checked += 1
+        scanned += len(records)
+        active = 0
+        severe = 0
+        by_severity = {}
+        for severity, status in records:
+            if status != "Resolved":
+                active += 1
+                by_severity[severity] = by_severity.get(severity, 0) + 1
+                if severity in severe_levels:
+                    severe += 1
+        if active:
+            findings.append((animal_id, name, len(records), active, severe, by_severity))
+            for severity, count in by_severity.items():
+                counts[severity] += count
+    return checked, scanned, findings, counts
+
+
+def _animal_rows(animals_with_ids):
+    for animal_id, animal in animals_with_ids:
+        yield (animal_id, animal.get_name(),
+               [(record.get_severity(), record.get_status()) for record in animal.get_health_record()])
+
+
+def _share_animals(animals):
+    #pool initializer: with fork the initargs are inherited through copy-on-write memory, not pickled
+    global _SHARED_ANIMALS
+    _SHARED_ANIMALS = animals
+
+
+def _check_shared_shard(bounds):
+    #runs in a forked worker: read the shard straight out of the inherited animal list
+    start, end = bounds
+    return _check_rows(_animal_rows(_SHARED_ANIMALS[start:end]))
+
+
+def _merge(parts):
+    counts = dict.fromkeys(HealthRecord.SEVERITY_LVLS, 0)
+    findings = []
+    checked = 0
+    scanned = 0
+    for part_checked, part_scanned, part_findings, part_counts in parts:
+        checked += part_checked
+        scanned += part_scanned
+        findings.extend(AnimalFinding(*finding) for finding in part_findings)
+        for severity, count in part_counts.items():
+            counts[severity] += count
+    return SweepSummary(checked, scanned, findings, counts)
+
+
+def sweep(zoo, workers=None, shards_per_worker=4):
+    """Run the health check over every animal in zoo and return a SweepSummary
+    workers=1 runs in this process, otherwise the animals are split into shards that are checked by
+    a pool of worker processes. Shards are merged in order so the result is identical either way."""
+    registry = zoo.get_animal_registry()
+    animals = [(registry.get_id(animal), animal) for animal in registry]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(animals) < 2:
+        return _merge([_check_rows(_animal_rows(animals))])
+
+    shard_count = min(len(animals), workers * shards_per_worker)
+    step = -(-len(animals) // shard_count)
+    bounds = [(start, min(start + step, len(animals))) for start in range(0, len(animals), step)]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        #forked workers inherit the animals, only the shard bounds and the plain results are pickled
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                                 initializer=_share_animals, initargs=(animals,)) as pool:
+            parts = list(pool.map(_check_shared_shard, bounds))
+    else:
+        #without fork the shards are sent to the workers as plain rows
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_check_rows, [list(_animal_rows(animals[start:end])) for start, end in bounds]))
+    return _merge(parts)
@@ -10,6 +10,9 @@ from animal import Animal
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+from events import NO_BATCH
+from pagination import page_list
+
 class IssueType:
     """Constants for the different health issues"""
     INJURY = "Injury"
@@ -23,7 +26,8 @@ class HealthRecord:
      Attributes:
         _animal, _issue_type (str), """
 
-    SEVERITY_LVLS = ["low", "medium", "high", "critical"]
+    SEVERITY_LVLS = ["Low", "Medium", "High", "Critical"]
+    SEVERE_LVLS = ["High", "Critical"]
     STATUS_OPTIONS = ["Active", "Monitoring", "Resolved"]
 
 
@@ -46,6 +50,8 @@ class HealthRecord:
         self._notes = []
         self._status = "Active"
         self._resolution_date = None
+        self._recorded = False #True once added to the animal's health record
+        self._position = None #position in the animal's health record list
 
 
     #define the getters for the private attributes
@@ -79,46 +85,88 @@ class HealthRecord:
     def is_active(self):
         return self._status in ["Active", "Monitoring"]
 
+    def is_severe(self):
+        return self._severity in HealthRecord.SEVERE_LVLS
+
     def get_resolution_date(self):
         return self._resolution_date
 
+    def is_recorded(self):
+        return self._recorded
+
+    def get_position(self):
+        return self._position
+
+    #called by the animal when this record is added to its health record
+    def set_recorded(self, position):
+        self._recorded = True
+        self._position = position
+
+    #keep the animal's indexes (and anything watching the animal) in step with this record
+    #change is one of "status", "severity", "plan" or "note"
+    def _changed(self, change):
+        if self._recorded:
+            self._animal.update_record_index(self, change)
+
+    #a change plus the note about it reach the animal's watchers as one batch
+    def _batch(self):
+        return self._animal.batch() if self._recorded else NO_BATCH
+
 
     #set/define the treatment plans and notes per record
     def set_treatment_plan(self, t_plan):
         self._treatment_plan = t_plan
+        self._changed("plan")
 
-    def add_notes(self, note):
+    def add_notes(self, note, added_by=None):
+        #notes are credited to whoever recorded the issue unless someone else is given
         note_entry = {
             'date': datetime.now(),
             'note': note.strip(),
-            'added_by': self._recorded_by,}
+            'added_by': added_by if added_by is not None else self._recorded_by,}
         self._notes.append(note_entry)
+        self._changed("note")
 
     def set_status(self, new_status):
-        if new_status not in ["Active", "Monitoring", "Resolved"]:
+        if new_status not in HealthRecord.STATUS_OPTIONS:
             raise ValueError("Invalid Status")
         old_status = self._status
-        self._status = new_status
+        with self._batch():
+            self._status = new_status
 
-        #if resolved, then set the resolution date
-        if new_status == "Resolved" and self._resolution_date is None:
-            self._resolution_date = datetime.now()
+            #if resolved, then set the resolution date
+            if new_status == "Resolved" and self._resolution_date is None:
+                self._resolution_date = datetime.now()
+            self._changed("status")
 
-        #add note for resolution
-        self.add_notes(f"Status updated from {old_status} to {new_status}")
+            #add note for resolution
+            self.add_notes(f"Status updated from {old_status} to {new_status}")
 
     def resolve_issue(self, resolution_notes):
-        self._status = "Resolved"
-        self._resolution_date = datetime.now()
-        self.add_notes(f"Issue Resolved: {resolution_notes}")
+        with self._batch():
+            self._status = "Resolved"
+            self._resolution_date = datetime.now()
+            self._changed("status")
+            self.add_notes(f"Issue Resolved: {resolution_notes}")
 
     def update_severity(self, new_level, reason):
-        if new_level not in ["Low", "Medium", "High", "Critical"]:
+        if new_level not in HealthRecord.SEVERITY_LVLS:
             raise ValueError("Invalid Severity Level")
         old_severity = self._severity
-        self._severity = new_level
+        with self._batch():
+            self._severity = new_level
+            self._changed("severity")
+
+            self.add_notes(f"Severity updated from {old_severity} to {new_level} due to {reason}")
+
+    @staticmethod
+    def format_note(note_entry):
+        """One note as a line of text"""
+        return f"{note_entry['date'].strftime('%d-%m-%Y %H:%M')} ({note_entry['added_by']}): {note_entry['note']}"
 
-        self.add_notes(f"Severity updated from {old_severity} to {new_level} due to {reason}")
+    def get_notes_page(self, cursor=None, limit=20, reverse=False):
+        """Return a Page of this record's notes (oldest first, or newest first if reverse)"""
+        return page_list(self._notes, cursor, limit, reverse, HealthRecord.format_note)
 
     def get_time_since_reported(self):
         d = datetime.now() - self._date_recorded
@@ -147,7 +195,8 @@ class HealthRecord:
 
         if self._notes:
             report.append(f"Notes:\n")
-            report.append(f"{self._notes}\n")
+            for note_entry in self._notes:
+                report.append(f" - {HealthRecord.format_note(note_entry)}\n")
 
         return "".join(report)
 
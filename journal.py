@@ -0,0 +1,433 @@
+"""
+File: journal.py
+Description: Append-only write-ahead journal of zoo mutations with group commit, recovery and compaction
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+from enclosure import Enclosure
+import snapshot
+
+#every entry is framed as: 4 byte payload length, 4 byte crc32 of the payload, payload
+#the payload is a pickled tuple of plain values that starts with (lsn, kind)
+_FRAME = struct.Struct(">II")
+FSYNC_MODES = ["always", "batch", "never"]
+
+
+def read_entries(path):
+    """Return (entries, good_length) for a journal file
+    Reading stops at the first torn or corrupt frame (e.g. a crash half way through a write),
+    good_length is the size of the file up to the end of the last good entry."""
+    entries = []
+    good_length = 0
+    if not os.path.exists(path):
+        return entries, good_length
+    with open(path, "rb") as source:
+        data = source.read()
+    pos = 0
+    while pos + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, pos)
+        start = pos + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        entries.append(snapshot.plain_loads(payload))
+        pos = start + length
+        good_length = pos
+    return entries, good_length
+
+
+class Journal:
+    """Append-only journal that logs every zoo mutation as a small entry
+    Entries are buffered and written in groups (group commit): a group is written when batch_size
+    entries are waiting or every flush_interval seconds by a background thread, whichever is first.
+    fsync is "always" (write and fsync every entry), "batch" (fsync every group) or "never"."""
+
+    def __init__(self, path, batch_size=256, flush_interval=0.05, fsync="batch", next_lsn=None):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {FSYNC_MODES}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._path = path
+        self._batch_size = 1 if fsync == "always" else batch_size
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._lock = threading.RLock()
+        self._buffer = []
+        self._closed = False
+        self._compactor = None
+
+        #drop a torn tail left by a crash so new entries are appended after the last good one
+        entries, good_length = read_entries(path)
+        if next_lsn is None:
+            last = entries[-1][0] if entries else _last_lsn(path + ".old")
+            next_lsn = last + 1
+        self._next_lsn = next_lsn
+        self._file = open(path, "ab")
+        if self._file.tell() != good_length:
+            self._file.truncate(good_length)
+            self._file.seek(good_length)
+
+        self._wake = threading.Event()
+        self._flusher = None
+        if flush_interval and self._batch_size > 1:
+            self._flusher = threading.Thread(target=self._flush_loop, name="zoo-journal-flush", daemon=True)
+            self._flusher.start()
+
+    #define getters for the journal
+    def get_path(self):
+        return self._path
+
+    def get_next_lsn(self):
+        return self._next_lsn
+
+    def pending(self):
+        return len(self._buffer)
+
+    #define methods to attach the journal and write entries
+    def attach(self, zoo):
+        zoo.set_journal(self)
+        return self
+
+    def append(self, kind, *fields):
+        """Queue one entry and return its log sequence number (lsn)"""
+        with self._lock:
+            if self._closed:
+                raise ValueError("Journal is closed")
+            lsn = self._next_lsn
+            self._next_lsn += 1
+            payload = pickle.dumps((lsn, kind) + fields, protocol=pickle.HIGHEST_PROTOCOL)
+            self._buffer.append(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+            if len(self._buffer) >= self._batch_size:
+                self._flush_locked()
+        return lsn
+
+    def flush(self):
+        """Write (and fsync, unless fsync is "never") everything that is queued"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        self._file.write(b"".join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self._fsync != "never":
+            os.fsync(self._file.fileno())
+
+    def _flush_loop(self):
+        while not self._wake.wait(self._flush_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                self._flush_locked()
+
+    def close(self):
+        self.wait_for_compaction()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._file.close()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+    #methods called by the zoo for every mutation
+    #an animal, enclosure or staff member can be set up (placed, assigned) before it joins the zoo,
+    #so its add entry carries whatever links it already has to things the zoo knows about
+    def animal_added(self, zoo, animal):
+        records = tuple(snapshot.encode_record(record) for record in animal.get_health_record())
+        enclosure = animal.get_enclosure()
+        enclosure_id = zoo.get_enclosure_registry_id(enclosure) if enclosure is not None else None
+        staff_ids = _ids(zoo.get_staff_id, zoo.get_staff_for(animal))
+        self.append("animal_add", zoo.get_animal_id(animal), snapshot.encode_animal(animal), records,
+                    enclosure_id, staff_ids)
+
+    def animal_removed(self, zoo, animal_id):
+        self.append("animal_remove", animal_id)
+
+    def enclosure_added(self, zoo, enclosure):
+        self.append("enclosure_add", zoo.get_enclosure_registry_id(enclosure), enclosure.get_enclosure_id(),
+                    enclosure.get_size(), enclosure.get_environment(), enclosure.get_capacity(),
+                    enclosure.get_cleanliness_lvl(), _ids(zoo.get_animal_id, enclosure.get_animals()),
+                    _ids(zoo.get_staff_id, zoo.get_staff_for(enclosure)))
+
+    def enclosure_removed(self, zoo, enclosure_id):
+        self.append("enclosure_remove", enclosure_id)
+
+    def animal_moved(self, zoo, enclosure, animal, added):
+        enclosure_id = zoo.get_enclosure_registry_id(enclosure)
+        animal_id = zoo.get_animal_id(animal)
+        if enclosure_id is None or animal_id is None:
+            return  #covered by the add entry of whichever joins the zoo later
+        self.append("move_in" if added else "move_out", enclosure_id, animal_id)
+
+    def staff_added(self, zoo, staff):
+        self.append("staff_add", zoo.get_staff_id(staff), type(staff).__name__, staff.get_name(),
+                    staff.get_employee_id(), _ids(zoo.get_animal_id, staff.get_assigned_animals()),
+                    _ids(zoo.get_enclosure_registry_id, staff.get_assigned_enclosures()))
+
+    def staff_removed(self, zoo, staff_id):
+        self.append("staff_remove", staff_id)
+
+    def staff_assigned(self, zoo, staff, target, kind, added):
+        staff_id = zoo.get_staff_id(staff)
+        if kind == "animal":
+            target_id = zoo.get_animal_id(target)
+        else:
+            target_id = zoo.get_enclosure_registry_id(target)
+        if staff_id is None or target_id is None:
+            return  #covered by the add entry of whichever joins the zoo later
+        self.append("assign" if added else "unassign", staff_id, kind, target_id)
+
+    def record_changed(self, zoo, record, change):
+        animal_id = zoo.get_animal_id(record.get_animal())
+        position = record.get_position()
+        if change == "added":
+            self.append("record_add", animal_id, snapshot.encode_record(record))
+        elif change == "status":
+            resolved = record.get_resolution_date()
+            self.append("record_status", animal_id, position, record.get_status(),
+                        snapshot.to_timestamp(resolved))
+        elif change == "severity":
+            self.append("record_severity", animal_id, position, record.get_severity())
+        elif change == "plan":
+            self.append("record_plan", animal_id, position, record.get_treatment_plan())
+        elif change == "note":
+            note = record.get_notes()[-1]
+            self.append("record_note", animal_id, position,
+                        (snapshot.to_timestamp(note["date"]), note["note"], note["added_by"]))
+
+    #define methods for compaction
+    def compact(self, zoo, snapshot_path, background=True):
+        """Fold the journal into a new snapshot of zoo
+        The zoo state is captured and the journal rotated while holding the whole zoo (see
+        Zoo.hold_all) and the journal's lock, so no change can be half way through, then the snapshot
+        file is written (in a background thread unless background is False). Entries logged while
+        the snapshot is being written go to the new journal file."""
+        self.wait_for_compaction()
+        old_path = self._path + ".old"
+        with zoo.hold_all(), self._lock:
+            self._flush_locked()
+            payload = snapshot.build_payload(zoo)
+            payload["journal_lsn"] = self._next_lsn - 1
+            self._file.close()
+            if os.path.exists(old_path):
+                #an earlier compaction didn't finish - keep its entries in front of ours
+                with open(old_path, "ab") as old, open(self._path, "rb") as current:
+                    old.write(current.read())
+                    old.flush()
+                    os.fsync(old.fileno())
+                os.remove(self._path)
+            else:
+                os.replace(self._path, old_path)
+            self._file = open(self._path, "ab")
+
+        if not background:
+            _write_snapshot(payload, snapshot_path, old_path)
+            return None
+        self._compactor = threading.Thread(target=_write_snapshot, args=(payload, snapshot_path, old_path),
+                                           name="zoo-journal-compact", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def wait_for_compaction(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+
+def _ids(get_id, items):
+    #IDs of the items the zoo knows about (others get None from get_id and are left out)
+    ids = (get_id(item) for item in items)
+    return tuple(item_id for item_id in ids if item_id is not None)
+
+
+def _last_lsn(path):
+    entries, _ = read_entries(path)
+    return entries[-1][0] if entries else 0
+
+
+def _write_snapshot(payload, snapshot_path, old_path):
+    #write to a temporary file and swap it in so a crash never leaves a half written snapshot
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "wb") as sink:
+        snapshot.dump_payload(payload, sink)
+        sink.flush()
+        os.fsync(sink.fileno())
+    os.replace(tmp_path, snapshot_path)
+    if os.path.exists(old_path):
+        os.remove(old_path)
+
+
+#define methods for recovery
+def replay(zoo, entries, after_lsn=0):
+    """Apply journal entries with an lsn greater than after_lsn to zoo and return the last lsn"""
+    last = after_lsn
+    for entry in entries:
+        lsn, kind = entry[0], entry[1]
+        if lsn <= after_lsn:
+            continue
+        _APPLY[kind](zoo, *entry[2:])
+        last = lsn
+    return last
+
+
+def recover(snapshot_path, journal_path, name="Zoo", lazy_records=False, rules=None, settings=None):
+    """Load the last snapshot (if there is one) and replay the journal on top of it
+    The zoo gets the settings (compatibility rules, thread_safe...) saved in the snapshot. Without
+    a snapshot they come from settings (a dict like the snapshot's) and rules. rules always
+    overrides the saved rules.
+    Returns (zoo, last_lsn). Pass last_lsn + 1 as next_lsn when opening a new Journal."""
+    after_lsn = 0
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "rb") as source:
+            payload = snapshot.read_payload(source)
+        after_lsn = payload.get("journal_lsn", 0)
+        zoo = snapshot.restore_payload(payload, lazy_records, rules)
+    else:
+        zoo = snapshot.new_zoo(name, settings, rules)
+
+    last = after_lsn
+    for path in (journal_path + ".old", journal_path):
+        entries, _ = read_entries(path)
+        last = max(last, replay(zoo, entries, after_lsn))
+    return zoo, last
+
+
+#entries written before enclosures, staff and assignments were journaled have fewer fields
+def _apply_animal_add(zoo, animal_id, state, records, enclosure_id=None, staff_ids=()):
+    animal = snapshot.decode_animal(state)
+    if enclosure_id is not None:
+        _place(zoo.get_enclosure_registry().get(enclosure_id), animal)
+    for position, record_state in enumerate(records):
+        animal.set_health_record(snapshot.decode_record(animal, record_state, position))
+    zoo.add_animal(animal, animal_id)
+    for staff_id in staff_ids:
+        zoo.get_staff_member(staff_id).assign_animal(animal)
+
+
+def _apply_animal_remove(zoo, animal_id):
+    zoo.remove_animal(zoo.get_animal(animal_id))
+
+
+def _apply_enclosure_add(zoo, enclosure_id, enc_id, size, environment, capacity, cleanliness,
+                         animal_ids=(), staff_ids=()):
+    enclosure = Enclosure(enc_id, size, environment, capacity)
+    enclosure.set_cleanliness_lvl(cleanliness)
+    zoo.add_enclosure(enclosure, enclosure_id)
+    for animal_id in animal_ids:
+        _place(enclosure, zoo.get_animal(animal_id))
+    for staff_id in staff_ids:
+        zoo.get_staff_member(staff_id).assign_enclosure(enclosure)
+
+
+def _place(enclosure, animal):
+    #the move was allowed when it was made, a treatment started since then must not undo it
+    if enclosure._compatible_species is None:
+        enclosure._compatible_species = animal.get_species()
+    enclosure._animals.append(animal)
+    enclosure._moved(animal, enclosure)
+
+
+def _apply_enclosure_remove(zoo, enclosure_id):
+    zoo.remove_enclosure(zoo.get_enclosure_registry().get(enclosure_id))
+
+
+def _apply_move_in(zoo, enclosure_id, animal_id):
+    _place(zoo.get_enclosure_registry().get(enclosure_id), zoo.get_animal(animal_id))
+
+
+def _apply_move_out(zoo, enclosure_id, animal_id):
+    zoo.get_enclosure_registry().get(enclosure_id).remove_animal(zoo.get_animal(animal_id))
+
+
+def _apply_staff_add(zoo, staff_id, cls_name, name, employee_id, animal_ids, enclosure_ids):
+    staff = snapshot.STAFF_CLASSES[cls_name](name, employee_id)
+    for animal_id in animal_ids:
+        staff.assign_animal(zoo.get_animal(animal_id))
+    for enclosure_id in enclosure_ids:
+        staff.assign_enclosure(zoo.get_enclosure_registry().get(enclosure_id))
+    zoo.add_staff(staff, staff_id)
+
+
+def _apply_staff_remove(zoo, staff_id):
+    zoo.remove_staff(zoo.get_staff_member(staff_id))
+
+
+def _apply_assign(zoo, staff_id, kind, target_id):
+    staff = zoo.get_staff_member(staff_id)
+    if kind == "animal":
+        staff.assign_animal(zoo.get_animal(target_id))
+    else:
+        staff.assign_enclosure(zoo.get_enclosure_registry().get(target_id))
+
+
+def _apply_unassign(zoo, staff_id, kind, target_id):
+    staff = zoo.get_staff_member(staff_id)
+    if kind == "animal":
+        staff.unassign_animal(zoo.get_animal(target_id))
+    else:
+        staff.unassign_enclosure(zoo.get_enclosure_registry().get(target_id))
+
+
+def _apply_record_add(zoo, animal_id, record_state):
+    animal = zoo.get_animal(animal_id)
+    position = len(animal.get_health_record())
+    animal.set_health_record(snapshot.decode_record(animal, record_state, position))
+
+
+#record changes are applied to the fields directly (the notes they added are separate entries)
+def _apply_record_status(zoo, animal_id, position, status, resolved):
+    record = zoo.get_animal(animal_id).get_health_record()[position]
+    record._status = status
+    record._resolution_date = snapshot.to_datetime(resolved)
+    record.get_animal().update_record_index(record, "status")
+
+
+def _apply_record_severity(zoo, animal_id, position, severity):
+    record = zoo.get_animal(animal_id).get_health_record()[position]
+    record._severity = severity
+    record.get_animal().update_record_index(record, "severity")
+
+
+def _apply_record_plan(zoo, animal_id, position, plan):
+    record = zoo.get_animal(animal_id).get_health_record()[position]
+    record._treatment_plan = plan
+    record.get_animal().update_record_index(record, "plan")
+
+
+def _apply_record_note(zoo, animal_id, position, note):
+    record = zoo.get_animal(animal_id).get_health_record()[position]
+    date, text, added_by = note
+    record._notes.append({'date': snapshot.to_datetime(date), 'note': text, 'added_by': added_by})
+    record.get_animal().update_record_index(record, "note")
+
+
+_APPLY = {
+    "animal_add": _apply_animal_add,
+    "animal_remove": _apply_animal_remove,
+    "enclosure_add": _apply_enclosure_add,
+    "enclosure_remove": _apply_enclosure_remove,
+    "move_in": _apply_move_in,
+    "move_out": _apply_move_out,
+    "staff_add": _apply_staff_add,
+    "staff_remove": _apply_staff_remove,
+    "assign": _apply_assign,
+    "unassign": _apply_unassign,
+    "record_add": _apply_record_add,
+    "record_status": _apply_record_status,
+    "record_severity": _apply_record_severity,
+    "record_plan": _apply_record_plan,
+    "record_note": _apply_record_note,
+}
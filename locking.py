@@ -0,0 +1,83 @@
+"""
+File: locking.py
+Description: Striped locks for animals and enclosures used by a zoo in thread-safe mode
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from contextlib import nullcontext
+import functools
+import threading
+
+#returned when there is nothing to lock (a zoo that is not thread-safe)
+NO_LOCK = nullcontext()
+
+
+def locked(method):
+    """Run a method under self._lock when it is set (objects that aren't thread-safe leave it None)"""
+    @functools.wraps(method)
+    def run_locked(self, *args, **kwargs):
+        if self._lock is None:
+            return method(self, *args, **kwargs)
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return run_locked
+
+
+class LockStripes:
+    """A fixed set of re-entrant locks shared out over any number of animals and enclosures
+    Every object maps to one lock (its stripe) by its hash, so changes to different enclosures
+    rarely wait on each other while memory stays the same however big the zoo gets.
+    hold() takes the stripes of several objects in stripe order, the one lock order every
+    thread follows, so two transfers in opposite directions can never deadlock.
+    A single stripe turns this into one global lock (useful to compare against)."""
+
+    def __init__(self, stripes=64):
+        if stripes < 1:
+            raise ValueError("Need at least one lock stripe")
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def get_stripe_count(self):
+        return len(self._locks)
+
+    def stripe_of(self, obj):
+        return hash(obj) % len(self._locks)
+
+    def lock_for(self, obj):
+        return self._locks[hash(obj) % len(self._locks)]
+
+    def hold(self, *objects):
+        """Context manager holding the locks of all the given objects (None is skipped)"""
+        count = len(self._locks)
+        stripes = sorted({hash(obj) % count for obj in objects if obj is not None})
+        return _Held([self._locks[stripe] for stripe in stripes])
+
+    def hold_all(self, *after):
+        """Context manager holding every stripe, then the given extra locks (e.g. a zoo's own lock)"""
+        return _Held(self._locks + [lock for lock in after if lock is not None])
+
+
+class _Held:
+    """The locks of one hold() call, taken in order on enter and released in reverse on exit"""
+    __slots__ = ("_locks",)
+
+    def __init__(self, locks):
+        self._locks = locks
+
+    def __enter__(self):
+        taken = []
+        try:
+            for lock in self._locks:
+                lock.acquire()
+                taken.append(lock)
+        except BaseException:
+            for lock in reversed(taken):
+                lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        for lock in reversed(self._locks):
+            lock.release()
+        return False
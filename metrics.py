@@ -0,0 +1,252 @@
+"""
+File: metrics.py
+Description: Opt-in instrumentation of the hot zoo methods with Prometheus text and dict exports
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import bisect
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+
+from enclosure import Enclosure
+from health_system import HealthRecord
+from staff import Staff, Vet
+from zoo import Zoo
+
+#upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+
+#(class, method name, how to measure the size of the collection the call scanned or None)
+#size functions get (self, args, result)
+INSTRUMENTED = [
+    (Zoo, "add_animal", None),
+    (Zoo, "add_animals", lambda self, args, result: len(result)),
+    (Zoo, "remove_animal", None),
+    (Zoo, "get_animals", lambda self, args, result: len(result)),
+    (Zoo, "get_animals_species", lambda self, args, result: len(result)),
+    (Zoo, "place_animals", lambda self, args, result: len(result[0]) + len(result[1])),
+    (Zoo, "create_animal_report", lambda self, args, result: len(self.get_animal_registry())),
+    (Zoo, "create_health_report", lambda self, args, result: len(self.get_animal_registry())),
+    (Zoo, "create_enclosure_report", lambda self, args, result: len(self.get_enclosure_registry())),
+    (Enclosure, "add_animal", lambda self, args, result: self.animal_count()),
+    (Enclosure, "remove_animal", lambda self, args, result: self.animal_count()),
+    (Enclosure, "get_enclosure_status", lambda self, args, result: self.animal_count()),
+    (Enclosure, "clean_enclosure", None),
+    (Staff, "assign_animal", None),
+    (Staff, "assign_enclosure", None),
+    (Vet, "create_record", None),
+    (Vet, "get_active_issue", lambda self, args, result: len(result)),
+    (Vet, "get_critical_issues", lambda self, args, result: len(result)),
+    (Vet, "get_health_history", lambda self, args, result: len(args[0].get_health_record())),
+    (Vet, "conduct_health_check", None),
+    (Vet, "resolve_health_issue", None),
+    (HealthRecord, "set_status", None),
+    (HealthRecord, "resolve_issue", None),
+    (HealthRecord, "update_severity", None),
+    (HealthRecord, "add_notes", lambda self, args, result: len(self.get_notes())),
+    (HealthRecord, "get_full_report", lambda self, args, result: len(self.get_notes())),
+]
+
+
+class MethodStats:
+    """Call counter, latency histogram and scanned-size totals for one method"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  #last bucket is +Inf
+        self.scanned_sum = 0
+        self.scanned_count = 0
+        self.scanned_max = 0
+
+    def observe(self, seconds, scanned, failed):
+        self.calls += 1
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if failed:
+            self.errors += 1
+        if scanned is not None:
+            self.scanned_sum += scanned
+            self.scanned_count += 1
+            if scanned > self.scanned_max:
+                self.scanned_max = scanned
+
+    def as_dict(self):
+        cumulative = []
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.buckets):
+            running += count
+            cumulative.append((bound, running))
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "seconds": self.seconds,
+            "mean_seconds": self.seconds / self.calls if self.calls else 0.0,
+            "latency_buckets": cumulative,
+            "scanned_sum": self.scanned_sum,
+            "scanned_count": self.scanned_count,
+            "scanned_max": self.scanned_max,
+        }
+
+
+class Metrics:
+    """Holds the stats of every instrumented method
+    Nothing is measured until enable() is called: it swaps the methods listed in INSTRUMENTED for
+    timing wrappers, and disable() puts the originals back, so there is no overhead at all while
+    instrumentation is off."""
+
+    def __init__(self, targets=INSTRUMENTED):
+        self._targets = list(targets)
+        self._stats = {}
+        self._originals = {}
+        self._lock = threading.Lock()
+
+    def is_enabled(self):
+        return bool(self._originals)
+
+    def enable(self):
+        if self._originals:
+            return
+        for cls, name, size in self._targets:
+            original = cls.__dict__.get(name)
+            if original is None:
+                continue
+            self._originals[(cls, name)] = original
+            setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", original, size))
+
+    def disable(self):
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _wrap(self, label, func, size):
+        stats_for = self._stats_for
+
+        @functools.wraps(func)
+        def wrapper(self_obj, *args, **kwargs):
+            failed = True
+            result = None
+            start = time.perf_counter()
+            try:
+                result = func(self_obj, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                scanned = None
+                if size is not None and not failed:
+                    try:
+                        scanned = size(self_obj, args, result)
+                    except (TypeError, AttributeError, IndexError):
+                        scanned = None
+                stats_for(label, elapsed, scanned, failed)
+        return wrapper
+
+    def _stats_for(self, label, elapsed, scanned, failed):
+        with self._lock:
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = MethodStats()
+            stats.observe(elapsed, scanned, failed)
+
+    #define methods to export the metrics
+    def snapshot(self):
+        """Return the current metrics as a plain dict keyed by "Class.method" """
+        with self._lock:
+            return {label: stats.as_dict() for label, stats in self._stats.items()}
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = [
+            "# HELP zoo_method_calls_total Number of calls to an instrumented zoo method.",
+            "# TYPE zoo_method_calls_total counter",
+        ]
+        for label in sorted(data):
+            lines.append(f'zoo_method_calls_total{{method="{label}"}} {data[label]["calls"]}')
+        lines += ["# HELP zoo_method_errors_total Number of calls that raised an exception.",
+                  "# TYPE zoo_method_errors_total counter"]
+        for label in sorted(data):
+            lines.append(f'zoo_method_errors_total{{method="{label}"}} {data[label]["errors"]}')
+        lines += ["# HELP zoo_method_latency_seconds Latency of instrumented zoo methods.",
+                  "# TYPE zoo_method_latency_seconds histogram"]
+        for label in sorted(data):
+            for bound, count in data[label]["latency_buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'zoo_method_latency_seconds_bucket{{method="{label}",le="{le}"}} {count}')
+            lines.append(f'zoo_method_latency_seconds_sum{{method="{label}"}} {data[label]["seconds"]!r}')
+            lines.append(f'zoo_method_latency_seconds_count{{method="{label}"}} {data[label]["calls"]}')
+        lines += ["# HELP zoo_method_scanned_items Size of the collection scanned or returned per call.",
+                  "# TYPE zoo_method_scanned_items summary"]
+        for label in sorted(data):
+            if data[label]["scanned_count"]:
+                lines.append(f'zoo_method_scanned_items_sum{{method="{label}"}} {data[label]["scanned_sum"]}')
+                lines.append(f'zoo_method_scanned_items_count{{method="{label}"}} {data[label]["scanned_count"]}')
+        lines += ["# HELP zoo_method_scanned_items_max Largest collection scanned in one call.",
+                  "# TYPE zoo_method_scanned_items_max gauge"]
+        for label in sorted(data):
+            if data[label]["scanned_count"]:
+                lines.append(f'zoo_method_scanned_items_max{{method="{label}"}} {data[label]["scanned_max"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the metrics to a file (e.g. for node_exporter's textfile collector)
+        The file is written next to the target and renamed so a reader never sees half of it."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as sink:
+            sink.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """Serve the metrics over HTTP at /metrics from a background thread and return the server"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="zoo-metrics", daemon=True).start()
+        return server
+
+
+#shared instance used by the module level helpers
+METRICS = Metrics()
+
+
+def enable():
+    METRICS.enable()
+
+
+def disable():
+    METRICS.disable()
+
+
+def snapshot():
+    return METRICS.snapshot()
+
+
+def to_prometheus():
+    return METRICS.to_prometheus()
@@ -0,0 +1,229 @@
+"""
+File: operations.py
+Description: Asyncio runner for the zookeepers' daily tasks with concurrency limits, timeouts and retries
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import asyncio
+import random
+
+
+class DeviceError(Exception):
+    """Raised by a device backend when a feeder/sensor action fails"""
+
+
+class FakeDeviceBackend:
+    """Local stand-in for the feeder and sensor integrations so the runner can be load tested offline
+    Every action waits a random latency and fails with probability failure_rate."""
+
+    def __init__(self, min_latency=0.001, max_latency=0.01, failure_rate=0.0, seed=None):
+        self._min_latency = min_latency
+        self._max_latency = max_latency
+        self._failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._calls = 0
+        self._failures = 0
+
+    def get_calls(self):
+        return self._calls
+
+    def get_failures(self):
+        return self._failures
+
+    async def perform(self, action, keeper, target):
+        self._calls += 1
+        await asyncio.sleep(self._random.uniform(self._min_latency, self._max_latency))
+        if self._random.random() < self._failure_rate:
+            self._failures += 1
+            raise DeviceError(f"Device failed to {action} for {keeper.get_name()}")
+
+
+class OpsTask:
+    """One task in the day's plan, e.g. a keeper feeding an animal"""
+
+    def __init__(self, task_id, keeper, action, target, enclosure=None, depends_on=()):
+        self._task_id = task_id
+        self._keeper = keeper
+        self._action = action
+        self._target = target
+        self._enclosure = enclosure
+        self._depends_on = tuple(depends_on)
+
+    def get_task_id(self):
+        return self._task_id
+
+    def get_keeper(self):
+        return self._keeper
+
+    def get_action(self):
+        return self._action
+
+    def get_target(self):
+        return self._target
+
+    def get_enclosure(self):
+        return self._enclosure
+
+    def get_depends_on(self):
+        return self._depends_on
+
+    def __str__(self):
+        return f"Task {self._task_id}: {self._keeper.get_name()} - {self._action}"
+
+
+class TaskEvent:
+    """Completion event streamed by the runner for every task"""
+
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __init__(self, task, status, attempts, result=None, error=None):
+        self._task = task
+        self._status = status
+        self._attempts = attempts
+        self._result = result
+        self._error = error
+
+    def get_task(self):
+        return self._task
+
+    def get_status(self):
+        return self._status
+
+    def get_attempts(self):
+        return self._attempts
+
+    def get_result(self):
+        return self._result
+
+    def get_error(self):
+        return self._error
+
+    def __str__(self):
+        detail = self._result if self._status == TaskEvent.COMPLETED else self._error
+        return f"{self._task} {self._status} after {self._attempts} attempt(s): {detail}"
+
+
+#order of the animal care tasks for one animal (each one waits for the one before)
+ANIMAL_ACTIONS = ["feed_animal", "water_animal", "cleanup_animal", "train_animal"]
+
+
+def build_day_plan(keepers):
+    """Build the day's task graph from each keeper's assigned animals and enclosures
+    Each animal is fed, watered, cleaned and trained in that order, and an enclosure is only
+    cleaned once the keeper has fed the animals of theirs that live in it."""
+    tasks = []
+    for keeper in keepers:
+        fed_in = {}  #enclosure -> feeding tasks of this keeper in it
+        for animal in keeper.get_assigned_animals():
+            previous = ()
+            for action in ANIMAL_ACTIONS:
+                task = OpsTask(len(tasks), keeper, action, animal, animal.get_enclosure(), previous)
+                tasks.append(task)
+                previous = (task.get_task_id(),)
+                if action == "feed_animal" and animal.get_enclosure() is not None:
+                    fed_in.setdefault(animal.get_enclosure(), []).append(task.get_task_id())
+        for enclosure in keeper.get_assigned_enclosures():
+            tasks.append(OpsTask(len(tasks), keeper, "cleanup_enclosure", enclosure, enclosure,
+                                 fed_in.get(enclosure, ())))
+    return tasks
+
+
+class DailyOperationsRunner:
+    """Runs a task graph concurrently
+    At most keeper_limit tasks run at once per keeper and enclosure_limit per enclosure. Each
+    device action gets timeout seconds and is retried up to retries times with a growing backoff.
+    Tasks whose dependencies failed are skipped."""
+
+    def __init__(self, backend=None, keeper_limit=2, enclosure_limit=1, timeout=1.0, retries=2, backoff=0.01):
+        self._backend = backend if backend is not None else FakeDeviceBackend()
+        self._keeper_limit = keeper_limit
+        self._enclosure_limit = enclosure_limit
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+
+    async def run(self, tasks):
+        """Run tasks and yield a TaskEvent as each one finishes"""
+        tasks = list(tasks)
+        events = asyncio.Queue()
+        done = {task.get_task_id(): asyncio.Event() for task in tasks}
+        succeeded = {}
+        keeper_limits = {}
+        enclosure_limits = {}
+        for task in tasks:
+            keeper_limits.setdefault(task.get_keeper(), asyncio.Semaphore(self._keeper_limit))
+            if task.get_enclosure() is not None:
+                enclosure_limits.setdefault(task.get_enclosure(), asyncio.Semaphore(self._enclosure_limit))
+
+        async def run_task(task):
+            event = None
+            try:
+                for dep in task.get_depends_on():
+                    await done[dep].wait()
+                if not all(succeeded[dep] for dep in task.get_depends_on()):
+                    event = TaskEvent(task, TaskEvent.SKIPPED, 0, error="a task it depends on did not complete")
+                else:
+                    #always take the keeper slot before the enclosure slot so tasks can't deadlock
+                    async with keeper_limits[task.get_keeper()]:
+                        enclosure_limit = enclosure_limits.get(task.get_enclosure())
+                        if enclosure_limit is None:
+                            event = await self._attempt(task)
+                        else:
+                            async with enclosure_limit:
+                                event = await self._attempt(task)
+            finally:
+                #whatever happens the task is reported and its dependants are woken, or run() would hang
+                if event is None:
+                    event = TaskEvent(task, TaskEvent.FAILED, 0, error="stopped before it finished")
+                succeeded[task.get_task_id()] = event.get_status() == TaskEvent.COMPLETED
+                done[task.get_task_id()].set()
+                events.put_nowait(event)
+
+        workers = [asyncio.create_task(run_task(task)) for task in tasks]
+        try:
+            for _ in range(len(tasks)):
+                yield await events.get()
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def _attempt(self, task):
+        """Perform the task on the device (retrying only the device call), then record it once"""
+        error = None
+        for attempt in range(1, self._retries + 2):
+            try:
+                await asyncio.wait_for(
+                    self._backend.perform(task.get_action(), task.get_keeper(), task.get_target()), self._timeout)
+                break
+            except asyncio.TimeoutError:
+                error = f"timed out after {self._timeout}s"
+            except DeviceError as exc:
+                error = str(exc)
+            except Exception as exc:
+                #any other backend error is a failed attempt too, not a crash of the run
+                error = f"{type(exc).__name__}: {exc}"
+            if attempt <= self._retries:
+                await asyncio.sleep(self._backoff * attempt)
+        else:
+            return TaskEvent(task, TaskEvent.FAILED, self._retries + 1, error=error)
+
+        #the device confirmed, so record the action on the zoo objects (never retried: the device
+        #action already happened and doing it again would e.g. feed an animal twice)
+        try:
+            result = getattr(task.get_keeper(), task.get_action())(task.get_target())
+        except Exception as exc:
+            return TaskEvent(task, TaskEvent.FAILED, attempt, error=f"recording failed: {type(exc).__name__}: {exc}")
+        return TaskEvent(task, TaskEvent.COMPLETED, attempt, result=result)
+
+    async def run_all(self, tasks):
+        return [event async for event in self.run(tasks)]
+
+
+def run_day(keepers, backend=None, **runner_options):
+    """Plan and run a whole day for given keepers and return the list of TaskEvents"""
+    runner = DailyOperationsRunner(backend, **runner_options)
+    return asyncio.run(runner.run_all(build_day_plan(keepers)))
@@ -0,0 +1,139 @@
+"""
+File: pagination.py
+Description: Cursor based paging over an animal's health records and a record's notes
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+
+class Page:
+    """One page of items plus the cursor to pass back for the next page
+    Items are only turned into text when the page is rendered, one at a time."""
+
+    def __init__(self, items, next_cursor, render_item=str):
+        self._items = items
+        self._next_cursor = next_cursor
+        self._render_item = render_item
+
+    def get_items(self):
+        return list(self._items)
+
+    def get_next_cursor(self):
+        """Cursor for the following page, None when this is the last page"""
+        return self._next_cursor
+
+    def has_more(self):
+        return self._next_cursor is not None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def iter_lines(self):
+        for item in self._items:
+            yield f" - {self._render_item(item)}\n"
+
+    def render(self):
+        return "".join(self.iter_lines())
+
+
+def page_list(items, cursor=None, limit=20, reverse=False, render_item=str):
+    """Page through an append-only list (e.g. a record's notes) by position in O(limit)
+    The cursor is the position to start from; reverse pages from the newest item back."""
+    if limit < 1:
+        raise ValueError("Page size must be at least 1")
+    if not reverse:
+        start = 0 if cursor is None else cursor
+        page = items[start:start + limit]
+        end = start + len(page)
+        return Page(page, end if end < len(items) else None, render_item)
+    stop = len(items) if cursor is None else cursor
+    start = max(0, stop - limit)
+    page = items[start:stop][::-1]
+    return Page(page, start if start > 0 else None, render_item)
+
+
+class HistoryIndex:
+    """Positions of an animal's health records grouped by status, by severity and by both
+    Records keep the position they were added at in the animal's health record (the order they
+    were recorded in), and each group is a sorted list of positions. Paging from a cursor is a
+    bisect into one group and then only touches the records on the page.
+    Built the first time an animal's history is paged and then updated by the animal whenever
+    one of its records is added or changes."""
+
+    __slots__ = ("_records", "_by_status", "_by_severity", "_by_both", "_keys")
+
+    def __init__(self, records):
+        self._records = records
+        self._by_status = {}
+        self._by_severity = {}
+        self._by_both = {}  #(status, severity) -> positions, so a combined filter is one group too
+        self._keys = {}  #record -> (status, severity) it is filed under
+        for record in records:
+            self.update(record)
+
+    def update(self, record):
+        """File a new record, or move it after its status or severity changed"""
+        key = (record.get_status(), record.get_severity())
+        old = self._keys.get(record)
+        if old == key:
+            return
+        pos = record.get_position()
+        if old is not None:
+            _discard(self._by_status[old[0]], pos)
+            _discard(self._by_severity[old[1]], pos)
+            _discard(self._by_both[old], pos)
+        insort(self._by_status.setdefault(key[0], []), pos)
+        insort(self._by_severity.setdefault(key[1], []), pos)
+        insort(self._by_both.setdefault(key, []), pos)
+        self._keys[record] = key
+
+    def count(self, status=None, severity=None):
+        if status is None and severity is None:
+            return len(self._records)
+        if severity is None:
+            return len(self._by_status.get(status, ()))
+        if status is None:
+            return len(self._by_severity.get(severity, ()))
+        return len(self._by_both.get((status, severity), ()))
+
+    def page(self, cursor=None, limit=20, status=None, severity=None, reverse=False):
+        """Return a Page of records in the order they were recorded (newest first if reverse)
+        Only records with given status and/or severity are included. The cursor is the
+        position of the last record on the previous page."""
+        if limit < 1:
+            raise ValueError("Page size must be at least 1")
+        if status is None and severity is None:
+            positions = range(len(self._records))
+        elif severity is None:
+            positions = self._by_status.get(status, [])
+        elif status is None:
+            positions = self._by_severity.get(severity, [])
+        else:
+            positions = self._by_both.get((status, severity), [])
+
+        if reverse:
+            i = len(positions) - 1 if cursor is None else bisect_left(positions, cursor) - 1
+            step = -1
+        else:
+            i = 0 if cursor is None else bisect_right(positions, cursor)
+            step = 1
+        items = []
+        last = None
+        while 0 <= i < len(positions) and len(items) < limit:
+            last = positions[i]
+            items.append(self._records[last])
+            i += step
+        more = 0 <= i < len(positions)
+        return Page(items, last if more else None)
+
+
+def _discard(positions, pos):
+    i = bisect_left(positions, pos)
+    if i < len(positions) and positions[i] == pos:
+        del positions[i]
@@ -0,0 +1,154 @@
+"""
+File: placement.py
+Description: Bulk placement engine that assigns a batch of animals across enclosures in one pass
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import heapq
+
+
+def plan_placements(animals, enclosures, rules=None):
+    """Work out where each animal in a batch should go without moving anything
+    Animals are grouped by species. Each group first fills enclosures that already hold its
+    species, then takes empty enclosures largest first so a species is spread over as few
+    enclosures as possible. Animals under treatment or already in an enclosure are rejected.
+    With a RuleBook (see compatibility.py) the rules pick the enclosures instead, see
+    _plan_with_rules.
+    Returns (plan, rejects): plan is a list of (animal, enclosure) pairs and rejects is a list
+    of (animal, reason) pairs."""
+    if rules is not None:
+        return _plan_with_rules(animals, enclosures, rules)
+    plan = []
+    rejects = []
+
+    #group the batch by species in one pass
+    groups = {}
+    for animal in animals:
+        if animal.get_treatment_status():
+            rejects.append((animal, f"Cannot move {animal} who is under treatment"))
+        elif animal.get_enclosure() is not None:
+            rejects.append((animal, f"{animal} is already in {animal.get_enclosure()}"))
+        else:
+            groups.setdefault(animal.get_species(), []).append(animal)
+
+    #index the enclosures by species, and keep empty ones in a max-heap of remaining capacity
+    by_species = {}
+    empty = []
+    for order, enclosure in enumerate(enclosures):
+        room = enclosure.get_remaining_capacity()
+        if room <= 0:
+            continue
+        species = enclosure.get_compatible_species()
+        if species is None:
+            empty.append((-room, order, enclosure))
+        else:
+            by_species.setdefault(species, []).append((enclosure, room))
+    heapq.heapify(empty)
+
+    for species, group in groups.items():
+        pos = 0
+        #fill enclosures that already hold this species (fullest rooms last)
+        for enclosure, room in sorted(by_species.get(species, []), key=lambda item: -item[1]):
+            take = min(room, len(group) - pos)
+            plan.extend((animal, enclosure) for animal in group[pos:pos + take])
+            pos += take
+            if pos == len(group):
+                break
+
+        #then claim empty enclosures, biggest first
+        while pos < len(group) and empty:
+            neg_room, order, enclosure = heapq.heappop(empty)
+            take = min(-neg_room, len(group) - pos)
+            plan.extend((animal, enclosure) for animal in group[pos:pos + take])
+            pos += take
+
+        for animal in group[pos:]:
+            rejects.append((animal, f"No enclosure with room for {species}"))
+
+    return plan, rejects
+
+
+def _plan_with_rules(animals, enclosures, rules):
+    """Plan placements with the compiled compatibility rules choosing the enclosures
+    Animals are grouped by rule profile. Each group tries the enclosures the rules allow it in,
+    taking enclosures that already hold its profile first, then other occupied ones and then
+    empty ones biggest first. If a choice is blocked the next allowed enclosure is used.
+    Animals planned into an enclosure count as its occupants for the groups after them, so the
+    plan as a whole keeps to the rules."""
+    plan = []
+    rejects = []
+    groups = {}
+    for animal in animals:
+        if animal.get_treatment_status():
+            rejects.append((animal, f"Cannot move {animal} who is under treatment"))
+        elif animal.get_enclosure() is not None:
+            rejects.append((animal, f"{animal} is already in {animal.get_enclosure()}"))
+        else:
+            groups.setdefault(rules.profile_code(animal), []).append(animal)
+
+    #[enclosure, room left, environment code, profile codes living there (and planned)]
+    slots = []
+    for enclosure in enclosures:
+        room = enclosure.get_remaining_capacity()
+        if room > 0:
+            present = set(rules.profile_code(animal) for animal in enclosure.get_animals())
+            slots.append([enclosure, room, rules.environment_code(enclosure.get_environment()), present])
+
+    #biggest groups first, they have the fewest ways to fit
+    for code, group in sorted(groups.items(), key=lambda item: -len(item[1])):
+        #profiles that can't share an enclosure with their own kind go one per enclosure
+        alone = bool(rules.pair_rule(code, code))
+        allowed = []
+        first_block = None
+        for slot in slots:
+            if slot[1] <= 0 or (alone and code in slot[3]):
+                continue
+            number = rules.first_rule(code, slot[2], slot[3])
+            if number:
+                #report an enclosure the animal could live in but for its occupants, if there is one
+                habitable = not rules.first_rule(code, slot[2], ())
+                if first_block is None or (habitable and not first_block[2]):
+                    first_block = (number, slot[0], habitable)
+                continue
+            #same profile already there, then other occupied enclosures, then empty ones (most room first)
+            rank = 0 if code in slot[3] else (1 if slot[3] else 2)
+            allowed.append((rank, -slot[1], len(allowed), slot))
+        allowed.sort(key=lambda item: item[:3])
+
+        pos = 0
+        for _, _, _, slot in allowed:
+            if pos == len(group):
+                break
+            take = min(1 if alone else slot[1], len(group) - pos)
+            plan.extend((animal, slot[0]) for animal in group[pos:pos + take])
+            slot[1] -= take
+            slot[3].add(code)
+            pos += take
+
+        for animal in group[pos:]:
+            if first_block is not None and not allowed:
+                number, enclosure, _ = first_block
+                rejects.append((animal, rules.get_rule(number).describe(animal, enclosure)))
+            else:
+                rejects.append((animal, f"No enclosure with room for {animal.get_species()}"))
+
+    return plan, rejects
+
+
+def apply_placements(plan):
+    """Move the animals into the enclosures of a plan from plan_placements
+    A move that is refused (e.g. a compatibility rule blocks it because of an animal moved in
+    earlier in the same plan) is skipped. Returns the (animal, reason) pairs of skipped moves."""
+    failed = []
+    for animal, enclosure in plan:
+        if animal.get_enclosure() is not None:
+            failed.append((animal, f"{animal} is already in {animal.get_enclosure()}"))
+            continue
+        reason = enclosure.can_accept(animal)
+        if reason is not None:
+            failed.append((animal, reason))
+            continue
+        enclosure.add_animal(animal)
+    return failed
@@ -0,0 +1,201 @@
+"""
+File: registry.py
+Description: This class represents an indexed registry of zoo entities with stable IDs and secondary indexes
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+
+
+class Registry:
+    """Registry that gives every entity a stable ID and keeps secondary indexes up to date
+    Entities are stored in insertion order so listing them keeps the order they were added in.
+    Each secondary index maps a key (worked out by a key function) to the entities with that key.
+    get_all() and find() return tuples that are reused until the registry (or that index) next
+    changes, so callers can't change the registry through them and repeated calls copy nothing."""
+
+    def __init__(self, indexes=None):
+        self._next_id = 1
+        self._entities = {}  #id -> entity
+        self._ids = {}  #entity -> id
+        self._key_funcs = dict(indexes or {})
+        #index name -> key -> {id: entity} (dicts keep insertion order and give O(1) removal)
+        self._indexes = {name: {} for name in self._key_funcs}
+        #index name -> id -> key currently stored, so an entity can be moved when its key changes
+        self._current_keys = {name: {} for name in self._key_funcs}
+        #version counters and the snapshots built at a version: (version, tuple)
+        #a snapshot is stored with the version read before it was built, so one built while another
+        #thread was changing the registry is never reused
+        self._version = 0
+        self._index_versions = {name: 0 for name in self._key_funcs}
+        self._all = None
+        self._found = {}  #(index name, key) -> (index version, tuple)
+
+    #define getters to access the registry
+    def get(self, entity_id):
+        return self._entities.get(entity_id)
+
+    def get_id(self, entity):
+        return self._ids.get(entity)
+
+    def get_all(self):
+        """Return a tuple of every entity (the same tuple until the next add or remove)"""
+        snapshot = self._all
+        version = self._version
+        if snapshot is None or snapshot[0] != version:
+            snapshot = self._all = (version, tuple(self._entities.values()))
+        return snapshot[1]
+
+    def get_index_names(self):
+        return list(self._key_funcs)
+
+    def find(self, index_name, key):
+        """Return a tuple of the entities stored under key in the given index
+        (the same tuple until that index next changes)"""
+        version = self._index_versions[index_name]
+        snapshot = self._found.get((index_name, key))
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot[1]
+        bucket = self._indexes[index_name].get(key)
+        if not bucket:
+            self._found.pop((index_name, key), None)
+            return ()
+        entities = tuple(bucket.values())
+        self._found[(index_name, key)] = (version, entities)
+        return entities
+
+    def count(self, index_name, key):
+        bucket = self._indexes[index_name].get(key)
+        return len(bucket) if bucket else 0
+
+    def keys(self, index_name):
+        """Return all the keys that have at least one entity in the given index"""
+        return list(self._indexes[index_name])
+
+    def key_count(self, index_name):
+        return len(self._indexes[index_name])
+
+    def groups(self, index_name):
+        """Iterate over (key, entities) pairs of an index without copying the buckets"""
+        for key, bucket in self._indexes[index_name].items():
+            yield key, bucket.values()
+
+    #define methods to add, remove and re-index entities
+    def add(self, entity, entity_id=None):
+        """Add an entity and return its ID (adding the same entity twice returns the existing ID)
+        An ID can be given to restore an entity under the ID it had before (e.g. from a snapshot)."""
+        existing = self._ids.get(entity)
+        if existing is not None:
+            return existing
+
+        if entity_id is None:
+            entity_id = self._next_id
+        elif entity_id in self._entities:
+            raise ValueError(f"ID {entity_id} is already in use")
+        self._next_id = max(self._next_id, entity_id + 1)
+        self._entities[entity_id] = entity
+        self._ids[entity] = entity_id
+
+        for name, key_func in self._key_funcs.items():
+            self._insert(name, key_func(entity), entity_id, entity)
+        self._changed(self._key_funcs)
+        return entity_id
+
+    def add_many(self, entities, entity_ids=None):
+        """Add a batch of entities and return their IDs
+        Works index by index instead of entity by entity, which is much faster for big loads.
+        Raises ValueError before adding anything if a given ID is in use (or given twice)."""
+        if entity_ids is None:
+            entity_ids = [None] * len(entities)
+        given = set()
+        for entity, entity_id in zip(entities, entity_ids):
+            if entity_id is None or entity in self._ids:
+                continue
+            if entity_id in self._entities or entity_id in given:
+                raise ValueError(f"ID {entity_id} is already in use")
+            given.add(entity_id)
+        ids = []
+        added = []
+        for entity, entity_id in zip(entities, entity_ids):
+            existing = self._ids.get(entity)
+            if existing is not None:
+                ids.append(existing)
+                continue
+            if entity_id is None:
+                #skip IDs given to later entities of the batch
+                while self._next_id in given:
+                    self._next_id += 1
+                entity_id = self._next_id
+            self._next_id = max(self._next_id, entity_id + 1)
+            self._entities[entity_id] = entity
+            self._ids[entity] = entity_id
+            ids.append(entity_id)
+            added.append((entity_id, entity))
+
+        for name, key_func in self._key_funcs.items():
+            index = self._indexes[name]
+            current = self._current_keys[name]
+            for entity_id, entity in added:
+                key = key_func(entity)
+                bucket = index.get(key)
+                if bucket is None:
+                    bucket = index[key] = {}
+                bucket[entity_id] = entity
+                current[entity_id] = key
+        if added:
+            self._changed(self._key_funcs)
+        return ids
+
+    def remove(self, entity):
+        entity_id = self._ids.pop(entity, None)
+        if entity_id is None:
+            return False
+        del self._entities[entity_id]
+
+        for name in self._key_funcs:
+            self._discard(name, self._current_keys[name].pop(entity_id), entity_id)
+        self._changed(self._key_funcs)
+        return True
+
+    def reindex(self, entity, index_name=None):
+        """Re-work out the key of an entity after it has changed (for one index or all of them)"""
+        entity_id = self._ids.get(entity)
+        if entity_id is None:
+            return False
+
+        names = [index_name] if index_name is not None else self._key_funcs
+        for name in names:
+            new_key = self._key_funcs[name](entity)
+            old_key = self._current_keys[name][entity_id]
+            if new_key != old_key:
+                self._discard(name, old_key, entity_id)
+                self._insert(name, new_key, entity_id, entity)
+                self._index_versions[name] += 1
+        return True
+
+    def _changed(self, names):
+        #called after the change, see __init__
+        self._version += 1
+        for name in names:
+            self._index_versions[name] += 1
+
+    def _insert(self, name, key, entity_id, entity):
+        self._indexes[name].setdefault(key, {})[entity_id] = entity
+        self._current_keys[name][entity_id] = key
+
+    def _discard(self, name, key, entity_id):
+        bucket = self._indexes[name][key]
+        del bucket[entity_id]
+        #drop empty buckets so keys() only lists keys in use
+        if not bucket:
+            del self._indexes[name][key]
+
+    def __contains__(self, entity):
+        return entity in self._ids
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __iter__(self):
+        return iter(self._entities.values())
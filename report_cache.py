@@ -0,0 +1,68 @@
+"""
+File: report_cache.py
+Description: This class represents a bounded LRU cache of report strings keyed on object version counters
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from collections import OrderedDict
+
+
+class ReportCache:
+    """LRU cache of built strings (whole reports or fragments such as one animal's line)
+    Every entry is stored with the version of whatever it was built from. Objects bump their
+    version whenever they change, so an entry is only reused while the version still matches
+    and nothing has to be invalidated by hand. Once max_entries is reached the least recently
+    used entry is dropped."""
+
+    def __init__(self, max_entries=100000):
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry")
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  #key -> (version, value)
+        self._hits = 0
+        self._misses = 0
+
+    #define getters for the cache statistics
+    def get_max_entries(self):
+        return self._max_entries
+
+    def get_hits(self):
+        return self._hits
+
+    def get_misses(self):
+        return self._misses
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, version, build):
+        """Return the cached value for key if it was built at version, otherwise build() it"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._hits += 1
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                pass #dropped by another thread since the lookup (a thread-safe zoo reads without a lock)
+            return entry[1]
+        self._misses += 1
+        value = build()
+        self._entries[key] = (version, value)
+        try:
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        except KeyError:
+            pass
+        return value
+
+    def discard(self, key):
+        return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,72 @@
+"""
+File: reports.py
+Description: Streaming engine for the zoo reports that yields report lines or writes them to a file-like sink
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+
+
+#each generator yields the report a line (or one animal's block of lines) at a time, every piece
+#ending with a newline, so the whole report never has to be held in memory
+#per-animal fragments come from the zoo's report cache and are only rebuilt when that animal changes
+def iter_animal_report(zoo):
+    """Yield the animal report grouped by species in a single pass over the species index"""
+    cache = zoo.get_report_cache()
+    yield "Animal Report:\n"
+    yield f"Total Animals = {len(zoo.get_animal_registry())}\n"
+    yield f"Total Species = {zoo.count_species()}\n"
+
+    for species, animals in zoo.iter_species_groups():
+        yield f"{species} ({len(animals)}):\n"
+        for animal in animals:
+            yield cache.get(("animal", animal), animal.get_version(), lambda: f"  - {animal}\n")
+
+
+def _health_fragment(animal):
+    lines = ["\n", f"{animal.get_name()}:\n"]
+    for r in animal.get_health_record():
+        lines.append(f"  - {r}\n")
+    return "".join(lines)
+
+
+def iter_health_report(zoo):
+    """Yield the health report, listing the records of every animal that has any"""
+    cache = zoo.get_report_cache()
+    yield "Health Report:\n"
+    health_issues = False
+
+    for animal in zoo.get_animal_registry():
+        if animal.get_health_record():
+            health_issues = True
+            yield cache.get(("health", animal), animal.get_version(), lambda: _health_fragment(animal))
+    if not health_issues:
+        yield "No Health issues found.\n"
+
+
+def iter_enclosure_report(zoo):
+    """Yield the enclosure report with the status of every enclosure"""
+    yield "Enclosure Report:\n"
+    for enc in zoo.get_enclosure_registry():
+        yield enc.get_enclosure_status() + "\n"
+
+
+def write_report(lines, sink, batch_size=1000):
+    """Write report lines to a file-like sink (anything with a write method)
+    Lines are written in small batches so memory stays constant however big the report is.
+    Returns the number of characters written."""
+    written = 0
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            chunk = "".join(batch)
+            sink.write(chunk)
+            written += len(chunk)
+            batch.clear()
+    if batch:
+        chunk = "".join(batch)
+        sink.write(chunk)
+        written += len(chunk)
+    return written
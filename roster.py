@@ -0,0 +1,224 @@
+"""
+File: roster.py
+Description: Keeper roster optimiser that balances enclosure workloads across zookeepers
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import heapq
+
+#keepers tried (least busy first) when nothing fits the least busy keeper
+FALLBACK_CANDIDATES = 8
+
+
+def enclosure_workload(enclosure, animal_weight=1.0, cleaning_weight=0.05, base=1.0):
+    """Work needed for one enclosure: a base amount, plus each animal living in it, plus how far
+    it is below full cleanliness (more animals also make it get dirty faster)"""
+    return (base + animal_weight * enclosure.animal_count()
+            + cleaning_weight * (100 - enclosure.get_cleanliness_lvl()))
+
+
+class RosterPlan:
+    """Result of plan_roster: which keeper looks after each enclosure"""
+
+    def __init__(self, keepers, assignments, loads, unassigned, moved):
+        self._keepers = keepers
+        self._assignments = assignments  #enclosure -> keeper
+        self._loads = loads  #keeper -> total workload
+        self._unassigned = unassigned
+        self._moved = moved
+
+    def get_assignments(self):
+        return dict(self._assignments)
+
+    def get_keeper(self, enclosure):
+        return self._assignments.get(enclosure)
+
+    def get_enclosures(self, keeper):
+        return [enclosure for enclosure, owner in self._assignments.items() if owner is keeper]
+
+    def get_keeper_loads(self):
+        return dict(self._loads)
+
+    def get_max_load(self):
+        return max(self._loads.values(), default=0.0)
+
+    def get_min_load(self):
+        return min(self._loads.values(), default=0.0)
+
+    def get_unassigned(self):
+        """Enclosures left without a keeper because every keeper hit max_enclosures"""
+        return list(self._unassigned)
+
+    def get_moved(self):
+        """Enclosures whose keeper is different from the current roster passed in"""
+        return list(self._moved)
+
+    def __str__(self):
+        return (f"Roster of {len(self._assignments)} enclosures over {len(self._keepers)} keepers: "
+                f"max load {self.get_max_load():.1f}, min load {self.get_min_load():.1f}, "
+                f"{len(self._unassigned)} unassigned, {len(self._moved)} moved")
+
+
+def plan_roster(keepers, enclosures, max_enclosures=None, current=None, workload=enclosure_workload,
+                max_rounds=None, rebalance_threshold=0.1):
+    """Work out a balanced keeper roster without assigning anything
+    The aim is the smallest possible maximum workload of any keeper (see enclosure_workload)
+    with no keeper given more than max_enclosures enclosures.
+    Enclosures are handed out heaviest first, each to the keeper with the least work so far
+    (longest processing time first). Then a local search keeps moving or swapping enclosures
+    between the busiest keeper and the least busy one while that lowers the maximum.
+    current is an optional {enclosure: keeper} roster to start from: enclosures whose keeper is
+    still in keepers stay where they are and only the others are handed out, so a small change
+    in staff or enclosures only moves a few enclosures (max_rounds limits how many more the local
+    search may move, by default it runs until no move helps). Moves and swaps can get stuck on a
+    poor starting roster, so a fresh plan is also worked out and used instead when its maximum
+    workload is more than rebalance_threshold (10%) lower."""
+    keepers = list(keepers)
+    enclosures = list(enclosures)
+    order = {keeper: i for i, keeper in enumerate(keepers)}
+    weights = {enclosure: workload(enclosure) for enclosure in enclosures}
+    limit = max_enclosures if max_enclosures is not None else len(enclosures) or 1
+
+    owned = {keeper: {} for keeper in keepers}  #keeper -> {enclosure: None}
+    loads = {keeper: 0.0 for keeper in keepers}
+    assignments = {}
+    todo = []
+    for enclosure in enclosures:
+        keeper = current.get(enclosure) if current is not None else None
+        if keeper in owned and len(owned[keeper]) < limit:
+            owned[keeper][enclosure] = None
+            loads[keeper] += weights[enclosure]
+            assignments[enclosure] = keeper
+        else:
+            todo.append(enclosure)
+
+    #greedy: heaviest enclosure first, to the least loaded keeper with room (min-heap of loads)
+    todo.sort(key=lambda enclosure: weights[enclosure], reverse=True)
+    heap = [(loads[keeper], order[keeper], keeper) for keeper in keepers if len(owned[keeper]) < limit]
+    heapq.heapify(heap)
+    unassigned = []
+    for enclosure in todo:
+        if not heap:
+            unassigned.append(enclosure)
+            continue
+        load, i, keeper = heapq.heappop(heap)
+        owned[keeper][enclosure] = None
+        loads[keeper] = load + weights[enclosure]
+        assignments[enclosure] = keeper
+        if len(owned[keeper]) < limit:
+            heapq.heappush(heap, (loads[keeper], i, keeper))
+
+    _improve(keepers, owned, loads, assignments, weights, limit, order, max_rounds)
+
+    moved = []
+    if current is not None:
+        moved = [enclosure for enclosure, keeper in assignments.items() if current.get(enclosure) is not keeper]
+    plan = RosterPlan(keepers, assignments, loads, unassigned, moved)
+    if current is not None and rebalance_threshold is not None and current:
+        fresh = plan_roster(keepers, enclosures, max_enclosures, None, workload)
+        if fresh.get_max_load() < plan.get_max_load() * (1 - rebalance_threshold):
+            moved = [enclosure for enclosure, keeper in fresh.get_assignments().items()
+                     if current.get(enclosure) is not keeper]
+            return RosterPlan(keepers, fresh.get_assignments(), fresh.get_keeper_loads(),
+                              fresh.get_unassigned(), moved)
+    return plan
+
+
+def _improve(keepers, owned, loads, assignments, weights, limit, order, max_rounds):
+    """Local search on the busiest keeper
+    Busiest and least busy keepers are found with two heaps of (load, stamp) entries; an entry
+    is stale once the keeper's stamp moved on and is skipped. Each round moves one enclosure
+    (or swaps two) so both keepers end up below the old maximum, as close to even as possible."""
+    if len(keepers) < 2:
+        return
+    stamps = {keeper: 0 for keeper in keepers}
+    busiest = [(-loads[keeper], order[keeper], 0, keeper) for keeper in keepers]
+    idlest = [(loads[keeper], order[keeper], 0, keeper) for keeper in keepers]
+    heapq.heapify(busiest)
+    heapq.heapify(idlest)
+
+    def top(heap):
+        while heap and heap[0][2] != stamps[heap[0][3]]:
+            heapq.heappop(heap)
+        return heap[0][3] if heap else None
+
+    def update(keeper):
+        stamps[keeper] += 1
+        heapq.heappush(busiest, (-loads[keeper], order[keeper], stamps[keeper], keeper))
+        heapq.heappush(idlest, (loads[keeper], order[keeper], stamps[keeper], keeper))
+
+    def best_exchange(high, low):
+        #(distance from an even split, enclosure to move, enclosure to swap back or None)
+        gap = loads[high] - loads[low]
+        if gap <= 1e-9:
+            return None
+        best = None
+        target = gap / 2
+        if len(owned[low]) < limit:
+            for enclosure in owned[high]:
+                shift = weights[enclosure]
+                if 0 < shift < gap:
+                    score = abs(shift - target)
+                    if best is None or score < best[0]:
+                        best = (score, enclosure, None)
+        for enclosure in owned[high]:
+            for other in owned[low]:
+                shift = weights[enclosure] - weights[other]
+                if 0 < shift < gap:
+                    score = abs(shift - target)
+                    if best is None or score < best[0]:
+                        best = (score, enclosure, other)
+        return best
+
+    if max_rounds is None:
+        #every round strictly lowers the sum of squared loads, this only guards against slow creep
+        max_rounds = 4 * len(assignments) + len(keepers)
+    rounds = 0
+    while rounds < max_rounds:
+        high = top(busiest)
+        low = top(idlest)
+        if high is low:
+            break
+        best = best_exchange(high, low)
+        if best is None:
+            #nothing fits the least busy keeper, so try the others from least to most busy
+            for candidate in heapq.nsmallest(FALLBACK_CANDIDATES, keepers, key=loads.__getitem__):
+                if loads[candidate] >= loads[high]:
+                    break
+                best = best_exchange(high, candidate)
+                if best is not None:
+                    low = candidate
+                    break
+        if best is None:
+            break
+        score, enclosure, other = best
+        del owned[high][enclosure]
+        owned[low][enclosure] = None
+        assignments[enclosure] = low
+        loads[high] -= weights[enclosure]
+        loads[low] += weights[enclosure]
+        if other is not None:
+            del owned[low][other]
+            owned[high][other] = None
+            assignments[other] = high
+            loads[low] -= weights[other]
+            loads[high] += weights[other]
+        update(high)
+        update(low)
+        rounds += 1
+    return rounds
+
+
+def apply_roster(plan, keepers):
+    """Make each keeper's enclosure assignments match a plan from plan_roster
+    Keepers are taken off planned enclosures the plan gives to someone else (or leaves
+    unassigned). Enclosures that were not part of the plan are left alone."""
+    planned = set(plan.get_assignments()) | set(plan.get_unassigned())
+    for keeper in keepers:
+        for enclosure in keeper.get_assigned_enclosures():
+            if enclosure in planned and plan.get_keeper(enclosure) is not keeper:
+                keeper.unassign_enclosure(enclosure)
+    for enclosure, keeper in plan.get_assignments().items():
+        keeper.assign_enclosure(enclosure)
@@ -0,0 +1,228 @@
+"""
+File: search.py
+Description: This class represents the full-text search index over health record descriptions, plans and notes
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from bisect import bisect_left, insort
+import heapq
+import math
+import re
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(["a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+                        "of", "on", "or", "the", "to", "was", "were", "with"])
+
+
+def tokenize(text):
+    """Split text into lower case words, leaving out the stop words"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class SearchResult:
+    """One hit from a search: the record and its relevance score"""
+
+    __slots__ = ("_record", "_score")
+
+    def __init__(self, record, score):
+        self._record = record
+        self._score = score
+
+    def get_record(self):
+        return self._record
+
+    def get_animal(self):
+        return self._record.get_animal()
+
+    def get_score(self):
+        return self._score
+
+    def __str__(self):
+        return f"{self._score:.3f} {self._record}"
+
+
+class HealthSearchIndex:
+    """Inverted index of the words in every health record's description, treatment plan and notes
+    Each word maps to the records it appears in (with how often it appears). The vocabulary is
+    also kept sorted so a prefix such as "parasit*" is found with a bisect. Results are ranked
+    with BM25, so rare words and short records count for more.
+    Notes are only ever appended to a record, so a new note only indexes that note."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings = {}  #word -> {record: count}
+        self._vocabulary = []  #sorted list of every word in _postings
+        self._lengths = {}  #record -> number of words indexed for it
+        self._notes_seen = {}  #record -> number of its notes already indexed
+        self._plans = {}  #record -> words of the treatment plan that was indexed
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, record):
+        return record in self._lengths
+
+    def get_vocabulary_size(self):
+        return len(self._vocabulary)
+
+    #define methods to keep the index in step with the health records
+    def _add_tokens(self, record, tokens):
+        postings = self._postings
+        for token in tokens:
+            bucket = postings.get(token)
+            if bucket is None:
+                bucket = postings[token] = {}
+                insort(self._vocabulary, token)
+            bucket[record] = bucket.get(record, 0) + 1
+        self._lengths[record] = self._lengths.get(record, 0) + len(tokens)
+        self._total_length += len(tokens)
+
+    def _remove_tokens(self, record, tokens):
+        postings = self._postings
+        for token in tokens:
+            bucket = postings.get(token)
+            if bucket is None or record not in bucket:
+                continue
+            bucket[record] -= 1
+            if not bucket[record]:
+                del bucket[record]
+                if not bucket:
+                    del postings[token]
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+        self._lengths[record] -= len(tokens)
+        self._total_length -= len(tokens)
+
+    def add(self, record):
+        """Index a record, or only what changed in it since it was last indexed"""
+        if record not in self._lengths:
+            self._lengths[record] = 0
+            self._notes_seen[record] = 0
+            self._plans[record] = []
+            self._add_tokens(record, tokenize(record.get_description()))
+
+        notes = record.get_notes()
+        seen = self._notes_seen[record]
+        if seen < len(notes):
+            tokens = []
+            for entry in notes[seen:]:
+                tokens += tokenize(entry['note'])
+            self._add_tokens(record, tokens)
+            self._notes_seen[record] = len(notes)
+
+        plan = tokenize(record.get_treatment_plan())
+        if plan != self._plans[record]:
+            self._remove_tokens(record, self._plans[record])
+            self._add_tokens(record, plan)
+            self._plans[record] = plan
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+
+    def remove(self, record):
+        if record not in self._lengths:
+            return False
+        tokens = tokenize(record.get_description()) + self._plans[record]
+        for entry in record.get_notes()[:self._notes_seen[record]]:
+            tokens += tokenize(entry['note'])
+        self._remove_tokens(record, tokens)
+        del self._lengths[record]
+        del self._notes_seen[record]
+        del self._plans[record]
+        return True
+
+    def add_animal(self, animal):
+        self.add_many(animal.get_health_record())
+
+    def remove_animal(self, animal):
+        for record in animal.get_health_record():
+            self.remove(record)
+
+    #define methods for searching
+    def expand(self, prefix):
+        """Return every indexed word starting with prefix"""
+        prefix = prefix.lower()
+        words = []
+        pos = bisect_left(self._vocabulary, prefix)
+        while pos < len(self._vocabulary) and self._vocabulary[pos].startswith(prefix):
+            words.append(self._vocabulary[pos])
+            pos += 1
+        return words
+
+    def _terms(self, query, prefix):
+        """Turn the query into a list of word groups, one group per query word
+        A word ending in * (or every word if prefix is True) matches all words starting with it."""
+        groups = []
+        for raw in query.split():
+            is_prefix = prefix or raw.endswith("*")
+            for token in tokenize(raw):
+                groups.append(self.expand(token) if is_prefix else [token])
+        return groups
+
+    def search(self, query, prefix=False, match_all=False, issue_type=None, severity=None, status=None,
+               limit=20):
+        """Return the best matching records for query as a list of SearchResult, best first
+        match_all only keeps records matching every query word. issue_type, severity and status
+        filter on the record (each can be a single value or a list of values)."""
+        groups = self._terms(query, prefix)
+        if not groups:
+            return []
+        issue_types = _as_set(issue_type)
+        severities = _as_set(severity)
+        statuses = _as_set(status)
+
+        count = len(self._lengths)
+        average = self._total_length / count if count else 0
+        scores = {}
+        matched = {}
+        for number, words in enumerate(groups):
+            for word in words:
+                bucket = self._postings.get(word)
+                if not bucket:
+                    continue
+                idf = math.log(1 + (count - len(bucket) + 0.5) / (len(bucket) + 0.5))
+                for record, freq in bucket.items():
+                    if issue_types is not None and record.get_issue_type() not in issue_types:
+                        continue
+                    if severities is not None and record.get_severity() not in severities:
+                        continue
+                    if statuses is not None and record.get_status() not in statuses:
+                        continue
+                    norm = 1 - self.B + self.B * self._lengths[record] / average
+                    scores[record] = scores.get(record, 0.0) + idf * freq * (self.K1 + 1) / (freq + self.K1 * norm)
+                    if match_all:
+                        matched.setdefault(record, set()).add(number)
+
+        if match_all:
+            scores = {record: score for record, score in scores.items() if len(matched[record]) == len(groups)}
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [SearchResult(record, score) for record, score in ranked]
+
+    def search_animals(self, query, limit=20, **options):
+        """Return the animals with matching records, ordered by their best matching record"""
+        animals = []
+        seen = set()
+        for result in self.search(query, limit=None, **options):
+            animal = result.get_animal()
+            if animal not in seen:
+                seen.add(animal)
+                animals.append(animal)
+                if limit is not None and len(animals) == limit:
+                    break
+        return animals
+
+
+def _as_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
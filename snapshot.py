@@ -0,0 +1,368 @@
+"""
+File: snapshot.py
+Description: Compact versioned binary snapshots for saving and loading a whole Zoo
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from datetime import datetime
+from functools import lru_cache
+import gc
+import io
+import sys
+import pickle
+import struct
+
+from animal import Animal, Mammal, Bird, Reptile, Lion, Python, Parrot
+from enclosure import Enclosure
+from health_system import HealthRecord
+from staff import ZooKeeper, Vet
+from zoo import Zoo
+import compatibility
+
+#file layout: 8 byte magic, 2 byte format version, then the payload
+#the payload only holds plain values (str/int/float/bool/None/tuple/list/dict) laid out in columns,
+#objects point at each other by row number, and it is read back with an unpickler that refuses
+#to load any class, so a snapshot can't run code when it is opened
+MAGIC = b"ZOOSNAP\x00"
+VERSION = 1
+_HEADER = struct.Struct(">8sH")
+
+#classes that can appear in a snapshot, keyed by class name
+ANIMAL_CLASSES = {cls.__name__: cls for cls in (Mammal, Bird, Reptile, Lion, Python, Parrot)}
+STAFF_CLASSES = {cls.__name__: cls for cls in (ZooKeeper, Vet)}
+
+_SKIP_SLOTS = set(Animal.__slots__)
+
+
+def register_animal_class(cls):
+    """Allow animals of a new Animal subclass to be saved and loaded"""
+    ANIMAL_CLASSES[cls.__name__] = cls
+    return cls
+
+
+@lru_cache(maxsize=None)
+def _extra_slots(cls):
+    #slots added by the subclass on top of the Animal base class
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get("__slots__", ()):
+            if name not in _SKIP_SLOTS and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def to_timestamp(value):
+    return None if value is None else value.timestamp()
+
+
+def to_datetime(value):
+    return None if value is None else datetime.fromtimestamp(value)
+
+
+class _gc_paused:
+    """Pause the cyclic garbage collector while a snapshot is built or restored
+    Creating hundreds of thousands of objects that are all kept would otherwise trigger
+    many full collections that find nothing to free."""
+    def __enter__(self):
+        self._enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *exc_info):
+        if self._enabled:
+            gc.enable()
+        return False
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that only accepts plain values"""
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Snapshot contains a forbidden object: {module}.{name}")
+
+
+def plain_loads(data):
+    """Unpickle bytes that may only contain plain values (shared with the journal)"""
+    return _PlainUnpickler(io.BytesIO(data)).load()
+
+
+#define methods to write a snapshot
+def encode_animal(animal):
+    """Return the plain state of one animal (class name, base fields and subclass fields)"""
+    cls = type(animal)
+    if ANIMAL_CLASSES.get(cls.__name__) is not cls:
+        raise ValueError(f"Animal class {cls.__name__} is not registered for snapshots")
+    extra = tuple(getattr(animal, name) for name in _extra_slots(cls))
+    return (cls.__name__, animal.get_name(), animal.get_species(), animal.get_age(), animal.get_diet(), extra)
+
+
+def decode_animal(state):
+    """Build an animal from the state returned by encode_animal without calling __init__"""
+    cls_name, name, species, age, diet, extra = state
+    cls = ANIMAL_CLASSES[cls_name]
+    animal = cls.__new__(cls)
+    #same starting state as Animal.__init__
+    animal._name = name
+    animal._species = sys.intern(species)
+    animal._age = age
+    animal._diet = sys.intern(diet)
+    animal._health_record = None
+    animal._active_records = None
+    animal._severe_records = None
+    animal._health_manager = None
+    animal._enclosure = None
+    animal._watchers = ()
+    animal._version = 0
+    animal._history_index = None
+    animal._locks = None
+    for slot, value in zip(_extra_slots(cls), extra):
+        setattr(animal, slot, value)
+    return animal
+
+
+def encode_record(record):
+    """Return the plain state of one health record (without its animal)"""
+    notes = tuple((to_timestamp(n["date"]), n["note"], n["added_by"]) for n in record.get_notes())
+    return (record.get_issue_type(), record.get_description(), record.get_recorded_by(),
+            record.get_severity(), to_timestamp(record.get_date_recorded()), record.get_treatment_plan(),
+            record.get_status(), to_timestamp(record.get_resolution_date()), notes)
+
+
+def decode_record(animal, state, position):
+    """Build a health record for animal from the state returned by encode_record
+    position is where the record sits in the animal's health record list"""
+    (issue_type, description, recorded_by, severity, recorded, plan, status, resolved, notes) = state
+    record = HealthRecord.__new__(HealthRecord)
+    record._animal = animal
+    record._issue_type = issue_type
+    record._description = description
+    record._recorded_by = recorded_by
+    record._severity = severity
+    record._date_recorded = to_datetime(recorded)
+    record._treatment_plan = plan
+    record._notes = [{'date': to_datetime(date), 'note': note, 'added_by': added_by}
+                     for date, note, added_by in notes]
+    record._status = status
+    record._resolution_date = to_datetime(resolved)
+    record._recorded = True
+    record._position = position
+    return record
+
+
+def _collect_animals(zoo):
+    #every animal the zoo can reach, zoo animals first so their rows follow the zoo order
+    animals = {}
+    for animal in zoo.get_animals():
+        animals[animal] = len(animals)
+    for enclosure in zoo.get_enclosures():
+        for animal in enclosure.get_animals():
+            animals.setdefault(animal, len(animals))
+    for staff in zoo.get_staff():
+        for animal in staff.get_assigned_animals():
+            animals.setdefault(animal, len(animals))
+    return animals
+
+
+def build_payload(zoo):
+    """Lay the zoo out as plain columns ready to be written"""
+    animals = _collect_animals(zoo)
+    enclosures = {enclosure: row for row, enclosure in enumerate(zoo.get_enclosures())}
+
+    animal_states = []
+    animal_ids = []
+    record_start = []
+    records = []
+    for animal in animals:
+        animal_states.append(encode_animal(animal))
+        animal_ids.append(zoo.get_animal_id(animal))  #None if the animal is not in the zoo itself
+        record_start.append(len(records))
+        records.extend(encode_record(record) for record in animal.get_health_record())
+    record_start.append(len(records))
+
+    enclosure_states = []
+    for enclosure in enclosures:
+        enclosure_states.append((
+            zoo.get_enclosure_registry_id(enclosure), enclosure.get_enclosure_id(), enclosure.get_size(),
+            enclosure.get_environment(), enclosure.get_capacity(), enclosure.get_cleanliness_lvl(),
+            enclosure.get_compatible_species(), [animals[a] for a in enclosure.get_animals()]))
+
+    staff_states = []
+    for staff in zoo.get_staff():
+        staff_states.append((
+            type(staff).__name__, zoo.get_staff_id(staff), staff.get_name(), staff.get_employee_id(),
+            [animals[a] for a in staff.get_assigned_animals()],
+            [enclosures[e] for e in staff.get_assigned_enclosures() if e in enclosures]))
+
+    #how the zoo was set up, so a restored zoo checks moves (and locks) the same way
+    rules = zoo.get_rules()
+    settings = {
+        "rules": None if rules is None else [rule.get_name() for rule in rules.get_rules()],
+        "thread_safe": zoo.is_thread_safe(),
+        "lock_stripes": zoo.get_lock_stripes(),
+        "report_cache_size": zoo.get_report_cache().get_max_entries(),
+    }
+    return {
+        "name": zoo.name,
+        "settings": settings,
+        "animals": animal_states,
+        "animal_ids": animal_ids,
+        "record_start": record_start,
+        "records": records,
+        "enclosures": enclosure_states,
+        "staff": staff_states,
+    }
+
+
+def dumps(zoo):
+    """Return the snapshot of a zoo as bytes"""
+    sink = io.BytesIO()
+    dump(zoo, sink)
+    return sink.getvalue()
+
+
+def dump(zoo, sink):
+    with _gc_paused():
+        payload = build_payload(zoo)
+    dump_payload(payload, sink)
+
+
+def dump_payload(payload, sink):
+    sink.write(_HEADER.pack(MAGIC, VERSION))
+    pickle.dump(payload, sink, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def save_zoo(zoo, path):
+    with open(path, "wb") as sink:
+        dump(zoo, sink)
+
+
+#define methods to read a snapshot
+class LazyHistory:
+    """Placeholder for an animal's health record list that is only built on first access
+    The active records are built straight away (they are needed by the indexes and triage queue)
+    and are reused here so every record exists as exactly one object."""
+
+    __slots__ = ("_animal", "_records", "_start", "_end", "_built")
+
+    def __init__(self, animal, records, start, end, built):
+        self._animal = animal
+        self._records = records
+        self._start = start
+        self._end = end
+        self._built = built  #row -> record already built
+
+    def load(self):
+        built = self._built
+        start = self._start
+        return [built[row] if row in built else decode_record(self._animal, self._records[row], row - start)
+                for row in range(start, self._end)]
+
+    def __len__(self):
+        return self._end - self._start
+
+
+def _restore_history(animal, records, start, end, lazy):
+    if start == end:
+        return
+    if not lazy:
+        history = [decode_record(animal, records[row], row - start) for row in range(start, end)]
+        animal._health_record = history
+        for record in history:
+            if record.is_active():
+                animal.update_record_index(record)
+        return
+
+    #status is the 7th field of a record state
+    built = {}
+    for row in range(start, end):
+        if records[row][6] != "Resolved":
+            record = decode_record(animal, records[row], row - start)
+            built[row] = record
+            animal.update_record_index(record)
+    animal._health_record = LazyHistory(animal, records, start, end, built)
+
+
+def new_zoo(name, settings=None, rules=None):
+    """Create an empty Zoo with the settings saved in a snapshot (defaults for a missing setting)
+    rules overrides the saved rules, e.g. for rules that are not registered by name."""
+    settings = settings or {}
+    if rules is None and settings.get("rules") is not None:
+        rules = compatibility.rules_named(settings["rules"])
+    options = {"rules": rules, "thread_safe": settings.get("thread_safe", False)}
+    if settings.get("lock_stripes"):
+        options["lock_stripes"] = settings["lock_stripes"]
+    if settings.get("report_cache_size"):
+        options["report_cache_size"] = settings["report_cache_size"]
+    return Zoo(name, **options)
+
+
+def restore_payload(payload, lazy_records=False, rules=None):
+    """Rebuild a Zoo from the plain columns of a snapshot (see new_zoo for rules)"""
+    zoo = new_zoo(payload["name"], payload.get("settings"), rules)
+    records = payload["records"]
+    record_start = payload["record_start"]
+
+    animals = []
+    for row, state in enumerate(payload["animals"]):
+        animal = decode_animal(state)
+        _restore_history(animal, records, record_start[row], record_start[row + 1], lazy_records)
+        animals.append(animal)
+
+    #enclosures get their animals before the animals join the zoo so the enclosure index is right
+    enclosures = []
+    for (registry_id, enc_id, size, environment, capacity, cleanliness,
+         species, animal_rows) in payload["enclosures"]:
+        enclosure = Enclosure(enc_id, size, environment, capacity)
+        enclosure.set_cleanliness_lvl(cleanliness)
+        enclosure._compatible_species = species
+        enclosure._animals = [animals[row] for row in animal_rows]
+        for animal in enclosure._animals:
+            animal.set_enclosure(enclosure)
+        enclosures.append((registry_id, enclosure))
+
+    #enclosures join first so they don't re-index animals the zoo doesn't have yet
+    for registry_id, enclosure in enclosures:
+        zoo.add_enclosure(enclosure, registry_id)
+    in_zoo = [(animal, animal_id) for animal, animal_id in zip(animals, payload["animal_ids"])
+              if animal_id is not None]
+    zoo.add_animals([animal for animal, _ in in_zoo], [animal_id for _, animal_id in in_zoo])
+
+    for cls_name, staff_id, name, employee_id, animal_rows, enclosure_rows in payload["staff"]:
+        staff = STAFF_CLASSES[cls_name](name, employee_id)
+        for row in animal_rows:
+            staff.assign_animal(animals[row])
+        for row in enclosure_rows:
+            staff.assign_enclosure(enclosures[row][1])
+        zoo.add_staff(staff, staff_id)
+    return zoo
+
+
+def loads(data, lazy_records=False, rules=None):
+    return load(io.BytesIO(data), lazy_records, rules)
+
+
+def load(source, lazy_records=False, rules=None):
+    """Read a snapshot from a binary file-like source and return the Zoo
+    If lazy_records is True resolved health records are only built when get_health_record()
+    is first called on their animal. rules overrides the compatibility rules saved with the zoo."""
+    payload = read_payload(source)
+    with _gc_paused():
+        return restore_payload(payload, lazy_records, rules)
+
+
+def read_payload(source):
+    """Read the plain columns of a snapshot without building any objects"""
+    header = source.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError("Not a zoo snapshot (file too short)")
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a zoo snapshot")
+    if version > VERSION:
+        raise ValueError(f"Snapshot version {version} is newer than supported version {VERSION}")
+    return _PlainUnpickler(source).load()
+
+
+def load_zoo(path, lazy_records=False, rules=None):
+    with open(path, "rb") as source:
+        return load(source, lazy_records, rules)
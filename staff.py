@@ -18,8 +18,13 @@ class Staff(ABC):
     def __init__(self, name, employee_id):
         self._name = name
         self._employee_id = employee_id
-        self._assigned_animals = []
-        self._assigned_enclosures = []
+        #dicts keep the order of assignment and give O(1) membership checks and removal
+        self._assigned_animals = {}
+        self._assigned_enclosures = {}
+        #tuples of the assignments handed out by the getters, dropped whenever the assignments change
+        self._animals_view = None
+        self._enclosures_view = None
+        self._watchers = () #objects told about assignment changes (e.g. the zoo's assignment index)
 
     #define getters for accessing private attributes above
     def get_name(self):
@@ -29,10 +34,33 @@ class Staff(ABC):
         return self._employee_id
 
     def get_assigned_animals(self):
-        return self._assigned_animals.copy()
+        """Return a tuple of the assigned animals (the same one until the assignments change)"""
+        if self._animals_view is None:
+            self._animals_view = tuple(self._assigned_animals)
+        return self._animals_view
 
     def get_assigned_enclosures(self):
-        return self._assigned_enclosures.copy()
+        """Return a tuple of the assigned enclosures (the same one until the assignments change)"""
+        if self._enclosures_view is None:
+            self._enclosures_view = tuple(self._assigned_enclosures)
+        return self._enclosures_view
+
+    def get_animal_count(self):
+        return len(self._assigned_animals)
+
+    def get_enclosure_count(self):
+        return len(self._assigned_enclosures)
+
+    def is_assigned(self, animal_or_enclosure):
+        return animal_or_enclosure in self._assigned_animals or animal_or_enclosure in self._assigned_enclosures
+
+    #watchers must have animal_assigned(staff, animal, added) and enclosure_assigned(staff, enclosure, added) methods
+    def add_watcher(self, watcher):
+        if watcher not in self._watchers:
+            self._watchers = self._watchers + (watcher,)
+
+    def remove_watcher(self, watcher):
+        self._watchers = tuple(w for w in self._watchers if w is not watcher)
 
     #abstract methods for different staff
     @abstractmethod
@@ -46,10 +74,33 @@ class Staff(ABC):
     #general methods for assigning animals and enclosure to each staff member
     def assign_animal(self, animal):
         if animal not in self._assigned_animals:
-            self._assigned_animals.append(animal)
+            self._assigned_animals[animal] = None
+            self._animals_view = None
+            for watcher in self._watchers:
+                watcher.animal_assigned(self, animal, True)
+
     def assign_enclosure(self, enclosure):
         if enclosure not in self._assigned_enclosures:
-            self._assigned_enclosures.append(enclosure)
+            self._assigned_enclosures[enclosure] = None
+            self._enclosures_view = None
+            for watcher in self._watchers:
+                watcher.enclosure_assigned(self, enclosure, True)
+
+    def unassign_animal(self, animal):
+        if self._assigned_animals.pop(animal, False) is False:
+            return False
+        self._animals_view = None
+        for watcher in self._watchers:
+            watcher.animal_assigned(self, animal, False)
+        return True
+
+    def unassign_enclosure(self, enclosure):
+        if self._assigned_enclosures.pop(enclosure, False) is False:
+            return False
+        self._enclosures_view = None
+        for watcher in self._watchers:
+            watcher.enclosure_assigned(self, enclosure, False)
+        return True
 
 #define subclasses for unique staff member types like Zookeeper and vet
 class ZooKeeper(Staff):
@@ -60,6 +111,9 @@ class ZooKeeper(Staff):
     def get_staff_role(self):
         return "ZooKeeper"
 
+    def __str__(self):
+        return f"ZooKeeper {self._name} (ID: {self._employee_id})"
+
     #actions for the zookeeper include feeding animals, watering animals, cleaning enclosures, training animals
     def feed_animal(self, animal):
         return f"Zookeeper {self._name} feeds {animal.get_name()}"
@@ -72,7 +126,7 @@ class ZooKeeper(Staff):
 
     def cleanup_enclosure(self, enclosure):
         enclosure.clean_enclosure()
-        return f"Zookeeper {self._name} cleaned Enclosure - {enclosure.get_enclosure()}"
+        return f"Zookeeper {self._name} cleaned Enclosure - {enclosure.get_enclosure_id()}"
 
     def train_animal(self, animal):
         return f"Zookeeper {self._name} trained {animal.get_name()}"
@@ -83,11 +137,25 @@ class Vet(Staff):
     """Represents a vet member as a subclass of Staff with health management responsibilities"""
     def __init__(self, name, employee_id):
         super().__init__(name, employee_id)
+        self._triage = None #zoo-wide triage queue, set when the vet joins a zoo
+        self._report_cache = None #zoo's ReportCache, health histories are kept there while in a zoo
+
+    def get_triage_queue(self):
+        return self._triage
+
+    def set_triage_queue(self, triage):
+        self._triage = triage
+
+    def set_report_cache(self, cache):
+        self._report_cache = cache
 
     #override get role method for vet
     def get_staff_role(self):
         return "Vet"
 
+    def __str__(self):
+        return f"Dr.{self._name} (ID: {self._employee_id})"
+
     def create_record(self, animal,issue_type, description, severity):
         """create a comprehensive health record for animal"""
         health_rec = HealthRecord(
@@ -99,23 +167,29 @@ class Vet(Staff):
         )
 
         #add health record to animal
-        animal.add_health_record(health_rec)
+        animal.set_health_record(health_rec)
 
         return health_rec
 
 #methods for health analysis and history
 
     def get_active_issue(self, animal):
-        """Get active health issues for given animal"""
-        return [record for record in animal.get_health_record() if record.is_active()]
+        """Get active health issues for given animal (read from the animal's active index)"""
+        return animal.get_active_records()
 
     def get_critical_issues(self, animal):
-        """Get critical health issues for given animal"""
-        return [record for record in animal.get_health_record() if record.is_active() and record.get_severity() in ["High","Critical"]]
+        """Get critical health issues for given animal (read from the animal's severe index)"""
+        return animal.get_severe_records()
 
 
     def get_health_history(self, animal):
-        """Get health history for given animal"""
+        """Get health history for given animal (cached by the zoo until the animal changes)"""
+        if self._report_cache is None:
+            return self._build_health_history(animal)
+        return self._report_cache.get(("history", animal), animal.get_version(),
+                                      lambda: self._build_health_history(animal))
+
+    def _build_health_history(self, animal):
         recs = animal.get_health_record()
         if not recs:
             return f"{animal.get_name()} has no existing health records"
@@ -124,25 +198,64 @@ class Vet(Staff):
         history.append(f"Health History for {animal.get_name()}:\n")
         history.append(f"Total records = {len(recs)}\n")
 
-        active = [r for r in recs if r.is_active()]
-        resolved = [r for r in recs if r.get_status() == "Resolved"]
+        active = animal.get_active_records()
+        #every record that isn't active has been resolved
+        resolved_count = len(recs) - len(active)
 
         history.append(f"Total Active Health Issues = {len(active)}\n")
-        history.append(f"Total Resolved Health Issues = {len(resolved)}\n")
+        history.append(f"Total Resolved Health Issues = {resolved_count}\n")
 
         if active:
-            history.append(f"List of Active Issues:")
+            history.append(f"List of Active Issues:\n")
             for record in active:
-                history.append(f" - {record}")
-        if resolved:
-            history.append(f"List of Resolved Issues:")
-            #show 3 most recent resolved issues
-            for record in resolved[-3]:
-                history.append(f" - {record}")
+                history.append(f" - {record}\n")
+        if resolved_count:
+            history.append(f"List of Resolved Issues:\n")
+            #show 3 most recent resolved issues (walk back from the newest record)
+            recent = []
+            for record in reversed(recs):
+                if not record.is_active():
+                    recent.append(record)
+                    if len(recent) == 3:
+                        break
+            for record in reversed(recent):
+                history.append(f" - {record}\n")
 
         return "".join(history)
 
 
+    def get_health_history_page(self, animal, cursor=None, limit=20, status=None, severity=None, newest_first=True):
+        """Get one page of an animal's health records (optionally only of given status/severity)
+        Pass the page's get_next_cursor() back in to get the following page."""
+        return animal.get_history_page(cursor, limit, status, severity, newest_first)
+
+
+#triage methods - take the most urgent cases from the zoo-wide queue
+
+    def next_case(self):
+        """Return the most urgent open case in the zoo without claiming it"""
+        if self._triage is None:
+            raise ValueError(f"Dr.{self._name} is not attached to a zoo triage queue")
+        return self._triage.peek()
+
+    def claim_cases(self, n=1):
+        """Claim the n most urgent open cases so no other vet is given them"""
+        if self._triage is None:
+            raise ValueError(f"Dr.{self._name} is not attached to a zoo triage queue")
+        return self._triage.claim(self, n)
+
+    def get_claimed_cases(self):
+        if self._triage is None:
+            return []
+        return self._triage.get_claimed(self)
+
+    def release_case(self, health_record):
+        """Put a claimed case back on the triage queue"""
+        if self._triage is None:
+            return False
+        return self._triage.release(health_record)
+
+
 #conuct health check and manage treatment and methods to carry out tasks of the vet like health checks, update treatment plans and treatment management
 
     def conduct_health_check(self, animal):
@@ -166,7 +279,7 @@ class Vet(Staff):
         return f"Dr.{self._name} set treatment plan for {health_record.get_animal().get_name()}"
 
     def add_follow_up_note(self, health_record, note):
-        health_record.add_note(note, added_by=self._name)
+        health_record.add_notes(note, added_by=self._name)
         return f"Dr.{self._name} add follow_up note for {health_record.get_animal().get_name()}"
 
     #add methods for prescribing meds and treatments
@@ -176,7 +289,7 @@ class Vet(Staff):
 
         prescription = f"{medication} - Dosage {dosage} - Frequency {frequency} - Duration: {duration} days"
         note = f"Prescribed medication: {prescription}"
-        health_record.add_note(note, added_by=self._name)
+        health_record.add_notes(note, added_by=self._name)
 
         return f"Dr.{self._name} prescribed medication ({medication}) for {health_record.get_animal().get_name()})"
 
@@ -203,11 +316,9 @@ class Vet(Staff):
     def resolve_health_issue(self, health_record, resolution_notes):
         """Mark a health issue as resolved and return confirmation message"""
         animal = health_record.get_animal()
-        health_record.resolve_issue(animal, resolution_notes)
-
-        active_severe_issue = self.get_critical_issues(animal)
-        if not active_severe_issue:
-            animal._status = False
+        #resolving the record updates the animal's indexes, which clears its treatment status
+        #once no severe issues are left
+        health_record.resolve_issue(resolution_notes)
         return f"Dr.{self._name} resolved health issue for {animal.get_name()}"
 
 
@@ -0,0 +1,92 @@
+"""
+File: synthetic.py
+Description: Deterministic synthetic zoo generator used by the benchmarks
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import random
+
+from animal import Mammal, Bird, Reptile, Lion, Python, Parrot
+from enclosure import Enclosure
+from health_system import HealthRecord, IssueType
+from staff import ZooKeeper, Vet
+from zoo import Zoo
+
+ENVIRONMENTS = ["Savanna", "Jungle", "Desert", "Aviary", "Wetland", "Grassland"]
+ISSUE_TYPES = [IssueType.INJURY, IssueType.ILLNESS, IssueType.MENTAL, IssueType.ROUTINE_CHECKUP, IssueType.OTHER]
+DESCRIPTIONS = ["Limping on front leg", "Loss of appetite", "Routine dental check", "Parasites found in stool",
+                "Skin irritation", "Signs of stress after transfer", "Eye infection", "Weight loss"]
+MAMMAL_SPECIES = ["Kangaroo", "Koala", "Wombat", "Zebra", "Giraffe"]
+BIRD_SPECIES = ["Emu", "Kookaburra", "Cockatoo", "Penguin"]
+REPTILE_SPECIES = ["Goanna", "Crocodile", "Tiger Snake", "Bearded Dragon"]
+
+
+def make_animal(i, rng):
+    """Make the i-th animal, cycling through all the concrete Animal subclasses"""
+    kind = i % 6
+    age = rng.randint(0, 25)
+    if kind == 0:
+        return Lion(f"Lion{i}", age, pride_member=rng.random() < 0.8)
+    if kind == 1:
+        return Python(f"Python{i}", age, round(rng.uniform(1.0, 5.0), 1))
+    if kind == 2:
+        return Parrot(f"Parrot{i}", age, rng.choice(["Rainbow", "Red", "Blue"]))
+    if kind == 3:
+        return Mammal(f"Mammal{i}", rng.choice(MAMMAL_SPECIES), age, "Herbivore", fur="Brown")
+    if kind == 4:
+        return Bird(f"Bird{i}", rng.choice(BIRD_SPECIES), age, "Omnivore", can_fly=rng.random() < 0.7)
+    return Reptile(f"Reptile{i}", rng.choice(REPTILE_SPECIES), age, "Carnivore", venomous=rng.random() < 0.3)
+
+
+def add_history(vet, animal, count, rng, resolved_share=0.9):
+    """Give an animal count health records, most of them resolved"""
+    for _ in range(count):
+        record = vet.create_record(animal, rng.choice(ISSUE_TYPES), rng.choice(DESCRIPTIONS),
+                                   rng.choice(HealthRecord.SEVERITY_LVLS))
+        if rng.random() < resolved_share:
+            record.resolve_issue("Recovered")
+
+
+def generate_zoo(animals=1000, enclosures=None, staff=None, history=2, seed=42, place=True):
+    """Build a zoo with the given numbers of animals, enclosures and staff
+    Same arguments always give the same zoo. By default there is one enclosure per 20 animals and
+    one staff member per 50 animals (a fifth of them vets). history is the number of health records
+    per animal. If place is True animals are moved into enclosures with Zoo.place_animals."""
+    rng = random.Random(seed)
+    if enclosures is None:
+        enclosures = max(1, animals // 20)
+    if staff is None:
+        staff = max(2, animals // 50)
+
+    zoo = Zoo("Synthetic")
+    for i in range(enclosures):
+        zoo.add_enclosure(Enclosure(i, rng.choice(["Small", "Medium", "Large"]), rng.choice(ENVIRONMENTS),
+                                    rng.randint(10, 40)))
+
+    members = []
+    for i in range(staff):
+        member = Vet(f"Vet{i}", i) if i % 5 == 0 else ZooKeeper(f"Keeper{i}", i)
+        zoo.add_staff(member)
+        members.append(member)
+    vets = [member for member in members if isinstance(member, Vet)]
+
+    batch = []
+    for i in range(animals):
+        animal = make_animal(i, rng)
+        if history:
+            add_history(vets[i % len(vets)], animal, history, rng)
+        batch.append(animal)
+    #placement skips animals under treatment, so place before the zoo sees them
+    if place:
+        zoo.place_animals(batch)
+    zoo.add_animals(batch)
+
+    keepers = [member for member in members if isinstance(member, ZooKeeper)]
+    for i, enclosure in enumerate(zoo.get_enclosures()):
+        keeper = keepers[i % len(keepers)]
+        keeper.assign_enclosure(enclosure)
+        for animal in enclosure.get_animals():
+            keeper.assign_animal(animal)
+    return zoo
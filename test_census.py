@@ -0,0 +1,63 @@
+"""
+File: test_census.py
+Description: Behaviour tests for census import and export (round trips and bad rows)
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import io
+
+import pytest
+
+import census
+import synthetic
+from zoo import Zoo
+
+KINDS = ("enclosures", "animals", "staff", "health_records")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_then_import_gives_the_same_zoo(tmp_path, fmt):
+    zoo = synthetic.generate_zoo(300, history=2, seed=5)
+    written = {kind: getattr(census, f"export_{kind}")(zoo, str(tmp_path / f"{kind}.{fmt}")) for kind in KINDS}
+    assert written["animals"] == len(zoo.get_animals())
+
+    copy = Zoo("Copy")
+    for kind in KINDS:
+        result = getattr(census, f"import_{kind}")(copy, str(tmp_path / f"{kind}.{fmt}"))
+        assert result.get_error_count() == 0, [str(error) for error in result.get_errors()]
+
+    assert copy.create_animal_report() == zoo.create_animal_report()
+    assert copy.create_health_report() == zoo.create_health_report()
+    assert [zoo.get_animal_id(animal) for animal in zoo.get_animals()] == \
+        [copy.get_animal_id(animal) for animal in copy.get_animals()]
+    assert [(animal.get_name(), animal.get_enclosure() and animal.get_enclosure().get_enclosure_id())
+            for animal in copy.get_animals()] == \
+        [(animal.get_name(), animal.get_enclosure() and animal.get_enclosure().get_enclosure_id())
+         for animal in zoo.get_animals()]
+    assert [len(staff.get_assigned_animals()) for staff in copy.get_staff()] == \
+        [len(staff.get_assigned_animals()) for staff in zoo.get_staff()]
+
+
+def test_bad_rows_are_reported_and_good_rows_imported():
+    rows = ("type,name,age,species,diet\n"
+            "Lion,Leo,5,,\n"
+            "Lion,,3,,\n"
+            "Unicorn,U,1,,\n"
+            "Mammal,M,-1,Koala,Leaves\n"
+            "Bird,B,x,Emu,Seeds\n")
+    zoo = Zoo("Test")
+    result = census.import_animals(zoo, io.StringIO(rows))
+    assert result.get_rows() == 5
+    assert [animal.get_name() for animal in zoo.get_animals()] == ["Leo"]
+    assert sorted(error.get_line() for error in result.get_errors()) == [3, 4, 5, 6]
+
+
+def test_given_ids_are_kept_next_to_new_rows():
+    rows = "id,type,name,age\n,Lion,A,5\n2,Lion,B,5\n,Lion,C,5\n"
+    zoo = Zoo("Test")
+    result = census.import_animals(zoo, io.StringIO(rows))
+    assert result.get_error_count() == 0
+    assert {animal.get_name(): zoo.get_animal_id(animal) for animal in zoo.get_animals()}["B"] == 2
+    assert len(set(zoo.get_animal_id(animal) for animal in zoo.get_animals())) == 3
@@ -0,0 +1,83 @@
+"""
+File: test_journal.py
+Description: Behaviour tests for the write-ahead journal (recovering a zoo that uses compatibility rules)
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import pytest
+
+from animal import Lion, Mammal, Parrot
+from compatibility import HABITAT
+from enclosure import Enclosure
+from staff import Vet
+from zoo import Zoo
+import journal
+
+
+def state(zoo):
+    """What a recovered zoo has to get back: animals, who lives where, staff and records"""
+    return {
+        "animals": sorted((zoo.get_animal_id(animal), animal.get_name()) for animal in zoo.get_animals()),
+        "enclosures": sorted((enclosure.get_enclosure_id(), sorted(animal.get_name() for animal in enclosure.get_animals()))
+                             for enclosure in zoo.get_enclosures()),
+        "staff": sorted((staff.get_name(), sorted(animal.get_name() for animal in staff.get_assigned_animals()))
+                        for staff in zoo.get_staff()),
+        "records": sorted((animal.get_name(), record.get_description(), record.get_status())
+                          for animal in zoo.get_animals() for record in animal.get_health_record()),
+    }
+
+
+def build(zoo):
+    grassland = Enclosure(1, 100, "Grassland", 5)
+    zoo.add_enclosure(grassland)
+    leo, zed, pip = Lion("Leo", 5), Mammal("Zed", "Zebra", 4, "Herbivore: grass"), Parrot("Pip", 2)
+    zoo.add_animals([leo, zed, pip])
+    #only the habitat rule is in use, so a lion and a zebra may share an enclosure
+    grassland.add_animal(leo)
+    grassland.add_animal(zed)
+    vic = Vet("Vic", 1)
+    zoo.add_staff(vic)
+    vic.assign_animal(leo)
+    vic.create_record(leo, "Injury", "Cut paw", "High").resolve_issue("Healed")
+    vic.create_record(zed, "Illness", "Cough", "Low")
+    return grassland, leo, zed, pip
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_replay_with_rules_keeps_placements_the_default_rules_refuse(tmp_path, thread_safe):
+    zoo = Zoo("Test", rules=[HABITAT], thread_safe=thread_safe)
+    wal = journal.Journal(str(tmp_path / "wal")).attach(zoo)
+    build(zoo)
+    wal.close()
+    #an enclosure with the default rules would refuse the zebra
+    plain = Enclosure(2, 100, "Grassland", 5)
+    plain.add_animal(Lion("Kim", 3))
+    assert plain.can_accept(Mammal("Zoe", "Zebra", 4, "Herbivore: grass")) is not None
+
+    recovered, last = journal.recover(str(tmp_path / "snap"), str(tmp_path / "wal"), rules=[HABITAT])
+    assert last > 0
+    assert state(recovered) == state(zoo)
+    assert (1, ["Leo", "Zed"]) in state(recovered)["enclosures"]
+    assert [rule.get_name() for rule in recovered.get_rules().get_rules()] == ["habitat"]
+
+
+def test_compacted_journal_recovers_rules_and_settings_from_the_snapshot(tmp_path):
+    zoo = Zoo("Test", rules=[HABITAT], thread_safe=True, report_cache_size=500)
+    wal = journal.Journal(str(tmp_path / "wal")).attach(zoo)
+    grassland, leo, zed, pip = build(zoo)
+    wal.compact(zoo, str(tmp_path / "snap"), background=False)
+    #changes after the snapshot come from the journal
+    zoo.remove_animal(zed)
+    nala = Lion("Nala", 4)
+    zoo.add_animal(nala)
+    grassland.add_animal(nala)
+    wal.close()
+
+    recovered, _ = journal.recover(str(tmp_path / "snap"), str(tmp_path / "wal"))
+    assert state(recovered) == state(zoo)
+    assert zed.get_enclosure() is None
+    assert [rule.get_name() for rule in recovered.get_rules().get_rules()] == ["habitat"]
+    assert recovered.is_thread_safe()
+    assert recovered.get_report_cache().get_max_entries() == 500
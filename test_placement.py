@@ -0,0 +1,91 @@
+"""
+File: test_placement.py
+Description: Behaviour tests for bulk enclosure placement, with and without compatibility rules
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from animal import Lion, Parrot, Python
+from compatibility import STANDARD_RULES
+from enclosure import Enclosure
+from zoo import Zoo
+
+
+def make_zoo(rules=STANDARD_RULES):
+    zoo = Zoo("Test", rules=rules)
+    #the aviary is listed first and is the biggest, the rules still have to send the lions elsewhere
+    zoo.add_enclosure(Enclosure("Aviary", 200, "Aviary", 10))
+    zoo.add_enclosure(Enclosure("Savanna", 100, "Savanna", 4))
+    zoo.add_enclosure(Enclosure("Jungle", 100, "Jungle", 5))
+    return zoo
+
+
+def homes(plan):
+    return {animal.get_name(): enclosure.get_enclosure_id() for animal, enclosure in plan}
+
+
+def test_rules_choose_enclosures_for_each_species():
+    zoo = make_zoo()
+    lions = [Lion(f"Lion{i}", 5) for i in range(3)]
+    parrots = [Parrot(f"Parrot{i}", 3) for i in range(2)]
+    zoo.add_animals(lions + parrots)
+    plan, rejects = zoo.place_animals(lions + parrots)
+    assert rejects == []
+    assert homes(plan) == {"Lion0": "Savanna", "Lion1": "Savanna", "Lion2": "Savanna",
+                           "Parrot0": "Aviary", "Parrot1": "Aviary"}
+    assert all(animal.get_enclosure() is enclosure for animal, enclosure in plan)
+
+
+def test_animal_is_rejected_only_when_no_enclosure_allows_it():
+    #the savanna still has room but the adult lions there block the cub
+    zoo = make_zoo()
+    lions = [Lion(f"Lion{i}", 5) for i in range(3)]
+    cub = Lion("Cub", 1)
+    zoo.add_animals(lions + [cub])
+    plan, rejects = zoo.place_animals(lions + [cub])
+    assert len(plan) == 3
+    [(animal, reason)] = rejects
+    assert animal is cub and cub.get_enclosure() is None
+    assert "adult carnivore" in reason
+
+
+def test_group_only_fills_enclosures_the_rules_allow():
+    zoo = make_zoo()
+    snakes = [Python(f"Snake{i}", 4) for i in range(7)]
+    zoo.add_animals(snakes)
+    plan, rejects = zoo.place_animals(snakes)
+    #the jungle is the only enclosure pythons can live in
+    assert set(homes(plan).values()) == {"Jungle"}
+    assert len(plan) == 5 and len(rejects) == 2
+    assert all(snake.get_enclosure() is None for snake, _ in rejects)
+
+
+def test_plan_without_apply_moves_nothing():
+    zoo = make_zoo()
+    lions = [Lion(f"Lion{i}", 5) for i in range(2)]
+    zoo.add_animals(lions)
+    plan, rejects = zoo.place_animals(lions, apply=False)
+    assert len(plan) == 2 and rejects == []
+    assert all(lion.get_enclosure() is None for lion in lions)
+    assert all(not enclosure.get_animals() for enclosure in zoo.get_enclosures())
+
+
+def test_animals_already_placed_are_rejected():
+    zoo = make_zoo()
+    lion, parrot = Lion("Leo", 5), Parrot("Pip", 3)
+    zoo.add_animals([lion, parrot])
+    zoo.get_enclosures()[1].add_animal(lion)
+    plan, rejects = zoo.place_animals([lion, parrot])
+    assert homes(plan) == {"Pip": "Aviary"}
+    assert [animal for animal, _ in rejects] == [lion]
+
+
+def test_without_rules_each_species_gets_its_own_enclosure():
+    zoo = make_zoo(rules=None)
+    animals = [Lion("Leo", 5), Parrot("Pip", 3), Lion("Nala", 4)]
+    zoo.add_animals(animals)
+    plan, rejects = zoo.place_animals(animals)
+    assert rejects == []
+    placed = homes(plan)
+    assert placed["Leo"] == placed["Nala"] != placed["Pip"]
@@ -0,0 +1,86 @@
+"""
+File: test_registry.py
+Description: Behaviour tests for the indexed registry and removing animals from the zoo
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import pytest
+
+from animal import Lion, Parrot
+from enclosure import Enclosure
+from registry import Registry
+from zoo import Zoo
+
+
+class Tag:
+    """Small entity with a key that can change"""
+
+    def __init__(self, colour):
+        self.colour = colour
+
+
+def make_registry():
+    return Registry({"colour": lambda tag: tag.colour})
+
+
+def test_add_gives_stable_ids_and_keeps_order():
+    registry = make_registry()
+    tags = [Tag("red"), Tag("blue"), Tag("red")]
+    ids = [registry.add(tag) for tag in tags]
+    assert ids == [1, 2, 3]
+    assert registry.add(tags[0]) == 1  #adding again returns the existing ID
+    assert list(registry.get_all()) == tags
+    assert registry.find("colour", "red") == (tags[0], tags[2])
+
+
+def test_remove_drops_entity_from_every_index():
+    registry = make_registry()
+    red, blue = Tag("red"), Tag("blue")
+    registry.add(red)
+    registry.add(blue)
+    assert registry.remove(red) is True
+    assert registry.remove(red) is False
+    assert red not in registry and len(registry) == 1
+    assert registry.find("colour", "red") == ()
+    assert registry.keys("colour") == ["blue"]
+    #IDs are never handed out twice
+    assert registry.add(Tag("green")) == 3
+
+
+def test_reindex_moves_entity_to_new_key():
+    registry = make_registry()
+    tag = Tag("red")
+    registry.add(tag)
+    assert registry.find("colour", "red") == (tag,)
+    tag.colour = "blue"
+    assert registry.reindex(tag, "colour") is True
+    assert registry.find("colour", "red") == ()
+    assert registry.find("colour", "blue") == (tag,)
+    assert registry.reindex(Tag("red")) is False  #not in the registry
+
+
+def test_add_many_rejects_ids_in_use_before_adding_anything():
+    registry = make_registry()
+    registry.add(Tag("red"), 5)
+    with pytest.raises(ValueError):
+        registry.add_many([Tag("blue"), Tag("green")], [None, 5])
+    assert len(registry) == 1
+    ids = registry.add_many([Tag("blue"), Tag("green")], [None, 6])
+    assert ids == [7, 6]
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_zoo_remove_animal_moves_it_out_of_its_enclosure(thread_safe):
+    zoo = Zoo("Test", thread_safe=thread_safe)
+    enclosure = Enclosure(1, 100, "Savanna", 3)
+    zoo.add_enclosure(enclosure)
+    leo, pip = Lion("Leo", 5), Parrot("Pip", 2)
+    zoo.add_animals([leo, pip])
+    enclosure.add_animal(leo)
+    assert zoo.remove_animal(leo) is True
+    assert leo.get_enclosure() is None
+    assert leo not in enclosure.get_animals()
+    assert list(zoo.get_animals()) == [pip]
+    assert zoo.remove_animal(leo) is False
@@ -0,0 +1,88 @@
+"""
+File: test_timeline.py
+Description: Behaviour tests for the health record time index (duplicates, same-date records and removal)
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from datetime import datetime, timedelta
+
+from animal import Lion
+from staff import Vet
+from timeline import RecordTimeline, SortedDates
+from zoo import Zoo
+
+DAY = datetime(2026, 1, 1)
+
+
+def test_adding_a_record_twice_stores_it_once():
+    dates = SortedDates()
+    record = object()
+    dates.add(DAY, record)
+    dates.add(DAY, record)
+    assert len(dates) == 1
+    dates.add_many([(DAY, record), (DAY + timedelta(days=1), object())] * 2)
+    assert len(dates) == 2
+    assert dates.between().count(record) == 1
+
+
+def test_adding_under_a_new_date_moves_the_record():
+    dates = SortedDates()
+    record = object()
+    dates.add(DAY, record)
+    dates.add(DAY + timedelta(days=3), record)
+    assert len(dates) == 1
+    assert dates.between(DAY, DAY + timedelta(days=1)) == []
+    assert dates.between(DAY + timedelta(days=3)) == [record]
+
+
+def test_remove_takes_out_the_exact_record_with_a_shared_date():
+    dates = SortedDates()
+    records = [object() for _ in range(5)]
+    dates.add_many([(DAY, record) for record in records])
+    assert dates.remove(records[2]) is True
+    assert dates.remove(records[2]) is False
+    assert dates.between() == records[:2] + records[3:]
+    assert dates.count_between(DAY, DAY + timedelta(days=1)) == 4
+
+
+def test_between_is_half_open():
+    dates = SortedDates()
+    first, second = object(), object()
+    dates.add(DAY, first)
+    dates.add(DAY + timedelta(days=1), second)
+    assert dates.between(DAY, DAY + timedelta(days=1)) == [first]
+    assert dates.count_between(DAY + timedelta(days=1), None) == 1
+
+
+def test_timeline_follows_status_changes_and_animal_removal():
+    zoo = Zoo("Test")
+    leo = Lion("Leo", 5)
+    vic = Vet("Vic", 1)
+    zoo.add_animal(leo)
+    zoo.add_staff(vic)
+    timeline = zoo.get_record_timeline()
+    record = vic.create_record(leo, "Injury", "Cut paw", "Low")
+    assert record in timeline and timeline.count_open() == 1
+
+    record.resolve_issue("Healed")
+    assert timeline.count_open() == 0
+    assert timeline.resolved_between() == [record]
+    record.set_status("Active")
+    assert timeline.resolved_between() == [] and timeline.count_open() == 1
+
+    zoo.remove_animal(leo)
+    assert record not in timeline and len(timeline) == 0
+
+
+def test_timeline_add_many_ignores_duplicates():
+    leo = Lion("Leo", 5)
+    vic = Vet("Vic", 1)
+    records = [vic.create_record(leo, "Injury", f"Case {i}", "Low") for i in range(3)]
+    timeline = RecordTimeline()
+    timeline.add_many(records + records)
+    timeline.add_many(records[:1])
+    assert len(timeline) == 3 and timeline.count_open() == 3
+    timeline.remove(records[0])
+    assert timeline.recorded_between() == records[1:]
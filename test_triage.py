@@ -0,0 +1,93 @@
+"""
+File: test_triage.py
+Description: Behaviour tests for the veterinary triage queue (ordering, claiming and releasing cases)
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import pytest
+
+from animal import Lion
+from health_system import HealthRecord
+from triage import TriageQueue
+
+
+def make_records(*severities):
+    animal = Lion("Leo", 5)
+    return [HealthRecord(animal, "Injury", f"Case {i}", "Vic", severity) for i, severity in enumerate(severities)]
+
+
+def fill(queue, records):
+    for record in records:
+        queue.update(record)
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_most_severe_first_then_oldest(thread_safe):
+    low, critical, high, critical2 = make_records("Low", "Critical", "High", "Critical")
+    queue = TriageQueue(thread_safe)
+    fill(queue, [low, critical, high, critical2])
+    assert queue.peek() is critical
+    assert [queue.pop() for _ in range(4)] == [critical, critical2, high, low]
+    assert queue.pop() is None
+
+
+def test_severity_change_reorders_queue():
+    low, medium = make_records("Low", "Medium")
+    queue = TriageQueue()
+    fill(queue, [low, medium])
+    low.update_severity("Critical", "Got worse")
+    queue.update(low)
+    assert queue.peek() is low
+
+
+def test_claim_takes_cases_in_priority_order():
+    low, critical, high = make_records("Low", "Critical", "High")
+    queue = TriageQueue()
+    fill(queue, [low, critical, high])
+    vic, val = object(), object()
+    assert queue.claim(vic, 2) == [critical, high]
+    assert queue.claim(val, 5) == [low]
+    assert queue.get_claimed(vic) == [critical, high]
+    assert len(queue) == 0 and queue.is_claimed(low)
+    #a claimed case stays with its vet even if it changes
+    queue.update(critical)
+    assert queue.peek() is None
+
+
+def test_release_puts_case_back_in_its_place():
+    low, critical, high = make_records("Low", "Critical", "High")
+    queue = TriageQueue()
+    fill(queue, [low, critical, high])
+    vic = object()
+    [claimed] = queue.claim(vic)
+    assert claimed is critical and queue.peek() is high
+    assert queue.release(critical) is True
+    assert queue.release(critical) is False  #not claimed any more
+    assert queue.get_claimed() == []
+    assert [queue.pop() for _ in range(3)] == [critical, high, low]
+
+
+def test_resolved_cases_leave_the_queue():
+    low, high = make_records("Low", "High")
+    queue = TriageQueue()
+    fill(queue, [low, high])
+    [claimed] = queue.claim(object())
+    claimed.resolve_issue("Healed")
+    queue.update(claimed)
+    assert not queue.is_claimed(claimed)
+    assert queue.release(claimed) is False
+    low.resolve_issue("Healed")
+    queue.update(low)
+    assert low not in queue and len(queue) == 0
+
+
+def test_discard_forgets_queued_and_claimed_cases():
+    low, high = make_records("Low", "High")
+    queue = TriageQueue()
+    fill(queue, [low, high])
+    queue.claim(object())
+    assert queue.discard(low) is True
+    queue.discard(high)
+    assert len(queue) == 0 and queue.get_claimed() == []
@@ -0,0 +1,180 @@
+"""
+File: timeline.py
+Description: This class represents the zoo-wide time index of health records
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+
+class SortedDates:
+    """Records kept sorted by a date (two parallel lists searched with bisect)
+    Every record is stored under a (date, sequence number) key, so even records with the same
+    date have a key of their own and one bisect finds a record's exact position to delete it.
+    Records are usually added with the current time so inserts land at the end of the lists."""
+
+    def __init__(self):
+        self._dates = []  #(date, sequence) keys, sorted
+        self._records = []
+        self._keys = {}  #record -> key it was stored under
+        self._seq = 0  #sequence numbers keep records with equal dates in the order they were added
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __contains__(self, record):
+        return record in self._keys
+
+    def add(self, date, record):
+        key = self._keys.get(record)
+        if key is not None:
+            if key[0] == date:
+                return  #already stored under this date
+            self.remove(record)
+        key = self._keys[record] = (date, self._seq)
+        self._seq += 1
+        pos = bisect_right(self._dates, key)
+        self._dates.insert(pos, key)
+        self._records.insert(pos, record)
+
+    def add_many(self, pairs):
+        """Add many (date, record) pairs with one sort instead of an insert each
+        Records already stored under the same date (or given twice) are only stored once."""
+        new = {}
+        for date, record in pairs:
+            key = self._keys.get(record)
+            if key is not None:
+                if key[0] == date:
+                    continue
+                self.remove(record)
+            new[record] = date
+        #a few records are cheaper to insert one by one than re-sorting the whole index
+        if len(new) * 16 < len(self._dates):
+            for record, date in new.items():
+                self.add(date, record)
+            return
+        merged = list(zip(self._dates, self._records))
+        for record, date in new.items():
+            key = self._keys[record] = (date, self._seq)
+            self._seq += 1
+            merged.append((key, record))
+        merged.sort(key=itemgetter(0))  #keys are unique so records never get compared
+        self._dates = [key for key, record in merged]
+        self._records = [record for key, record in merged]
+
+    def remove(self, record):
+        key = self._keys.pop(record, None)
+        if key is None:
+            return False
+        pos = bisect_left(self._dates, key)
+        del self._dates[pos]
+        del self._records[pos]
+        return True
+
+    #(date,) sorts before every (date, sequence) key with the same date
+    def between(self, start=None, end=None):
+        """Return the records with start <= date < end (oldest first), None means unbounded"""
+        lo = 0 if start is None else bisect_left(self._dates, (start,))
+        hi = len(self._dates) if end is None else bisect_left(self._dates, (end,))
+        return self._records[lo:hi]
+
+    def count_between(self, start=None, end=None):
+        lo = 0 if start is None else bisect_left(self._dates, (start,))
+        hi = len(self._dates) if end is None else bisect_left(self._dates, (end,))
+        return max(0, hi - lo)
+
+
+class RecordTimeline:
+    """Index of every health record in the zoo by the date it was recorded and resolved
+    Open (Active/Monitoring) records are also kept in their own list sorted by the date recorded,
+    so "open for longer than N days" is a single bisect instead of a scan over all records.
+    The zoo keeps it up to date through its record_changed callback."""
+
+    def __init__(self):
+        self._recorded = SortedDates()
+        self._resolved = SortedDates()
+        self._open = SortedDates()
+
+    def __len__(self):
+        return len(self._recorded)
+
+    def __contains__(self, record):
+        return record in self._recorded
+
+    #define methods to keep the index in step with the health records
+    def add(self, record):
+        """Add a record or refresh it after its status changed"""
+        if record not in self._recorded:
+            self._recorded.add(record.get_date_recorded(), record)
+        if record.is_active():
+            self._resolved.remove(record)
+            if record not in self._open:
+                self._open.add(record.get_date_recorded(), record)
+        else:
+            self._open.remove(record)
+            resolved = record.get_resolution_date()
+            if resolved is not None:
+                self._resolved.add(resolved, record)
+
+    def add_many(self, records):
+        """Add a batch of records (e.g. when the index is first built) with one sort per list"""
+        recorded, opened, resolved = [], [], []
+        seen = set()
+        for record in records:
+            if record in seen:
+                continue
+            seen.add(record)
+            if record in self._recorded:
+                self.add(record)
+                continue
+            recorded.append((record.get_date_recorded(), record))
+            if record.is_active():
+                opened.append((record.get_date_recorded(), record))
+            elif record.get_resolution_date() is not None:
+                resolved.append((record.get_resolution_date(), record))
+        self._recorded.add_many(recorded)
+        self._open.add_many(opened)
+        self._resolved.add_many(resolved)
+
+    def remove(self, record):
+        self._recorded.remove(record)
+        self._resolved.remove(record)
+        self._open.remove(record)
+
+    def add_animal(self, animal):
+        self.add_many(animal.get_health_record())
+
+    def remove_animal(self, animal):
+        for record in animal.get_health_record():
+            self.remove(record)
+
+    #define methods for the time range queries
+    def recorded_between(self, start=None, end=None):
+        """Return records recorded in [start, end), oldest first"""
+        return self._recorded.between(start, end)
+
+    def resolved_between(self, start=None, end=None):
+        """Return records resolved in [start, end), earliest resolution first"""
+        return self._resolved.between(start, end)
+
+    def recorded_in_last(self, days, now=None):
+        now = datetime.now() if now is None else now
+        return self._recorded.between(now - timedelta(days=days), None)
+
+    def open_longer_than(self, days, now=None):
+        """Return the open records reported more than days ago, the oldest first"""
+        now = datetime.now() if now is None else now
+        return self._open.between(None, now - timedelta(days=days))
+
+    def count_recorded_between(self, start=None, end=None):
+        return self._recorded.count_between(start, end)
+
+    def count_resolved_between(self, start=None, end=None):
+        return self._resolved.count_between(start, end)
+
+    def count_open(self):
+        return len(self._open)
@@ -0,0 +1,161 @@
+"""
+File: triage.py
+Description: This class represents the zoo-wide veterinary triage queue of open health records
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import threading
+
+from health_system import HealthRecord
+from locking import locked
+
+
+class TriageQueue:
+    """Indexed priority queue (binary heap + position map) of active health records
+    The most severe record comes first, ties go to the record reported the longest time ago.
+    Every record knows its position in the heap so a severity or status change can move it
+    up/down (or take it out) in O(log n) instead of rebuilding the queue.
+    With thread_safe=True every public method runs under the queue's own lock, so two vets
+    claiming at the same time can never get the same case."""
+
+    def __init__(self, thread_safe=False):
+        self._lock = threading.RLock() if thread_safe else None
+        self._heap = []  #list of [key, record]
+        self._positions = {}  #record -> index in the heap
+        self._claimed = {}  #record -> vet who claimed it
+        self._counter = 0  #tie breaker so records reported at the same time keep insertion order
+
+    @staticmethod
+    def _priority(record, order):
+        #lower keys come first: highest severity, then the oldest report
+        severity = HealthRecord.SEVERITY_LVLS.index(record.get_severity())
+        return (-severity, record.get_date_recorded(), order)
+
+    #define getters for the queue
+    @locked
+    def peek(self):
+        """Return the record a vet should look at next without taking it off the queue"""
+        if not self._heap:
+            return None
+        return self._heap[0][1]
+
+    @locked
+    def get_claimed(self, vet=None):
+        """Return the claimed records (optionally only the ones claimed by given vet)"""
+        return [record for record, owner in self._claimed.items() if vet is None or owner is vet]
+
+    def is_claimed(self, record):
+        return record in self._claimed
+
+    #define methods to keep the queue in step with the health records
+    @locked
+    def update(self, record):
+        """Add, reprioritise or drop a record after it was created or changed"""
+        if not record.is_active():
+            self._claimed.pop(record, None)
+            self.remove(record)
+            return
+        #claimed cases stay with their vet until they are released
+        if record in self._claimed:
+            return
+
+        pos = self._positions.get(record)
+        if pos is None:
+            self._counter += 1
+            self._heap.append([self._priority(record, self._counter), record])
+            self._positions[record] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+        else:
+            entry = self._heap[pos]
+            entry[0] = self._priority(record, entry[0][2])
+            self._sift_up(pos)
+            self._sift_down(self._positions[record])
+
+    @locked
+    def remove(self, record):
+        pos = self._positions.pop(record, None)
+        if pos is None:
+            return False
+        last = self._heap.pop()
+        if pos < len(self._heap):
+            #move the last entry into the gap and restore the heap around it
+            self._heap[pos] = last
+            self._positions[last[1]] = pos
+            self._sift_up(pos)
+            self._sift_down(self._positions[last[1]])
+        return True
+
+    @locked
+    def pop(self):
+        """Take the highest priority record off the queue"""
+        if not self._heap:
+            return None
+        record = self._heap[0][1]
+        self.remove(record)
+        return record
+
+    #define methods for vets to claim and release cases
+    @locked
+    def claim(self, vet, n=1):
+        """Pop up to n cases and mark them as claimed by given vet"""
+        cases = []
+        while len(cases) < n and self._heap:
+            record = self.pop()
+            self._claimed[record] = vet
+            cases.append(record)
+        return cases
+
+    @locked
+    def release(self, record):
+        """Give a claimed case back to the queue (if it is still active)"""
+        if self._claimed.pop(record, None) is None:
+            return False
+        self.update(record)
+        return True
+
+    @locked
+    def discard(self, record):
+        """Forget a record completely (e.g. when its animal leaves the zoo)"""
+        self._claimed.pop(record, None)
+        return self.remove(record)
+
+    #heap helpers that keep the position map in step
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i][1]] = i
+        self._positions[heap[j][1]] = j
+
+    def _sift_up(self, pos):
+        heap = self._heap
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if heap[pos][0] < heap[parent][0]:
+                self._swap(pos, parent)
+                pos = parent
+            else:
+                break
+
+    def _sift_down(self, pos):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = pos
+            left = 2 * pos + 1
+            right = left + 1
+            if left < size and heap[left][0] < heap[smallest][0]:
+                smallest = left
+            if right < size and heap[right][0] < heap[smallest][0]:
+                smallest = right
+            if smallest == pos:
+                break
+            self._swap(pos, smallest)
+            pos = smallest
+
+    def __contains__(self, record):
+        return record in self._positions
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,131 @@
+"""
+File: upkeep_sim.py
+Description: Time-stepped NumPy simulator for enclosure cleanliness, occupancy and keeper cleaning rounds
+Author: Drashti Dineshchandra Patel
+ID: 110488649
+Username: patdy092
+This is my own work as defined by the University's Academic Integrity Policy.
+"""
+import numpy as np
+
+
+class UpkeepSimulator:
+    """Simulates cleanliness of many enclosures over time with whole-array steps
+    Every tick (one hour) each enclosure loses base_decay plus decay_per_animal for each animal in it,
+    the same way Enclosure.dec_cleanliness does for one enclosure. During working hours each keeper
+    cleans their dirtiest assigned enclosures that are below clean_threshold (at most
+    cleans_per_tick of them, or all of them if cleans_per_tick is None), like
+    ZooKeeper.cleanup_enclosure. Nothing changes on the Enclosure objects until write_back()."""
+
+    def __init__(self, enclosures, keepers=(), base_decay=0.1, decay_per_animal=0.05,
+                 clean_amount=10, clean_threshold=60, cleans_per_tick=None, work_hours=range(8, 17)):
+        self._enclosures = list(enclosures)
+        self._keepers = list(keepers)
+        self._base_decay = base_decay
+        self._decay_per_animal = decay_per_animal
+        self._clean_amount = clean_amount
+        self._clean_threshold = clean_threshold
+        self._cleans_per_tick = cleans_per_tick
+        self._work_hours = np.zeros(24, dtype=bool)
+        self._work_hours[list(work_hours)] = True
+        self._tick = 0
+
+        self._cleanliness = np.array([e.get_cleanliness_lvl() for e in self._enclosures], dtype=np.float64)
+        self._occupancy = np.array([e.animal_count() for e in self._enclosures], dtype=np.int32)
+        self._keeper_of = np.full(len(self._enclosures), -1, dtype=np.int32)
+        self._cleanings = np.zeros(len(self._enclosures), dtype=np.int64)
+        self._assign_keepers()
+
+    def _assign_keepers(self):
+        #enclosure -> index of the (first) keeper assigned to it, -1 if nobody looks after it
+        positions = {enclosure: i for i, enclosure in enumerate(self._enclosures)}
+        for k, keeper in enumerate(self._keepers):
+            for enclosure in keeper.get_assigned_enclosures():
+                i = positions.get(enclosure)
+                if i is not None and self._keeper_of[i] == -1:
+                    self._keeper_of[i] = k
+
+    #define getters for the simulation state
+    def get_tick(self):
+        return self._tick
+
+    def get_cleanliness(self):
+        return self._cleanliness.copy()
+
+    def get_occupancy(self):
+        return self._occupancy.copy()
+
+    def get_cleanings(self):
+        """Number of times each enclosure was cleaned so far"""
+        return self._cleanings.copy()
+
+    def get_keeper_cleanings(self):
+        """Number of cleanings done by each keeper so far"""
+        covered = self._keeper_of >= 0
+        return np.bincount(self._keeper_of[covered], weights=self._cleanings[covered],
+                           minlength=len(self._keepers)).astype(np.int64)
+
+    def set_occupancy(self, occupancy):
+        """Override the animal counts (e.g. to model a planned intake)"""
+        occupancy = np.asarray(occupancy, dtype=np.int32)
+        if occupancy.shape != self._occupancy.shape:
+            raise ValueError("Occupancy must have one value per enclosure")
+        self._occupancy = occupancy.copy()
+
+    #define the simulation steps
+    def step(self):
+        """Advance the simulation by one hour"""
+        decay = self._base_decay + self._decay_per_animal * self._occupancy
+        np.subtract(self._cleanliness, decay, out=self._cleanliness)
+        np.maximum(self._cleanliness, 0, out=self._cleanliness)
+
+        if self._work_hours[self._tick % 24]:
+            self._clean(self._select_for_cleaning())
+        self._tick += 1
+
+    def _select_for_cleaning(self):
+        dirty = (self._cleanliness < self._clean_threshold) & (self._keeper_of >= 0)
+        if self._cleans_per_tick is None:
+            return dirty
+
+        #rank the dirty enclosures of each keeper from dirtiest to cleanest and keep the first few
+        candidates = np.flatnonzero(dirty)
+        if candidates.size == 0:
+            return dirty
+        keepers = self._keeper_of[candidates]
+        order = np.lexsort((self._cleanliness[candidates], keepers))
+        sorted_keepers = keepers[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_keepers[1:] != sorted_keepers[:-1]])
+        group_sizes = np.diff(np.r_[group_start, sorted_keepers.size])
+        rank = np.arange(sorted_keepers.size) - np.repeat(group_start, group_sizes)
+
+        selected = np.zeros_like(dirty)
+        selected[candidates[order[rank < self._cleans_per_tick]]] = True
+        return selected
+
+    def _clean(self, selected):
+        self._cleanliness[selected] += self._clean_amount
+        np.minimum(self._cleanliness, 100, out=self._cleanliness)
+        self._cleanings += selected
+
+    def run(self, ticks, record_every=24):
+        """Run for given number of hourly ticks and return summary statistics
+        Statistics are sampled every record_every ticks."""
+        samples = []
+        for _ in range(ticks):
+            self.step()
+            if self._tick % record_every == 0:
+                samples.append((self._tick, float(self._cleanliness.mean()), float(self._cleanliness.min()),
+                                int((self._cleanliness < self._clean_threshold).sum())))
+        return {
+            "ticks": self._tick,
+            "samples": samples,  #(tick, mean cleanliness, min cleanliness, enclosures below threshold)
+            "final_mean": float(self._cleanliness.mean()),
+            "uncovered_enclosures": int((self._keeper_of < 0).sum()),
+            "keeper_cleanings": self.get_keeper_cleanings().tolist(),
+        }
+
+    def write_back(self):
+        """Copy the simulated cleanliness levels onto the Enclosure objects"""
+        for enclosure, level in zip(self._enclosures, np.rint(self._cleanliness).astype(int).tolist()):
+            enclosure.set_cleanliness_lvl(level)
@@ -9,16 +9,63 @@ This is my own work as defined by the University's Academic Integrity Policy.
 from animal import Animal
 from health_system import HealthRecord
 from enclosure import Enclosure
-from staff import Staff
+from staff import Staff, Vet
+from triage import TriageQueue
+from timeline import RecordTimeline
+from search import HealthSearchIndex
+from report_cache import ReportCache
+from assignments import AssignmentIndex
+from registry import Registry
+from locking import LockStripes, NO_LOCK, locked as _locked
+from compatibility import RuleBook
+import events
+import threading
+import reports
+import placement
+import roster
 
 
 class Zoo:
-    """The main management system for the zoos operations"""
-    def __init__(self, name):
+    """The main management system for the zoos operations
+    With thread_safe=True the zoo can be shared between threads. Every animal and enclosure in it
+    is locked on its own (lock_stripes locks shared out over them, see locking.py) so changes to
+    different enclosures don't wait on each other, and only the short updates of the zoo's own
+    indexes take the zoo's lock. Getters such as get_animals() take no lock at all: they return
+    immutable tuples built once per change (see Registry.get_all and Enclosure.get_animals).
+    Event subscribers are called while locks are held, so in thread-safe mode they should not
+    move animals themselves (use an EventBus with auto_flush=False and flush() from one thread).
+    rules is a list of compatibility rules (see compatibility.py) that replace the default of one
+    species per enclosure for every enclosure added to the zoo."""
+    def __init__(self, name, report_cache_size=100000, thread_safe=False, lock_stripes=64, rules=None):
         self._name = name
-        self._staff = []
-        self._animals = []
-        self._enclosures = []
+        self._lock = threading.RLock() if thread_safe else None #guards the zoo's own indexes
+        self._locks = LockStripes(lock_stripes) if thread_safe else None #per animal/enclosure locks
+        self._rules = RuleBook(rules) if rules is not None else None #compiled compatibility rules
+        #registries give every entity a stable ID and make lookups/removals O(1)
+        self._staff = Registry({
+            "role": lambda staff: staff.get_staff_role(),
+            "employee_id": lambda staff: staff.get_employee_id(),
+        })
+        self._animals = Registry({
+            "species": lambda animal: animal.get_species(),
+            "type": lambda animal: animal.get_animal_type(),
+            "name": lambda animal: animal.get_name(),
+            "enclosure": lambda animal: animal.get_enclosure(),
+        })
+        self._enclosures = Registry({
+            "enclosure_id": lambda enclosure: enclosure.get_enclosure_id(),
+            "environment": lambda enclosure: enclosure.get_environment(),
+        })
+        self._triage = TriageQueue(thread_safe)
+        self._assignments = AssignmentIndex() #who covers each animal/enclosure
+        self._timeline = None #time index of all health records, built on first use
+        self._search = None #full-text index of all health records, built on first use
+        self._analytics = None #NumPy columns of all health records, built on first use
+        self._journal = None #write-ahead journal that mutations are logged to (optional)
+        self._events = None #bus that change events are emitted on, created on first use
+        #version counters of what each report depends on, bumped by every change to it
+        self._versions = {"animals": 0, "health": 0, "enclosures": 0, "staff": 0}
+        self._report_cache = ReportCache(report_cache_size)
 
     @property
     def name(self):
@@ -26,84 +73,529 @@ class Zoo:
 
     #Management of animals - this includes accessing, adding, removing
     def get_animals(self):
-        return self._animals.copy()
+        return self._animals.get_all()
+
+    def get_animal(self, animal_id):
+        return self._animals.get(animal_id)
+
+    def get_animal_id(self, animal):
+        return self._animals.get_id(animal)
 
     def get_animals_species(self, species):
-        return [animal for animal in self._animals if animal.get_species() == species]
+        return self._animals.find("species", species)
 
-    def add_animal(self, animal):
-        self._animals.append(animal)
+    def get_animals_type(self, animal_type):
+        return self._animals.find("type", animal_type)
 
-    def remove_animal(self, animal):
+    def get_animals_name(self, name):
+        return self._animals.find("name", name)
+
+    def get_animals_enclosure(self, enclosure):
+        return self._animals.find("enclosure", enclosure)
+
+    def get_species(self):
+        return self._animals.keys("species")
+
+    @_locked
+    def add_animal(self, animal, animal_id=None):
+        """Add an animal to the zoo and return its stable ID"""
         if animal in self._animals:
-            self._animals.remove(animal)
-            return True
-        return False
+            return self._animals.get_id(animal)
+        #registered first: if the ID is taken nothing else has been touched yet
+        animal_id = self._animals.add(animal, animal_id)
+        animal.add_watcher(self)
+        animal.set_locks(self._locks)
+        for record in animal.get_active_records():
+            self._triage.update(record)
+        self._assignments.add_member(animal, "animal")
+        self._bump("animals", "health")
+        if self._timeline is not None:
+            self._timeline.add_animal(animal)
+        if self._search is not None:
+            self._search.add_animal(animal)
+        if self._analytics is not None:
+            self._analytics.mark_many(animal.get_health_record())
+        if self._journal is not None:
+            self._journal.animal_added(self, animal)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.AnimalAdded(animal, animal_id))
+        return animal_id
+
+    @_locked
+    def add_animals(self, animals, animal_ids=None):
+        """Add a batch of animals in one go and return their stable IDs"""
+        animals = list(animals)
+        known = set(animal for animal in animals if animal in self._animals)
+        #registered first: if an ID is taken add_many raises before anything has changed
+        ids = self._animals.add_many(animals, animal_ids)
+        for animal in animals:
+            if animal not in known:
+                animal.add_watcher(self)
+                animal.set_locks(self._locks)
+                self._assignments.add_member(animal, "animal")
+                for record in animal.get_active_records():
+                    self._triage.update(record)
+        self._bump("animals", "health")
+        if self._timeline is not None:
+            self._timeline.add_many(record for animal in animals if animal not in known
+                                    for record in animal.get_health_record())
+        if self._search is not None:
+            self._search.add_many(record for animal in animals if animal not in known
+                                  for record in animal.get_health_record())
+        if self._analytics is not None:
+            self._analytics.mark_many(record for animal in animals if animal not in known
+                                      for record in animal.get_health_record())
+        if self._journal is not None:
+            for animal in animals:
+                if animal not in known:
+                    self._journal.animal_added(self, animal)
+        if self._events is not None and self._events.has_subscribers():
+            with self._events.batch():
+                for animal, animal_id in zip(animals, ids):
+                    if animal not in known:
+                        self._events.emit(events.AnimalAdded(animal, animal_id))
+        return ids
+
+    def remove_animal(self, animal):
+        """Remove an animal from the zoo, moving it out of its enclosure first
+        Returns False if the animal isn't in the zoo."""
+        while True:
+            enclosure = animal.get_enclosure()
+            with self.hold(animal, enclosure):
+                if animal.get_enclosure() is not enclosure:
+                    continue #moved by another thread before the locks were taken
+                if animal not in self._animals:
+                    return False
+                #moving out first lets the journal and the events see the move while the animal still has its ID
+                if enclosure is not None:
+                    enclosure.remove_animal(animal)
+                return self._remove_animal(animal)
+
+    @_locked
+    def _remove_animal(self, animal):
+        animal_id = self._animals.get_id(animal)
+        if not self._animals.remove(animal):
+            return False
+        animal.remove_watcher(self)
+        animal.set_locks(None)
+        #the animal has left the zoo so nobody looks after it any more
+        for staff in self._assignments.remove_member(animal, "animal"):
+            staff.unassign_animal(animal)
+        self._bump("animals", "health")
+        for record in animal.get_active_records():
+            self._triage.discard(record)
+        #cached fragments would keep the animal alive until the cache needed the room
+        self._report_cache.discard(("animal", animal))
+        self._report_cache.discard(("health", animal))
+        self._report_cache.discard(("history", animal))
+        if self._timeline is not None:
+            self._timeline.remove_animal(animal)
+        if self._search is not None:
+            self._search.remove_animal(animal)
+        if self._analytics is not None:
+            for record in animal.get_health_record():
+                self._analytics.mark_removed(record)
+        if self._journal is not None:
+            self._journal.animal_removed(self, animal_id)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.AnimalRemoved(animal, animal_id))
+        return True
+
+    #called by animals in the zoo whenever one of their records is added or changed
+    @_locked
+    def record_changed(self, record, change):
+        self._versions["health"] += 1
+        if change in ("added", "status", "severity"):
+            self._triage.update(record)
+        if self._timeline is not None and change in ("added", "status"):
+            self._timeline.add(record)
+        if self._search is not None and change in ("added", "note", "plan"):
+            self._search.add(record)
+        if self._analytics is not None and change != "plan":
+            self._analytics.mark(record)
+        if self._journal is not None:
+            self._journal.record_changed(self, record, change)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.RecordChanged(record, change))
+
+    #called by animals in the zoo when the animal itself changes (e.g. its age)
+    @_locked
+    def animal_changed(self, animal):
+        self._versions["animals"] += 1
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.AnimalChanged(animal))
+
+    #called by enclosures in the zoo when their state (e.g. cleanliness) changes
+    @_locked
+    def enclosure_changed(self, enclosure):
+        self._versions["enclosures"] += 1
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.EnclosureChanged(enclosure, enclosure.get_cleanliness_lvl()))
+
+    #called by enclosures in the zoo whenever an animal moves in or out
+    @_locked
+    def animal_moved(self, enclosure, animal, added):
+        self._animals.reindex(animal, "enclosure")
+        self._versions["enclosures"] += 1
+        if self._journal is not None:
+            self._journal.animal_moved(self, enclosure, animal, added)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.AnimalMoved(enclosure, animal, added))
+
+    def _bump(self, *parts):
+        for part in parts:
+            self._versions[part] += 1
+
+    def get_version(self, part):
+        """Return the version counter of "animals", "health", "enclosures" or "staff" """
+        return self._versions[part]
+
+    def get_report_cache(self):
+        return self._report_cache
+
+    #journal management - see journal.py
+    def get_journal(self):
+        return self._journal
+
+    def set_journal(self, journal):
+        self._journal = journal
+
+    #change events - see events.py
+    def get_event_bus(self):
+        """Return the bus the zoo's change events are emitted on (created the first time)"""
+        if self._events is None:
+            self._events = events.EventBus()
+        return self._events
+
+    def set_event_bus(self, bus):
+        self._events = bus
+
+    def subscribe(self, callback, event_types=None):
+        """Call callback(events) with every batch of change events, see EventBus.subscribe"""
+        return self.get_event_bus().subscribe(callback, event_types)
+
+    def unsubscribe(self, callback):
+        if self._events is not None:
+            self._events.unsubscribe(callback)
+
+    def batch(self):
+        """Group the changes made in a with block into one batch of events
+        e.g. with zoo.batch(): move several animals, subscribers then hear about all of it at once"""
+        if self._events is None or not self._events.has_subscribers():
+            return events.NO_BATCH
+        return self._events.batch()
+
+    def get_triage_queue(self):
+        return self._triage
+
+    @_locked
+    def get_record_timeline(self):
+        """Return the time index of every health record in the zoo (see timeline.py)
+        It is built the first time it is asked for and then kept up to date as records change."""
+        if self._timeline is None:
+            timeline = RecordTimeline()
+            timeline.add_many(record for animal in self._animals for record in animal.get_health_record())
+            self._timeline = timeline
+        return self._timeline
+
+    @_locked
+    def get_search_index(self):
+        """Return the full-text index of every health record in the zoo (see search.py)
+        Built the first time it is asked for and then updated as records and notes are added."""
+        if self._search is None:
+            index = HealthSearchIndex()
+            index.add_many(record for animal in self._animals for record in animal.get_health_record())
+            self._search = index
+        return self._search
+
+    @_locked
+    def search_records(self, query, **options):
+        return self.get_search_index().search(query, **options)
+
+    @_locked
+    def get_health_analytics(self):
+        """Return the NumPy columns of every health record in the zoo (see health_analytics.py)
+        Exported the first time it is asked for, after that only changed records are rewritten.
+        Needs NumPy."""
+        if self._analytics is None:
+            from health_analytics import HealthAnalytics
+            self._analytics = HealthAnalytics.from_zoo(self)
+        return self._analytics
 
     #staff management - includes adding, removing and getting the staff member
     def get_staff(self):
-        return self._staff.copy()
+        return self._staff.get_all()
 
-    def add_staff(self, staff):
-        self._staff.append(staff)
+    def get_staff_member(self, staff_id):
+        return self._staff.get(staff_id)
 
-    def remove_staff(self, staff):
+    def get_staff_id(self, staff):
+        return self._staff.get_id(staff)
+
+    def get_staff_role(self, role):
+        return self._staff.find("role", role)
+
+    @_locked
+    def add_staff(self, staff, staff_id=None):
         if staff in self._staff:
-            self._staff.remove(staff)
-            return True
-        return False
+            return self._staff.get_id(staff)
+        staff_id = self._staff.add(staff, staff_id)
+        if isinstance(staff, Vet):
+            staff.set_triage_queue(self._triage)
+            staff.set_report_cache(self._report_cache)
+        staff.add_watcher(self)
+        self._assignments.add_staff(staff)
+        self._bump("staff")
+        if self._journal is not None:
+            self._journal.staff_added(self, staff)
+        return staff_id
+
+    @_locked
+    def remove_staff(self, staff):
+        staff_id = self._staff.get_id(staff)
+        if not self._staff.remove(staff):
+            return False
+        staff.remove_watcher(self)
+        self._assignments.remove_staff(staff)
+        self._bump("staff")
+        if isinstance(staff, Vet):
+            #hand the vet's claimed cases back to the queue
+            for record in staff.get_claimed_cases():
+                self._triage.release(record)
+            staff.set_triage_queue(None)
+            staff.set_report_cache(None)
+        if self._journal is not None:
+            self._journal.staff_removed(self, staff_id)
+        return True
+
+    #called by staff in the zoo whenever they are assigned to or taken off an animal/enclosure
+    @_locked
+    def animal_assigned(self, staff, animal, added):
+        self._assignments.assigned(staff, animal, "animal", added)
+        if self._journal is not None:
+            self._journal.staff_assigned(self, staff, animal, "animal", added)
+
+    @_locked
+    def enclosure_assigned(self, staff, enclosure, added):
+        self._assignments.assigned(staff, enclosure, "enclosure", added)
+        if self._journal is not None:
+            self._journal.staff_assigned(self, staff, enclosure, "enclosure", added)
+
+    #assignment and workload queries
+    def get_staff_for(self, animal_or_enclosure, role=None):
+        """Return the staff (optionally only of given role) assigned to an animal or enclosure"""
+        staff = self._assignments.get_staff(animal_or_enclosure)
+        if role is None:
+            return staff
+        return [member for member in staff if member.get_staff_role() == role]
+
+    def get_uncovered_animals(self):
+        return self._assignments.get_uncovered("animal")
+
+    def get_uncovered_enclosures(self):
+        return self._assignments.get_uncovered("enclosure")
+
+    def get_workload(self, role=None):
+        """Return (staff, number of animals, number of enclosures) for every staff member
+        (optionally only of given role), busiest first"""
+        staff = self.get_staff() if role is None else self.get_staff_role(role)
+        workload = [(member, member.get_animal_count(), member.get_enclosure_count()) for member in staff]
+        workload.sort(key=lambda entry: (entry[1], entry[2]), reverse=True)
+        return workload
 
     #enclosure management
     def get_enclosures(self):
-        return self._enclosures.copy()
+        return self._enclosures.get_all()
 
-    def add_enclosure(self, enclosure):
-        self._enclosures.append(enclosure)
+    def get_enclosure_registry_id(self, enclosure):
+        return self._enclosures.get_id(enclosure)
 
-    def remove_enclosure(self, enclosure):
+    def get_enclosure(self, enclosure_id):
+        """Get an enclosure by its enclosure ID (not the registry ID)"""
+        found = self._enclosures.find("enclosure_id", enclosure_id)
+        return found[0] if found else None
+
+    def get_enclosures_environment(self, environment):
+        return self._enclosures.find("environment", environment)
+
+    @_locked
+    def add_enclosure(self, enclosure, enclosure_id=None):
         if enclosure in self._enclosures:
-            self._enclosures.remove(enclosure)
-            return True
-        return False
+            return self._enclosures.get_id(enclosure)
+        enclosure.add_watcher(self)
+        enclosure.set_locks(self._locks)
+        enclosure.set_rules(self._rules)
+        #animals already living in the enclosure are re-indexed by their new enclosure
+        for animal in enclosure.get_animals():
+            self._animals.reindex(animal, "enclosure")
+        enclosure_id = self._enclosures.add(enclosure, enclosure_id)
+        self._assignments.add_member(enclosure, "enclosure")
+        self._bump("enclosures")
+        if self._journal is not None:
+            self._journal.enclosure_added(self, enclosure)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.EnclosureAdded(enclosure, enclosure_id))
+        return enclosure_id
+
+    def transfer_animal(self, animal, enclosure):
+        """Move an animal out of the enclosure it is in (if any) and into another one in one step
+        In a thread-safe zoo the animal and both enclosures are locked together, in the same lock
+        order every thread uses, so opposite transfers can't deadlock and nobody sees the animal
+        in neither or both enclosures. Raises ValueError if the animal can't move in."""
+        while True:
+            source = animal.get_enclosure()
+            with self.hold(animal, source, enclosure):
+                if animal.get_enclosure() is not source:
+                    continue #moved by another thread before the locks were taken
+                if source is enclosure:
+                    return True
+                reason = enclosure.can_accept(animal)
+                if reason is not None:
+                    raise ValueError(reason)
+                with self.batch():
+                    if source is not None:
+                        source.remove_animal(animal)
+                    return enclosure.add_animal(animal)
+
+    def hold(self, *animals_or_enclosures):
+        """Lock some animals/enclosures for a change made of several steps (thread-safe zoo only)
+        e.g. with zoo.hold(enclosure): check the enclosure, then change it"""
+        if self._locks is None:
+            return NO_LOCK
+        return self._locks.hold(*animals_or_enclosures)
+
+    def hold_all(self):
+        """Lock the whole zoo: every animal/enclosure stripe, then the zoo's own lock
+        Nothing can change while it is held, e.g. to capture a consistent snapshot (thread-safe zoo only)."""
+        if self._locks is None:
+            return NO_LOCK
+        return self._locks.hold_all(self._lock)
+
+    def is_thread_safe(self):
+        return self._locks is not None
+
+    def get_lock_stripes(self):
+        return self._locks.get_stripe_count() if self._locks is not None else None
+
+    def get_rules(self):
+        """Return the zoo's RuleBook, None if it uses the default one species per enclosure"""
+        return self._rules
+
+    def check_placements(self, animals, enclosures):
+        """Check a batch of candidate moves (animals[i] into enclosures[i]) against the
+        compatibility rules in one go, without moving anything
+        Returns (animal, enclosure, reason) for every move a rule blocks. Each move is checked
+        against the animals already in the enclosure (see RuleBook.check_batch)."""
+        rules = self._rules if self._rules is not None else RuleBook()
+        return rules.explain_batch(animals, enclosures)
+
+    def place_animals(self, animals, apply=True):
+        """Place a batch of animals across all the zoo's enclosures in one pass
+        Returns (plan, rejects) - see placement.plan_placements. With compatibility rules the
+        rules choose the enclosures (an animal is only rejected if no enclosure with room allows
+        it). If apply is False the plan is only worked out and no animal is moved."""
+        plan, rejects = placement.plan_placements(animals, self._enclosures, self._rules)
+        if apply:
+            with self.batch():
+                failed = placement.apply_placements(plan)
+            if failed:
+                refused = set(animal for animal, _ in failed)
+                plan = [(animal, enclosure) for animal, enclosure in plan if animal not in refused]
+                rejects += failed
+        return plan, rejects
+
+    def plan_roster(self, max_enclosures=None, apply=True, keep_current=True, max_rounds=None):
+        """Balance the zoo's enclosures across its zookeepers - see roster.plan_roster
+        With keep_current the current roster is the starting point, so only enclosures without a
+        keeper (or whose keeper left) are handed out before rebalancing. If apply is False the
+        plan is only worked out and no assignment changes."""
+        keepers = self.get_staff_role("ZooKeeper")
+        current = None
+        if keep_current:
+            current = {}
+            for enclosure in self._enclosures:
+                covering = self.get_staff_for(enclosure, "ZooKeeper")
+                if covering:
+                    current[enclosure] = covering[0]
+        plan = roster.plan_roster(keepers, self._enclosures, max_enclosures, current, max_rounds=max_rounds)
+        if apply:
+            roster.apply_roster(plan, keepers)
+        return plan
+
+    @_locked
+    def remove_enclosure(self, enclosure):
+        enclosure_id = self._enclosures.get_id(enclosure)
+        if not self._enclosures.remove(enclosure):
+            return False
+        enclosure.remove_watcher(self)
+        enclosure.set_locks(None)
+        enclosure.set_rules(None)
+        for staff in self._assignments.remove_member(enclosure, "enclosure"):
+            staff.unassign_enclosure(enclosure)
+        self._bump("enclosures")
+        if self._journal is not None:
+            self._journal.enclosure_removed(self, enclosure_id)
+        if self._events is not None and self._events.has_subscribers():
+            self._events.emit(events.EnclosureRemoved(enclosure, enclosure_id))
+        return True
+
+    #registry access used by the streaming report engine
+    def get_animal_registry(self):
+        return self._animals
+
+    def get_enclosure_registry(self):
+        return self._enclosures
+
+    def count_species(self):
+        return self._animals.key_count("species")
+
+    def iter_species_groups(self):
+        return self._animals.groups("species")
 
     #methods for reporting of animals, enclosures and health
-    def create_animal_report(self):
-        report = f"Animal Report:\n"
-        report += f"Total Animals = {len(self._animals)}\n"
-        report += f"Total Species = {len(self._animals)}\n"
+    #the iter_ methods yield report lines, the write_ methods stream them into a file-like sink
+    def iter_animal_report(self):
+        return reports.iter_animal_report(self)
 
-        species_list = set(animal.get_species() for animal in self._animals)
+    def iter_health_report(self):
+        return reports.iter_health_report(self)
 
-        for species in species_list:
-            animals = [a for a in self._animals if a.get_species() == species]
-            report += f"{species} ({len(animals)}):\n"
-            for animal in animals:
-                report += f"  - {animal}\n"
-        return report
+    def iter_enclosure_report(self):
+        return reports.iter_enclosure_report(self)
+
+    def write_animal_report(self, sink):
+        return reports.write_report(self.iter_animal_report(), sink)
+
+    def write_health_report(self, sink):
+        return reports.write_report(self.iter_health_report(), sink)
+
+    def write_enclosure_report(self, sink):
+        return reports.write_report(self.iter_enclosure_report(), sink)
+
+    #the create_ methods are served from the report cache until something in the report changes
+    def create_animal_report(self):
+        return self._report_cache.get("animal_report", self._versions["animals"],
+                                      lambda: self._build_report(self.iter_animal_report))
 
     def create_health_report(self):
-        report = f"Health Report:\n"
-        health_issues = False
-
-        for animal in self._animals:
-            rec = animal.get_health_report()
-            if rec:
-                health_issues = True
-                report += f"\n{animal.get_name()}:\n"
-                for r in rec:
-                    report += f"  - {r}\n"
-        if not health_issues:
-            report += "No Health issues found.\n"
-        return report
+        return self._report_cache.get("health_report", self._versions["health"],
+                                      lambda: self._build_report(self.iter_health_report))
 
     def create_enclosure_report(self):
-        report = f"Enclosure Report:\n"
-        for enc in self._enclosures:
-            report += enc.get_enclosure_report() + "\n"
-        return report
+        return self._report_cache.get("enclosure_report", self._versions["enclosures"],
+                                      lambda: self._build_report(self.iter_enclosure_report))
+
+    #reports are built under the zoo's lock (if thread-safe), cached reports are read without it
+    @_locked
+    def _build_report(self, iter_report):
+        return "".join(iter_report())
 
     def __str__(self):
         """String representation of the overall zoo"""
+        version = (self._versions["animals"], self._versions["staff"], self._versions["enclosures"])
+        return self._report_cache.get("summary", version, self._summary)
+
+    def _summary(self):
         animal_num = len(self._animals)
         num_enclosures = len(self._enclosures)
         num_staff = len(self._staff)